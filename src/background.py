@@ -0,0 +1,92 @@
+"""
+Velo Bot Background Tasks
+Runs blocking work (downloads, file parsing, contact preparation) off the Tk
+main thread and hands progress and results back to it
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# Shared worker pool for UI-triggered jobs
+_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="velo-bg")
+
+class TaskCancelled(Exception):
+    """Raised inside a job when the user cancelled it"""
+
+class BackgroundTask:
+    """
+    Run a job in the worker pool and marshal its outcome to the Tk thread
+
+    The job is called as ``job(report, cancel_event)``. It may call
+    ``report(done, total)`` from the worker thread as often as it likes; the
+    UI only sees the latest value, polled with ``after()``. Results and errors
+    are delivered to the callbacks on the Tk thread, so they can touch widgets
+    and swap application state in one step.
+    """
+
+    def __init__(self, widget, job: Callable[[Callable, threading.Event], Any],
+                 on_done: Callable[[Any], None],
+                 on_error: Optional[Callable[[Exception], None]] = None,
+                 on_progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                 on_cancel: Optional[Callable[[], None]] = None,
+                 poll_ms: int = 100):
+        self.widget = widget
+        self.job = job
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self.poll_ms = poll_ms
+        self.cancel_event = threading.Event()
+        self._progress = None
+        self._reported = None
+        self._future = None
+
+    def start(self) -> 'BackgroundTask':
+        """Submit the job and start polling"""
+        self._future = _EXECUTOR.submit(self.job, self._report, self.cancel_event)
+        self.widget.after(self.poll_ms, self._poll)
+        return self
+
+    def cancel(self):
+        """Ask the job to stop at its next cancellation check"""
+        self.cancel_event.set()
+
+    @property
+    def running(self) -> bool:
+        return self._future is not None and not self._future.done()
+
+    def _report(self, done: int, total: Optional[int] = None):
+        # Single tuple assignment is atomic; the UI thread reads it in _poll
+        self._progress = (done, total)
+        if self.cancel_event.is_set():
+            raise TaskCancelled()
+
+    def _poll(self):
+        progress = self._progress
+        if progress is not None and progress != self._reported and self.on_progress:
+            self._reported = progress
+            self.on_progress(*progress)
+
+        if not self._future.done():
+            self.widget.after(self.poll_ms, self._poll)
+            return
+
+        try:
+            result = self._future.result()
+        except TaskCancelled:
+            if self.on_cancel:
+                self.on_cancel()
+            return
+        except Exception as e:
+            if self.cancel_event.is_set() and self.on_cancel:
+                self.on_cancel()
+            elif self.on_error:
+                self.on_error(e)
+            return
+
+        if self.cancel_event.is_set() and self.on_cancel:
+            self.on_cancel()
+        else:
+            self.on_done(result)
@@ -0,0 +1,299 @@
+"""
+Velo Bot Campaign Identity
+Fingerprints a campaign by its source file and prepared contacts, diffs a saved
+campaign against the current source and remaps resume progress by phone number
+"""
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import utils
+from . import contact_cache
+
+# One prepared contact, reduced to what identifies and distinguishes it:
+#   key     - phone number plus occurrence ("628123#0"), stable when rows move
+#   row     - original spreadsheet row
+#   digest  - hash of the content that is sent (name, message / template + fields)
+ContactSignature = namedtuple('ContactSignature', ['key', 'row', 'digest'])
+
+ContactDiff = namedtuple('ContactDiff', ['added', 'removed', 'changed', 'moved', 'unchanged'])
+
+# ============================================================================
+# FINGERPRINTS
+# ============================================================================
+def source_fingerprint(file_path) -> Optional[str]:
+    """
+    Content hash of a local source file (streamed, constant memory)
+
+    Args:
+        file_path: Excel/CSV path
+
+    Returns:
+        Hex digest, or None if the file does not exist
+    """
+    if not file_path or not Path(file_path).is_file():
+        return None
+    return utils.hash_file(file_path)
+
+def occurrence_keys(phones: Iterable[Optional[str]]) -> List[Optional[str]]:
+    """
+    Contact keys ("628123#0", "628123#1", ...) of phone numbers in list order
+
+    Args:
+        phones: Phone numbers; None entries (skipped rows) get None
+
+    Returns:
+        List of keys, one per phone
+    """
+    seen: Dict[str, int] = {}
+    keys = []
+    for phone in phones:
+        if phone is None:
+            keys.append(None)
+            continue
+        phone = str(phone)
+        occurrence = seen.get(phone, 0)
+        seen[phone] = occurrence + 1
+        keys.append(f"{phone}#{occurrence}")
+    return keys
+
+def contact_signatures(contacts: List[Dict]) -> List[ContactSignature]:
+    """
+    Signature of every contact, in list order
+
+    Args:
+        contacts: Output of prepare_contacts
+
+    Returns:
+        List of ContactSignature
+    """
+    signatures = []
+    for c, key in zip(contacts, occurrence_keys(c['phone'] for c in contacts)):
+        content = json.dumps(
+            [c.get('name'), c.get('message'), c.get('template'), c.get('fields') or {}],
+            sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+        signatures.append(ContactSignature(key, c.get('original_row'), digest))
+    return signatures
+
+def contacts_fingerprint(signatures: List[ContactSignature]) -> str:
+    """Order-sensitive hash of a whole prepared contact list"""
+    digest = hashlib.sha256()
+    for sig in signatures:
+        digest.update(f"{sig.key}|{sig.row}|{sig.digest}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def campaign_record(source: Optional[str], source_digest: Optional[str],
+                    column_mapping: Optional[Dict], default_message: Optional[str],
+                    contacts: List[Dict],
+                    signatures: Optional[List[ContactSignature]] = None) -> Dict:
+    """
+    Identity of a campaign, stored with its progress
+
+    Args:
+        source: Source file path or Google Sheets URL
+        source_digest: Content hash of the source file (None if unknown)
+        column_mapping: Column mapping used to prepare the contacts
+        default_message: Default message used to prepare the contacts
+        contacts: Prepared contacts
+        signatures: contact_signatures(contacts), if already computed
+
+    Returns:
+        JSON-serializable dictionary
+    """
+    if signatures is None:
+        signatures = contact_signatures(contacts)
+    record = {
+        'source': str(source) if source else None,
+        'source_fingerprint': source_digest,
+        'contacts_fingerprint': contacts_fingerprint(signatures),
+        'mapping': column_mapping,
+        'default_message': default_message,
+    }
+    return record
+
+def record_signatures(record: Dict, contacts: Optional[List[Dict]] = None,
+                      path=None) -> List[ContactSignature]:
+    """
+    Signatures of a saved campaign
+
+    Taken from the record itself (older progress files), from the side file
+    at path when it matches the record, or recomputed from saved contacts.
+    """
+    if record.get('signatures'):
+        return [ContactSignature(*s) for s in record['signatures']]
+    if path is not None:
+        saved = load_signatures(path, record)
+        if saved is not None:
+            return saved
+    return contact_signatures(contacts or [])
+
+# ============================================================================
+# SIGNATURE SIDE FILE
+# ============================================================================
+def signatures_file(progress_file) -> Path:
+    """Side file with the contact signatures of the campaign in progress_file"""
+    path = Path(progress_file)
+    return path.with_name(path.stem + "_signatures.json")
+
+def save_signatures(path, record: Dict, signatures: List[ContactSignature]):
+    """
+    Store a campaign's signatures once, keyed by its contacts_fingerprint
+
+    Progress files that do not keep the contacts (the CLI) reference them
+    through the record instead of re-serializing one per contact on every save.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({'contacts_fingerprint': record['contacts_fingerprint'],
+                   'signatures': [list(s) for s in signatures]}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+def load_signatures(path, record: Dict) -> Optional[List[ContactSignature]]:
+    """Signatures saved for this record, or None if missing or of another campaign"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('contacts_fingerprint') != record.get('contacts_fingerprint'):
+        return None
+    return [ContactSignature(*s) for s in data.get('signatures', [])]
+
+# ============================================================================
+# DIFF & REMAP
+# ============================================================================
+def diff_contacts(old: List[ContactSignature], new: List[ContactSignature]) -> ContactDiff:
+    """
+    Row-level difference between two prepared contact lists, matched by phone
+
+    Args:
+        old: Signatures of the saved campaign
+        new: Signatures prepared from the current source
+
+    Returns:
+        ContactDiff of key lists (added, removed, changed, moved) and the
+        number of unchanged contacts
+    """
+    old_by_key = {s.key: s for s in old}
+    new_by_key = {s.key: s for s in new}
+    added = [s.key for s in new if s.key not in old_by_key]
+    removed = [s.key for s in old if s.key not in new_by_key]
+    changed, moved, unchanged = [], [], 0
+    for s in new:
+        before = old_by_key.get(s.key)
+        if before is None:
+            continue
+        if before.digest != s.digest:
+            changed.append(s.key)
+        elif before.row != s.row:
+            moved.append(s.key)
+        else:
+            unchanged += 1
+    return ContactDiff(added, removed, changed, moved, unchanged)
+
+def describe_diff(diff: ContactDiff) -> str:
+    """Short summary such as "3 added, 1 removed, 2 changed, 40 moved, 100 unchanged" """
+    return (f"{len(diff.added)} added, {len(diff.removed)} removed, "
+            f"{len(diff.changed)} changed, {len(diff.moved)} moved, {diff.unchanged} unchanged")
+
+def diff_rows(diff: ContactDiff, old: List[ContactSignature], new: List[ContactSignature],
+              limit: Optional[int] = None) -> List[str]:
+    """
+    One line per added, removed and changed contact ("added    row 12   628123456789")
+
+    Args:
+        diff: diff_contacts(old, new)
+        old: Signatures of the saved campaign (rows of removed contacts)
+        new: Signatures prepared from the current source (rows of added / changed ones)
+        limit: Lines kept per kind; the rest is summed up as "... and N more"
+
+    Returns:
+        List of lines, added first, then removed, then changed
+    """
+    old_rows = {s.key: s.row for s in old}
+    new_rows = {s.key: s.row for s in new}
+    lines = []
+    for kind, keys, rows in (("added", diff.added, new_rows), ("removed", diff.removed, old_rows),
+                             ("changed", diff.changed, new_rows)):
+        shown = keys if limit is None else keys[:limit]
+        for key in shown:
+            lines.append(f"{kind:<8} row {rows.get(key)!s:<6} {key.rsplit('#', 1)[0]}")
+        if len(keys) > len(shown):
+            lines.append(f"{kind:<8} ... and {len(keys) - len(shown)} more")
+    return lines
+
+def log_diff_rows(diff: ContactDiff, old: List[ContactSignature], new: List[ContactSignature]):
+    """Write every added, removed and changed row to the log file (not the console)"""
+    lines = diff_rows(diff, old, new)
+    if lines:
+        utils.log_message("Source rows changed since the saved campaign:\n  " + "\n  ".join(lines),
+                          "INFO", console=False)
+
+def remap_progress(old: List[ContactSignature], old_index: int, new_contacts: List[Dict],
+                   new_signatures: Optional[List[ContactSignature]] = None
+                   ) -> Tuple[List[Dict], int, ContactDiff]:
+    """
+    Carry resume progress over to a re-prepared contact list
+
+    Contacts already processed in the saved campaign are matched by phone
+    number, not by position, so inserted, deleted or re-sorted rows neither
+    get a second message nor get skipped.
+
+    Args:
+        old: Signatures of the saved campaign
+        old_index: Number of contacts already processed in the saved campaign
+        new_contacts: Contacts prepared from the current source
+        new_signatures: contact_signatures(new_contacts), if already computed
+
+    Returns:
+        Tuple of (contacts ordered processed-first, index of the first pending
+        contact, diff between the two lists)
+    """
+    if new_signatures is None:
+        new_signatures = contact_signatures(new_contacts)
+    processed = {s.key for s in old[:old_index]}
+    done, pending = [], []
+    for contact, sig in zip(new_contacts, new_signatures):
+        (done if sig.key in processed else pending).append(contact)
+    return done + pending, len(done), diff_contacts(old, new_signatures)
+
+def check_source(record: Optional[Dict]) -> str:
+    """
+    Compare a saved campaign with its source file on disk
+
+    Args:
+        record: Campaign record from the progress file
+
+    Returns:
+        "unchanged", "changed", or "unknown" (no record, remote sheet or missing file)
+    """
+    if not record or not record.get('source_fingerprint'):
+        return "unknown"
+    current = source_fingerprint(record.get('source'))
+    if current is None:
+        return "unknown"
+    return "unchanged" if current == record['source_fingerprint'] else "changed"
+
+def reload_contacts(record: Dict, progress=None, cancel_event=None) -> Tuple[List[Dict], str]:
+    """
+    Re-read a campaign's source file and prepare it with the saved settings
+
+    Args:
+        record: Campaign record with 'source', 'mapping' and 'default_message'
+        progress: Optional callback(rows_done, total)
+        cancel_event: Optional cancellation event
+
+    Returns:
+        Tuple of (prepared contacts, new source fingerprint)
+    """
+    df, digest = contact_cache.load_spreadsheet(record['source'], cancel_event=cancel_event)
+    contacts = contact_cache.prepare_contacts(
+        df, record['mapping'], record.get('default_message'), digest,
+        progress=progress, cancel_event=cancel_event)
+    return contacts, digest
@@ -0,0 +1,183 @@
+"""
+Velo Bot Campaign Planner
+Dry-run planning: validates prepared contacts and simulates the full delay
+schedule (warm-up, jitter, auto-pause and auto-resume) without opening Chrome
+"""
+
+import random
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import config
+from . import utils
+
+ScheduleSettings = namedtuple('ScheduleSettings', [
+    'base_delay', 'jitter_min', 'jitter_max', 'warmup_count', 'warmup_delay',
+    'fixed_delay', 'pause_limit', 'auto_resume', 'resume_hours', 'send_seconds',
+])
+
+CampaignPlan = namedtuple('CampaignPlan', ['schedule', 'summary'])
+
+def settings_from_config() -> ScheduleSettings:
+    """Schedule settings as configured in config.py (CLI defaults)"""
+    return ScheduleSettings(
+        base_delay=config.BASE_DELAY,
+        jitter_min=config.JITTER_MIN,
+        jitter_max=config.JITTER_MAX,
+        warmup_count=config.WARMUP_COUNT,
+        warmup_delay=config.WARMUP_DELAY,
+        fixed_delay=False,
+        pause_limit=config.PAUSE_LIMIT,
+        auto_resume=config.AUTO_RESUME_ENABLED,
+        resume_hours=config.AUTO_RESUME_HOURS,
+        send_seconds=config.PLAN_SEND_SECONDS,
+    )
+
+def message_delay(message_number: int, settings: ScheduleSettings) -> float:
+    """
+    Delay after message number k (1-based): base + warm-up (k < warmup_count) + jitter
+
+    The one delay rule of all run loops; simulate_offsets is its vectorized twin.
+
+    Args:
+        message_number: Number of the message just sent
+        settings: Delay settings
+
+    Returns:
+        Delay in seconds
+    """
+    delay = float(settings.base_delay)
+    if settings.fixed_delay:
+        return delay
+    if message_number < settings.warmup_count:
+        delay += settings.warmup_delay
+    return delay + random.uniform(settings.jitter_min, settings.jitter_max)
+
+# ============================================================================
+# SCHEDULE SIMULATION
+# ============================================================================
+def simulate_offsets(count: int, settings: ScheduleSettings, first_number: int = 1,
+                     seed: Optional[int] = None) -> np.ndarray:
+    """
+    Planned start of every send, in seconds after the campaign starts
+
+    Mirrors the run loops: after message number k (1-based) the bot waits
+    base delay + warm-up (k < warmup_count) + jitter, and after every
+    pause_limit-th message it also pauses for resume_hours. Every send is
+    assumed to succeed, which is when auto-pauses come soonest.
+
+    Args:
+        count: Number of contacts to send
+        settings: Delay and pause settings
+        first_number: Message number of the first contact (resume / start row)
+        seed: Jitter random seed (None = random)
+
+    Returns:
+        float64 array of length count
+    """
+    if count <= 0:
+        return np.empty(0)
+    numbers = np.arange(first_number, first_number + count - 1)
+    gaps = np.full(len(numbers), float(settings.base_delay))
+    if not settings.fixed_delay:
+        gaps += np.where(numbers < settings.warmup_count, settings.warmup_delay, 0)
+        rng = np.random.default_rng(seed)
+        gaps += rng.uniform(settings.jitter_min, settings.jitter_max, len(numbers))
+    if settings.pause_limit > 0:
+        sent = numbers - first_number + 1
+        gaps += np.where(sent % settings.pause_limit == 0, settings.resume_hours * 3600, 0)
+    gaps += settings.send_seconds
+    return np.concatenate(([0.0], np.cumsum(gaps)))
+
+# ============================================================================
+# PLANNING
+# ============================================================================
+def plan_campaign(contacts: List[Dict], rows_total: int, settings: ScheduleSettings,
+                  start: Optional[datetime] = None, first_number: int = 1,
+                  seed: Optional[int] = None) -> CampaignPlan:
+    """
+    Validate prepared contacts and plan when each one will be sent
+
+    Args:
+        contacts: Output of prepare_contacts (invalid rows already dropped)
+        rows_total: Rows in the source, to count invalid ones
+        settings: Delay and pause settings
+        start: Planned campaign start (default: now)
+        first_number: Message number of the first contact
+        seed: Jitter random seed
+
+    Returns:
+        CampaignPlan with a per-contact schedule DataFrame and a summary dict
+    """
+    start = start or datetime.now()
+    phones = pd.Series([c['phone'] for c in contacts], dtype=object)
+    offsets = simulate_offsets(len(contacts), settings, first_number, seed)
+
+    schedule = pd.DataFrame({
+        'row': [c.get('original_row') for c in contacts],
+        'phone': phones,
+        'name': [c.get('name') for c in contacts],
+        'from_url': [bool(c.get('from_url')) for c in contacts],
+        'duplicate': phones.duplicated().to_numpy(),
+        'planned_at': pd.Timestamp(start) + pd.to_timedelta(offsets, unit='s'),
+    })
+    if settings.pause_limit > 0:
+        schedule['batch'] = np.arange(len(contacts)) // settings.pause_limit + 1
+    else:
+        schedule['batch'] = 1
+
+    pauses = (len(contacts) - 1) // settings.pause_limit if settings.pause_limit > 0 and contacts else 0
+    duration = float(offsets[-1]) + settings.send_seconds if contacts else 0.0
+    summary = {
+        'rows': rows_total,
+        'valid': len(contacts),
+        'invalid': rows_total - len(contacts),
+        'duplicates': int(schedule['duplicate'].sum()),
+        'from_url': int(schedule['from_url'].sum()),
+        'pauses': pauses,
+        'manual_resume': pauses > 0 and not settings.auto_resume,
+        'start': start,
+        'finish': start + pd.Timedelta(seconds=duration).to_pytimedelta(),
+        'duration': duration,
+    }
+    return CampaignPlan(schedule, summary)
+
+def format_summary(plan: CampaignPlan) -> str:
+    """Multi-line, human-readable plan summary"""
+    s = plan.summary
+    lines = [
+        f"Rows in source   : {s['rows']}",
+        f"Valid contacts   : {s['valid']}",
+        f"Invalid rows     : {s['invalid']}",
+        f"Duplicate phones : {s['duplicates']}",
+        f"From wa.me links : {s['from_url']}",
+        f"Auto-pauses      : {s['pauses']}",
+        f"Start            : {s['start']:%Y-%m-%d %H:%M}",
+        f"Finish           : {s['finish']:%Y-%m-%d %H:%M}",
+        f"Duration         : {utils.format_duration(s['duration'])}",
+    ]
+    if s['manual_resume']:
+        lines.append("Auto-resume is off: finish assumes each pause is resumed "
+                     "after the configured resume hours")
+    return "\n".join(lines)
+
+def export_schedule(plan: CampaignPlan, file_path) -> Path:
+    """
+    Write the per-contact schedule to CSV
+
+    Args:
+        plan: Output of plan_campaign
+        file_path: Destination path
+
+    Returns:
+        Path written
+    """
+    path = Path(file_path)
+    plan.schedule.to_csv(path, index=False, date_format="%Y-%m-%d %H:%M:%S")
+    utils.log_message(f"Dry-run schedule saved to {path}", "INFO")
+    return path
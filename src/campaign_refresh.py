@@ -0,0 +1,185 @@
+"""
+Velo Bot Campaign Refresh
+Incrementally merges rows added to (or edited in) the source file or Google
+Sheet into a running campaign. Rows are hashed so only new or changed rows are
+prepared; already processed contacts are never queued again.
+"""
+
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import utils
+from . import contact_cache
+from . import campaign_identity
+from . import data_processor
+from . import sheets_fetcher
+
+RefreshResult = namedtuple('RefreshResult', ['contacts', 'keys', 'digest', 'rows_total', 'rows_changed'])
+MergeResult = namedtuple('MergeResult', ['appended', 'updated', 'skipped', 'unchanged'])
+
+# ============================================================================
+# ROW HASHING
+# ============================================================================
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """
+    64-bit hash of every row's values (position independent)
+
+    Args:
+        df: Source DataFrame
+
+    Returns:
+        uint64 array, one entry per row
+    """
+    if df.empty:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def changed_rows(df: pd.DataFrame, known: Optional[np.ndarray]) -> pd.DataFrame:
+    """
+    Rows whose hash was not seen in the previous version of the source
+
+    Args:
+        df: Current source DataFrame
+        known: Row hashes of the previous version (None = everything is new)
+
+    Returns:
+        Subset of df with its original index, so original_row stays correct
+    """
+    if known is None or len(known) == 0:
+        return df
+    return df[~np.isin(row_hashes(df), known)]
+
+# ============================================================================
+# REFRESHER
+# ============================================================================
+def is_sheets_url(source: str) -> bool:
+    return bool(source) and str(source).startswith(("http://", "https://"))
+
+class SourceRefresher:
+    """
+    Remembers a campaign's source and the row hashes of its last version
+
+    refresh() runs in a worker thread; merge_contacts() must run on the thread
+    that owns the contact list (the Tk thread in the GUI).
+    """
+
+    def __init__(self, source: str, column_mapping: Dict[str, Optional[str]],
+                 default_message: Optional[str], df: Optional[pd.DataFrame] = None,
+                 digest: Optional[str] = None):
+        """
+        Args:
+            source: Local file path or Google Sheets URL
+            column_mapping: Column mapping the campaign was prepared with
+            default_message: Default message the campaign was prepared with
+            df: DataFrame the campaign was prepared from (None after a resume;
+                the first refresh then treats every row as new)
+            digest: Content hash of that version of the source
+        """
+        self.source = source
+        self.column_mapping = column_mapping
+        self.default_message = default_message
+        self.digest = digest
+        self.known = None
+        # Hashed on the first refresh, in the worker thread
+        self._baseline = df
+
+    def _fetch(self, cancel_event):
+        if is_sheets_url(self.source):
+            csv_url = sheets_fetcher.sheets_url_to_csv(self.source)
+            return sheets_fetcher.fetch_sheet_file(csv_url, cancel_event=cancel_event)
+        if not Path(self.source).is_file():
+            raise FileNotFoundError(f"File not found: {self.source}")
+        return Path(self.source)
+
+    def refresh(self, progress=None, cancel_event=None) -> RefreshResult:
+        """
+        Re-read the source and prepare only new or changed rows
+
+        Args:
+            progress: Optional callback(rows_done, total) for the preparation step
+            cancel_event: Optional cancellation event
+
+        Returns:
+            RefreshResult with the freshly prepared contacts (empty when the
+            source content hash did not change) and their contact keys,
+            numbered over the whole source like campaign_identity does
+        """
+        path = self._fetch(cancel_event)
+        digest = utils.hash_file(path)
+        if digest == self.digest:
+            utils.log_message("Refresh: source unchanged", "INFO")
+            return RefreshResult([], [], digest, None, 0)
+
+        if self.known is None and self._baseline is not None:
+            self.known = row_hashes(self._baseline)
+            self._baseline = None
+
+        df, digest = contact_cache.load_spreadsheet(path, cancel_event=cancel_event)
+        hashes = row_hashes(df)
+        subset = changed_rows(df, self.known)
+        utils.log_message(f"Refresh: {len(subset)} of {len(df)} rows new or changed", "INFO")
+
+        contacts, keys = [], []
+        if len(subset):
+            contacts = data_processor.prepare_contacts(
+                subset, self.column_mapping, self.default_message,
+                progress=progress, cancel_event=cancel_event)
+            # A phone's occurrence counts its rows in the whole source, not in the subset
+            row_keys = dict(zip(df.index, campaign_identity.occurrence_keys(
+                data_processor.row_phones(df, self.column_mapping['phone']))))
+            keys = [row_keys[c['original_row'] - 1] for c in contacts]
+
+        self.known = hashes
+        self.digest = digest
+        return RefreshResult(contacts, keys, digest, len(df), len(subset))
+
+# ============================================================================
+# MERGE
+# ============================================================================
+def merge_contacts(contacts: List[Dict], current_index: int, fresh: List[Dict],
+                   keys: Optional[List[str]] = None) -> MergeResult:
+    """
+    Merge freshly prepared contacts into a running campaign in place
+
+    Contacts are matched by key (phone plus occurrence, as in
+    campaign_identity), so a new row repeating a phone already in the
+    campaign is appended rather than mistaken for the existing one:
+
+    - key not in the campaign: appended to the pending tail
+    - key still pending: its entry is replaced with the new content
+    - key already processed (before current_index): skipped
+
+    Entries before current_index, current_index itself and the counters are
+    never touched, so the run loop and saved progress stay valid.
+
+    Args:
+        contacts: The campaign's contact list (modified in place)
+        current_index: Index of the next contact to send
+        fresh: RefreshResult.contacts
+        keys: RefreshResult.keys (default: numbered within fresh alone)
+
+    Returns:
+        MergeResult counts
+    """
+    if keys is None:
+        keys = [s.key for s in campaign_identity.contact_signatures(fresh)]
+    position = {s.key: i for i, s in enumerate(campaign_identity.contact_signatures(contacts))}
+    appended = updated = skipped = unchanged = 0
+    for contact, key in zip(fresh, keys):
+        i = position.get(key)
+        if i is None:
+            contacts.append(contact)
+            position[key] = len(contacts) - 1
+            appended += 1
+        elif i < current_index:
+            skipped += 1
+        elif contacts[i] != contact:
+            contacts[i] = contact
+            updated += 1
+        else:
+            unchanged += 1
+    return MergeResult(appended, updated, skipped, unchanged)
@@ -0,0 +1,468 @@
+"""
+Velo Bot Campaign Runner
+The one send loop shared by the CLI and both GUIs: delays and warm-up,
+auto-pause / auto-resume, deferred retries, progress saves and the results
+report. Frontends plug in a transport and a progress store and subscribe to
+typed events.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import utils
+from . import templates
+from . import retry_queue
+from . import results_report
+from . import eta
+from . import send_confirmation
+from .campaign_planner import ScheduleSettings, message_delay
+
+# ============================================================================
+# EVENTS
+# ============================================================================
+# Delivered to observers on the runner's thread, in order.
+Started = namedtuple('Started', ['index', 'total'])
+Sending = namedtuple('Sending', ['contact', 'number', 'total', 'retry'])
+# Every send attempt (first try or retry), before Sent / Failed: outcome is a
+# retry_queue outcome, stages the stage -> seconds timings of the attempt
+Attempted = namedtuple('Attempted', ['contact', 'outcome', 'stages', 'confirmation', 'retry'])
+# confirmation: send_confirmation state; confirm_seconds: Enter -> tick latency
+Sent = namedtuple('Sent', ['contact', 'number', 'total', 'retry', 'success', 'failed',
+                           'confirmation', 'confirm_seconds'])
+Failed = namedtuple('Failed', ['contact', 'outcome', 'number', 'total', 'retry', 'queued',
+                               'success', 'failed'])
+# phase: 'delay' (between messages), 'retry' (retry backoff) or 'auto_resume';
+# seconds left of a wait of `duration` seconds
+Countdown = namedtuple('Countdown', ['seconds', 'duration', 'phase', 'next_contact', 'eta'])
+# reason: 'auto' (pause limit reached) or 'manual'; resume_in: seconds or None
+Paused = namedtuple('Paused', ['reason', 'resume_in'])
+Resumed = namedtuple('Resumed', ['reason'])
+RetryPass = namedtuple('RetryPass', ['pending'])
+# completed: all contacts processed and no retries pending (False if stopped)
+Finished = namedtuple('Finished', ['completed', 'success', 'failed', 'results_path',
+                                   'annotated_path', 'confirmations'])
+
+PAUSE_POLL_SECONDS = 0.5
+
+# ============================================================================
+# TRANSPORTS
+# ============================================================================
+class LocalTransport:
+    """
+    Stand-in transport: no browser, messages are rendered and recorded
+
+    Transports implement open(), send(contact, stages, confirmation) ->
+    retry_queue outcome (filling stage timings and the confirmation 'status'),
+    safe_point() (called between messages, e.g. to recycle a browser) and
+    close(). whatsapp_bot.SeleniumTransport is the real one.
+    """
+
+    def __init__(self, outcome: Optional[Callable[[Dict], str]] = None, send_seconds: float = 0.0):
+        """
+        Args:
+            outcome: Optional outcome(contact) -> retry_queue outcome (default: always SENT)
+            send_seconds: Simulated time per send
+        """
+        self.outcome = outcome
+        self.send_seconds = send_seconds
+        self.sent: List[Dict] = []
+
+    def open(self):
+        pass
+
+    def send(self, contact: Dict, stages: Dict[str, float], confirmation: Optional[Dict] = None) -> str:
+        message = templates.render_message(contact)
+        if self.send_seconds:
+            time.sleep(self.send_seconds)
+        stages['send'] = self.send_seconds
+        outcome = self.outcome(contact) if self.outcome else retry_queue.SENT
+        if outcome == retry_queue.SENT:
+            self.sent.append({'phone': contact['phone'], 'message': message})
+            stages['confirm'] = 0.0
+            if confirmation is not None:
+                confirmation['status'] = send_confirmation.CONFIRMED
+        return outcome
+
+    def safe_point(self):
+        pass
+
+    def close(self):
+        pass
+
+# ============================================================================
+# PROGRESS STORES
+# ============================================================================
+class JsonProgressStore:
+    """
+    Progress saved as a JSON file
+
+    The runner's state (current_index, counts, failed_contacts, retry_queue,
+    results_file, timestamp) is merged over the frontend's own fields.
+    """
+
+    def __init__(self, path, extra: Optional[Callable[[], Dict]] = None):
+        """
+        Args:
+            path: Progress file
+            extra: Optional extra() -> dict of frontend fields (contacts, campaign, ...)
+        """
+        self.path = Path(path)
+        self.extra = extra
+
+    def save(self, state: Dict):
+        """Write atomically (temp file + os.replace): a crash never leaves half a file"""
+        data = dict(self.extra() if self.extra else {}, **state)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            utils.log_message(f"Failed to save progress: {e}", "ERROR")
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+class CampaignRunner:
+    """
+    Sends a campaign's contacts through a transport
+
+    run() blocks (call it on a worker thread in a GUI); pause(), resume() and
+    stop() may be called from any thread. The contact list is shared, not
+    copied: contacts appended while running (Refresh Source) are sent too.
+    """
+
+    def __init__(self, contacts: List[Dict], transport, settings: ScheduleSettings,
+                 store=None, index: int = 0, success: int = 0, failed: int = 0,
+                 failed_contacts: Optional[List[Dict]] = None,
+                 retries: Optional[retry_queue.RetryQueue] = None,
+                 results_file=None, source: Optional[str] = None,
+                 confirmations: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            contacts: Prepared contacts (shared list)
+            transport: LocalTransport, whatsapp_bot.SeleniumTransport, ...
+            settings: Delay and pause settings
+            store: Optional progress store (save(state), clear())
+            index: Index of the next contact (resume point)
+            success: Successful sends so far (resume)
+            failed: Failed contacts so far (resume)
+            failed_contacts: Failed contact records, appended to (shared list)
+            retries: Pending retry queue (resume)
+            results_file: Results CSV to append to (None: new file)
+            source: Campaign source, annotated with the results on completion
+            confirmations: Sent messages per confirmation state so far (resume)
+        """
+        self.contacts = contacts
+        self.transport = transport
+        self.settings = settings
+        self.store = store
+        self.index = index
+        self.success = success
+        self.failed = failed
+        self.failed_contacts = [] if failed_contacts is None else failed_contacts
+        self.retries = retries if retries is not None else retry_queue.RetryQueue()
+        self.source = source
+        self.confirmations = {state: (confirmations or {}).get(state, 0)
+                              for state in send_confirmation.STATES}
+        self._confirmation = None     # (state, seconds) of the last attempt
+        self.results = results_report.ResultsWriter(
+            results_file or results_report.new_results_path(source))
+        self.estimator = eta.EtaEstimator(settings)
+        self.batch_sent = 0           # successful sends since the last auto-pause
+        self._observers: List[Callable] = []
+        self._stop = threading.Event()
+        self._paused = threading.Event()
+        self._resume_reason = 'manual'
+        self._pause_requests = 0      # pause() calls; the runner handles each one
+        self._pause_handled = 0
+
+    # ------------------------------------------------------------------
+    # Observers and control
+    # ------------------------------------------------------------------
+    def subscribe(self, observer: Callable) -> "CampaignRunner":
+        """Add observer(event); events are delivered on the runner's thread"""
+        self._observers.append(observer)
+        return self
+
+    def _emit(self, event):
+        for observer in self._observers:
+            try:
+                observer(event)
+            except Exception as e:
+                utils.log_message(f"Campaign observer failed on {type(event).__name__}: {e}", "WARNING")
+
+    @property
+    def is_paused(self) -> bool:
+        return self._paused.is_set()
+
+    @property
+    def is_stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def pause(self):
+        """Request a pause (any thread); the runner saves and emits Paused at its next check"""
+        if not self._stop.is_set():
+            self._paused.set()
+            self._pause_requests += 1
+
+    def resume(self, reason: str = 'manual'):
+        """End a pause (any thread); Resumed is emitted on the runner's thread"""
+        if self._paused.is_set():
+            self._resume_reason = reason
+            self._paused.clear()
+
+    def stop(self):
+        self._stop.set()
+        self._paused.clear()
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    def state(self) -> Dict:
+        """Runner fields of the progress file"""
+        return {
+            'current_index': self.index,
+            'success_count': self.success,
+            'failed_count': self.failed,
+            'failed_contacts': self.failed_contacts,
+            'confirmations': self.confirmations,
+            'retry_queue': self.retries.to_list(),
+            'results_file': str(self.results.path),
+            'timestamp': datetime.now().isoformat(),
+        }
+
+    def save(self):
+        if self.store is not None:
+            self.store.save(self.state())
+
+    def estimate_eta(self, wait_left: float = 0.0) -> eta.Eta:
+        """Live ETA of the rest of the campaign"""
+        return self.estimator.estimate(len(self.contacts) - self.index, self.index + 1,
+                                       self.batch_sent, wait_left)
+
+    # ------------------------------------------------------------------
+    # Waiting
+    # ------------------------------------------------------------------
+    def _gate(self) -> bool:
+        """Block while paused; False once stopped"""
+        # A pause resumed before the runner noticed still gets its Paused / Resumed
+        if ((self._paused.is_set() or self._pause_requests != self._pause_handled)
+                and not self._stop.is_set()):
+            self._hold('manual', None)
+        return not self._stop.is_set()
+
+    def _hold(self, reason: str, resume_in: Optional[float]):
+        """
+        Save, emit Paused, wait until resumed (or auto-resumed after resume_in
+        seconds) and emit Resumed; runs on the runner's thread only, so saves
+        and events never race the send loop
+        """
+        self._pause_handled = self._pause_requests
+        self.save()
+        self._emit(Paused(reason, resume_in))
+        if resume_in is not None:
+            remaining = float(resume_in)
+            while remaining > 0 and self._paused.is_set() and not self._stop.is_set():
+                self._emit(Countdown(math.ceil(remaining), resume_in, 'auto_resume', None,
+                                     self.estimate_eta(remaining)))
+                step = min(1.0, remaining)
+                self._stop.wait(step)
+                remaining -= step
+            if self._paused.is_set() and not self._stop.is_set():
+                utils.log_message("Auto-resume: continuing the campaign", "INFO")
+                self.resume('auto')
+        while self._paused.is_set() and not self._stop.is_set():
+            self._stop.wait(PAUSE_POLL_SECONDS)
+        if not self._stop.is_set():
+            self._emit(Resumed(self._resume_reason))
+        self._resume_reason = 'manual'
+
+    def _wait(self, seconds: float, phase: str, next_contact: Optional[Dict] = None) -> bool:
+        """
+        Wait with a per-second Countdown (frozen while paused)
+
+        Returns:
+            False if the run was stopped meanwhile
+        """
+        remaining = float(seconds)
+        while remaining > 0:
+            if not self._gate():
+                return False
+            self._emit(Countdown(math.ceil(remaining), seconds, phase, next_contact,
+                                 self.estimate_eta(remaining)))
+            step = min(1.0, remaining)
+            if self._stop.wait(step):
+                return False
+            remaining -= step
+        return not self._stop.is_set()
+
+    def _auto_pause(self):
+        """Pause limit reached: pause until resumed (or auto-resumed)"""
+        self.transport.safe_point()
+        limit = self.settings.pause_limit
+        resume_in = self.settings.resume_hours * 3600 if self.settings.auto_resume else None
+        utils.log_message(f"Auto-pause: {limit} successful messages reached", "WARNING")
+        self._paused.set()
+        self._hold('auto', resume_in)
+        self.batch_sent = 0
+
+    # ------------------------------------------------------------------
+    # Sending
+    # ------------------------------------------------------------------
+    def _attempt(self, contact: Dict, number: int, retry: bool) -> str:
+        total = len(self.contacts)
+        self._emit(Sending(contact, number, total, retry))
+        stages, confirmation = {}, {}
+        started = datetime.now()
+        send_started = time.monotonic()
+        outcome = self.transport.send(contact, stages, confirmation)
+        self.estimator.observe(time.monotonic() - send_started)
+        status = confirmation.get('status')
+        self.results.record(contact, outcome, started, datetime.now(), stages, status)
+        self._confirmation = (status, stages.get('confirm'))
+        if outcome == retry_queue.SENT and status in self.confirmations:
+            self.confirmations[status] += 1
+        self._emit(Attempted(contact, outcome, stages, status, retry))
+        return outcome
+
+    def _record_failed(self, contact: Dict, outcome: str):
+        self.failed += 1
+        self.failed_contacts.append({
+            'phone': contact['phone'],
+            'name': contact['name'],
+            'reason': retry_queue.describe(outcome),
+            'timestamp': datetime.now().isoformat(),
+        })
+
+    def _send_next(self):
+        contact = self.contacts[self.index]
+        # Advance before sending: a save from here on resumes after this contact
+        self.index += 1
+        number, total = self.index, len(self.contacts)
+        utils.log_message(f"[{number}/{total}] Processing {contact['name']}...", "INFO")
+
+        outcome = self._attempt(contact, number, retry=False)
+        if outcome == retry_queue.SENT:
+            self.success += 1
+            self.batch_sent += 1
+            self._emit(Sent(contact, number, total, False, self.success, self.failed,
+                            *self._confirmation))
+        elif self.retries.record_failure(contact, outcome):
+            utils.log_message(f"{retry_queue.describe(outcome)}: queued for retry", "WARNING")
+            self._emit(Failed(contact, outcome, number, total, False, True, self.success, self.failed))
+        else:
+            self._record_failed(contact, outcome)
+            self._emit(Failed(contact, outcome, number, total, False, False, self.success, self.failed))
+        self.save()
+
+    def _on_retry_result(self, contact: Dict, outcome: str):
+        total = len(self.contacts)
+        if outcome == retry_queue.SENT:
+            self.success += 1
+            self.batch_sent += 1
+            self._emit(Sent(contact, self.index, total, True, self.success, self.failed,
+                            *self._confirmation))
+        else:
+            utils.log_message(f"Giving up on {contact['name']} ({contact['phone']}): "
+                              f"{retry_queue.describe(outcome)}", "WARNING")
+            self._record_failed(contact, outcome)
+            self._emit(Failed(contact, outcome, self.index, total, True, False,
+                              self.success, self.failed))
+        self.save()
+
+    def _on_requeued(self, contact: Dict, outcome: str):
+        utils.log_message(f"{retry_queue.describe(outcome)}: queued for another retry", "WARNING")
+        self._emit(Failed(contact, outcome, self.index, len(self.contacts), True, True,
+                          self.success, self.failed))
+        self.save()
+
+    def _retry_gap(self, seconds: float) -> bool:
+        """Before each retry: the main loop's pause limit, safe point and delay"""
+        if not self._gate():
+            return False
+        limit = self.settings.pause_limit
+        if limit > 0 and self.batch_sent >= limit:
+            self._auto_pause()
+            if self._stop.is_set():
+                return False
+        self.transport.safe_point()
+        return self._wait(seconds, 'retry')
+
+    # ------------------------------------------------------------------
+    def run(self) -> Finished:
+        """
+        Send from the current index to the end, then drain the retry queue
+
+        Progress is saved after every contact and kept when stopped or on an
+        error (re-raised); it is cleared on completion.
+
+        Returns:
+            Finished event (also emitted)
+        """
+        self._emit(Started(self.index, len(self.contacts)))
+        completed = False
+        annotated = None
+        try:
+            self.transport.open()
+
+            # The list can grow while running, so its length is re-read every time
+            while self.index < len(self.contacts) and self._gate():
+                self._send_next()
+                if self.index >= len(self.contacts) or self._stop.is_set():
+                    continue
+
+                limit = self.settings.pause_limit
+                if limit > 0 and self.batch_sent >= limit:
+                    self._auto_pause()
+                    if self._stop.is_set():
+                        break
+
+                self.transport.safe_point()
+                delay = message_delay(self.index, self.settings)
+                utils.log_message(f"Waiting {delay:.1f}s before next message...", "DEBUG")
+                self._wait(delay, 'delay', self.contacts[self.index])
+
+            if self.retries and not self._stop.is_set():
+                utils.log_message(f"Retrying {len(self.retries)} contacts that failed transiently...", "INFO")
+                self._emit(RetryPass(len(self.retries)))
+                self.retries.drain(
+                    lambda contact: self._attempt(contact, self.index, retry=True),
+                    self._retry_gap,
+                    self._on_retry_result,
+                    on_requeue=self._on_requeued,
+                    min_gap=lambda: message_delay(len(self.contacts), self.settings))
+
+            completed = (not self._stop.is_set() and self.index >= len(self.contacts)
+                         and not self.retries)
+        finally:
+            self.results.close()
+            if completed:
+                if self.store is not None:
+                    self.store.clear()
+            else:
+                self.save()
+            self.transport.close()
+
+        if completed and self.source:
+            try:
+                annotated = results_report.write_annotated(self.source, self.results.path)
+            except Exception as e:
+                utils.log_message(f"Could not write annotated spreadsheet: {e}", "WARNING")
+        utils.log_message(f"Campaign {'completed' if completed else 'stopped'}: "
+                          f"{self.success} sent ({send_confirmation.summarize(self.confirmations)}), "
+                          f"{self.failed} failed", "INFO")
+        finished = Finished(completed, self.success, self.failed, self.results.path, annotated,
+                            dict(self.confirmations))
+        self._emit(finished)
+        return finished
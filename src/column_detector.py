@@ -0,0 +1,214 @@
+"""
+Velo Bot Column Detector
+Ranks spreadsheet columns as phone / name / message candidates by combining a
+header match with a vectorized scan of a bounded random sample of the values
+"""
+
+import re
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import config
+from . import phone_normalizer
+from . import utils
+
+ColumnCandidate = namedtuple(
+    'ColumnCandidate',
+    ['column', 'confidence', 'header', 'phone', 'url', 'text', 'name'])
+
+ROLES = ('phone', 'name', 'message')
+
+# Header patterns this short only count as whole words ("No HP", not "shipping")
+SHORT_PATTERN_LENGTH = 3
+
+_URL_PATTERN = r'wa\.me/|api\.whatsapp\.com|whatsapp://'
+_PHONE_SHAPE = r'\+?[\d\s().\-]{6,24}'
+_TEXT_SHAPE = r'[^\W\d_]{2,}\W+[^\W\d_]{2,}\W+[^\W\d_]{2,}'
+_NAME_SHAPE = r"[^\W\d_][^\W\d_.' -]*(?:[ .'-]+[^\W\d_][^\W\d_.' -]*){0,4}\.?"
+
+# ============================================================================
+# HEADER SCORING
+# ============================================================================
+def header_tokens(column) -> List[str]:
+    """
+    Split a header into lowercase word tokens
+
+    Args:
+        column: Column label, e.g. "No. HP", "customerName", "nomor_wa"
+
+    Returns:
+        List of tokens
+    """
+    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', str(column))
+    return [t for t in re.split(r'[^0-9a-z]+', text.lower()) if t]
+
+def header_score(column, patterns: List[str]) -> float:
+    """
+    Score how well a header matches a list of patterns
+
+    Args:
+        column: Column label
+        patterns: Pattern list from config (e.g. PHONE_COLUMN_PATTERNS)
+
+    Returns:
+        1.0 for a whole-word match, 0.6 for a long pattern inside a word
+        ("phonenumber"), otherwise 0.0
+    """
+    tokens = header_tokens(column)
+    joined = ''.join(tokens)
+    best = 0.0
+    for pattern in patterns:
+        if pattern in tokens:
+            return 1.0
+        if len(pattern) > SHORT_PATTERN_LENGTH and pattern in joined:
+            best = 0.6
+    return best
+
+# ============================================================================
+# VALUE SAMPLING
+# ============================================================================
+def sample_values(df: pd.DataFrame, sample_size: int = None, seed: int = 0) -> pd.DataFrame:
+    """
+    Take the same bounded random set of rows from every column
+
+    Args:
+        df: DataFrame to sample
+        sample_size: Maximum rows (default config.COLUMN_SAMPLE_SIZE)
+        seed: Random seed, so detection is repeatable
+
+    Returns:
+        DataFrame of at most sample_size rows. Cost does not grow with len(df).
+    """
+    if sample_size is None:
+        sample_size = config.COLUMN_SAMPLE_SIZE
+    if len(df) <= sample_size:
+        return df
+    positions = np.random.default_rng(seed).choice(len(df), size=sample_size, replace=False)
+    return df.iloc[np.sort(positions)]
+
+def profile_sample(sample: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fraction of non-empty sampled values that look like each kind of content
+
+    All columns are stacked into one Series so every check, including phone
+    normalization, runs once as a vector operation.
+
+    Args:
+        sample: Output of sample_values
+
+    Returns:
+        DataFrame indexed by column position with 'phone', 'url', 'text' and
+        'name' fractions (0.0 - 1.0)
+    """
+    kinds = ['phone', 'url', 'text', 'name']
+    positions = pd.RangeIndex(len(sample.columns))
+    if sample.empty:
+        return pd.DataFrame(0.0, index=positions, columns=kinds)
+
+    stacked = pd.concat(
+        [sample.iloc[:, i].reset_index(drop=True) for i in positions],
+        keys=list(positions))
+    stacked = stacked.dropna()
+    text = stacked.astype(str).str.strip()
+    text = text[text != '']
+    if text.empty:
+        return pd.DataFrame(0.0, index=positions, columns=kinds)
+
+    url = text.str.contains(_URL_PATTERN, case=False, regex=True)
+    shaped = text.str.fullmatch(_PHONE_SHAPE)
+    phone = pd.Series(False, index=text.index)
+    candidates = text[shaped | url]
+    if not candidates.empty:
+        phone.loc[candidates.index] = phone_normalizer.normalize_series(candidates)['phone'].notna()
+    free_text = text.str.contains(_TEXT_SHAPE, regex=True) & ~url
+    name = text.str.fullmatch(_NAME_SHAPE) & (text.str.len() <= 60) & ~free_text
+
+    flags = pd.DataFrame({'phone': phone, 'url': url, 'text': free_text, 'name': name})
+    fractions = flags.astype(float).groupby(level=0).mean()
+    return fractions.reindex(positions, fill_value=0.0)
+
+# ============================================================================
+# RANKING
+# ============================================================================
+def _role_confidence(role: str, header: float, row) -> float:
+    if role == 'phone':
+        return 0.4 * header + 0.6 * max(row['phone'], row['url'])
+    if role == 'message':
+        return 0.5 * header + 0.5 * row['text'] * (1.0 - row['phone'])
+    return 0.5 * header + 0.5 * row['name'] * (1.0 - row['phone'])
+
+def rank_columns(df: pd.DataFrame, sample_size: int = None,
+                 seed: int = 0) -> Dict[str, List[ColumnCandidate]]:
+    """
+    Rank every column as a candidate for each role
+
+    Args:
+        df: DataFrame to analyze
+        sample_size: Maximum rows sampled (default config.COLUMN_SAMPLE_SIZE)
+        seed: Random seed for the sample
+
+    Returns:
+        Dictionary of role -> candidates with confidence > 0, best first
+    """
+    patterns = {
+        'phone': config.PHONE_COLUMN_PATTERNS,
+        'name': config.NAME_COLUMN_PATTERNS,
+        'message': config.MESSAGE_COLUMN_PATTERNS,
+    }
+    profile = profile_sample(sample_values(df, sample_size, seed))
+
+    ranked = {role: [] for role in ROLES}
+    for pos, column in enumerate(df.columns):
+        row = profile.iloc[pos]
+        for role in ROLES:
+            header = header_score(column, patterns[role])
+            confidence = round(float(_role_confidence(role, header, row)), 3)
+            if confidence > 0:
+                ranked[role].append(ColumnCandidate(
+                    column, confidence, header,
+                    *(round(float(row[kind]), 3) for kind in ('phone', 'url', 'text', 'name'))))
+    for role in ROLES:
+        ranked[role].sort(key=lambda c: c.confidence, reverse=True)
+    return ranked
+
+def pick_columns(ranked: Dict[str, List[ColumnCandidate]],
+                 min_confidence: float = None) -> Dict[str, Optional[ColumnCandidate]]:
+    """
+    Choose one distinct column per role, strongest assignment first
+
+    Args:
+        ranked: Output of rank_columns
+        min_confidence: Minimum confidence to accept (default config.COLUMN_MIN_CONFIDENCE)
+
+    Returns:
+        Dictionary of role -> chosen ColumnCandidate or None
+    """
+    if min_confidence is None:
+        min_confidence = config.COLUMN_MIN_CONFIDENCE
+    pairs = sorted(
+        ((c.confidence, role, c) for role in ROLES for c in ranked.get(role, [])),
+        key=lambda p: p[0], reverse=True)
+
+    chosen: Dict[str, Optional[ColumnCandidate]] = {role: None for role in ROLES}
+    taken = set()
+    for confidence, role, candidate in pairs:
+        if confidence < min_confidence:
+            break
+        if chosen[role] is None and candidate.column not in taken:
+            chosen[role] = candidate
+            taken.add(candidate.column)
+    return chosen
+
+def describe(chosen: Dict[str, Optional[ColumnCandidate]]) -> str:
+    """One-line summary for logs, e.g. "phone=No HP (92%), name=Nama (75%), message=-" """
+    parts = []
+    for role in ROLES:
+        c = chosen.get(role)
+        parts.append(f"{role}={c.column} ({c.confidence:.0%})" if c else f"{role}=-")
+    return ", ".join(parts)
+
+def log_detection(chosen: Dict[str, Optional[ColumnCandidate]]):
+    utils.log_message(f"Column detection: {describe(chosen)}", "INFO")
@@ -13,6 +13,11 @@ BASE_DIR = Path(__file__).parent.absolute()
 SESSION_DIR = BASE_DIR / "whatsapp_session"
 PROGRESS_FILE = BASE_DIR / "progress.json"
 LOG_FILE = BASE_DIR / "bot_log.txt"
+SHEETS_CACHE_DIR = BASE_DIR / "sheets_cache"
+CONTACT_CACHE_DIR = BASE_DIR / "contact_cache"
+RESULTS_DIR = BASE_DIR / "results"
+DIAGNOSTICS_DIR = BASE_DIR / "diagnostics"
+EVENT_LOG_FILE = BASE_DIR / "events" / "campaign_events.jsonl"
 
 # ============================================================================
 # TIMING CONFIGURATION (Anti-Ban Strategy)
@@ -28,10 +33,21 @@ JITTER_MAX = 15
 WARMUP_COUNT = 5
 WARMUP_DELAY = 90  # Extra delay for warm-up messages
 
+# Typical time spent opening a chat and sending one message (dry-run planning)
+PLAN_SEND_SECONDS = 15
+
+# Live ETA: smoothing factor of the moving average of measured send time
+# (higher = reacts faster) and z-score of the shown range (1.645 = 90%)
+ETA_SMOOTHING = 0.2
+ETA_CONFIDENCE_Z = 1.645
+
 # Timeout values (seconds)
 PAGE_LOAD_TIMEOUT = 60
 ELEMENT_WAIT_TIMEOUT = 30
-MESSAGE_SEND_TIMEOUT = 20
+MESSAGE_SEND_TIMEOUT = 20  # max wait for the sent tick after pressing Enter
+
+# Send confirmation: poll interval (seconds) while waiting for the tick
+CONFIRM_POLL_SECONDS = 0.2
 
 # ============================================================================
 # WHATSAPP WEB XPATHS (Robust Relative Selectors)
@@ -57,6 +73,73 @@ XPATH_CHAT_LOADED = '//div[@id="pane-side"]'
 # QR Code element (for initial login)
 XPATH_QR_CODE = '//canvas[@aria-label="Scan me!"]'
 
+# Outgoing message bubbles of the open chat
+XPATH_OUTGOING_MESSAGE = '//div[contains(@class, "message-out")]'
+
+# Status icons inside an outgoing bubble: clock while pending, ticks once sent
+XPATH_MESSAGE_PENDING = './/span[@data-icon="msg-time"]'
+XPATH_MESSAGE_TICK = ('.//span[@data-icon="msg-check" or @data-icon="msg-dblcheck" '
+                      'or @data-icon="msg-dblcheck-ack"]')
+
+# ============================================================================
+# SELECTOR REGISTRY
+# ============================================================================
+# Candidate locators per logical element, tried in order: CSS fast paths
+# first, the XPaths above as fallbacks. The candidate that last matched is
+# tried first next time. Entries are (strategy, value), strategy "css" or
+# "xpath"; inner elements (message_pending, message_tick) are looked up
+# inside an outgoing bubble.
+SELECTORS = {
+    "search_box": [
+        ("css", 'div[contenteditable="true"][data-tab="3"]'),
+        ("xpath", XPATH_SEARCH_BOX),
+    ],
+    "message_box": [
+        ("css", 'div[contenteditable="true"][data-tab="10"]'),
+        ("css", 'footer div[contenteditable="true"]'),
+        ("xpath", XPATH_MESSAGE_BOX),
+    ],
+    "send_button": [
+        ("css", 'span[data-icon="send"]'),
+        ("css", 'button[aria-label="Send"]'),
+        ("xpath", XPATH_SEND_BUTTON),
+    ],
+    "invalid_number": [
+        ("xpath", XPATH_INVALID_NUMBER),
+    ],
+    "invalid_number_popup": [
+        ("css", 'div[data-animate-modal-popup="true"] div[class*="popup"]'),
+        ("css", 'div[role="dialog"]'),
+        ("xpath", XPATH_INVALID_NUMBER_ALT),
+    ],
+    "chat_loaded": [
+        ("css", "#pane-side"),
+        ("xpath", XPATH_CHAT_LOADED),
+    ],
+    "qr_code": [
+        ("css", 'canvas[aria-label="Scan me!"]'),
+        ("css", "div[data-ref] canvas"),
+        ("xpath", XPATH_QR_CODE),
+    ],
+    "outgoing_message": [
+        ("css", "div.message-out"),
+        ("xpath", XPATH_OUTGOING_MESSAGE),
+    ],
+    "message_pending": [
+        ("css", 'span[data-icon="msg-time"]'),
+        ("xpath", XPATH_MESSAGE_PENDING),
+    ],
+    "message_tick": [
+        ("css", 'span[data-icon="msg-check"], span[data-icon="msg-dblcheck"], '
+                'span[data-icon="msg-dblcheck-ack"]'),
+        ("xpath", XPATH_MESSAGE_TICK),
+    ],
+}
+
+# Optional selector pack overriding SELECTORS without a new build:
+# {"version": "...", "selectors": {"message_box": [["css", "..."], ...]}}
+SELECTOR_PACK_FILE = BASE_DIR / "selectors.json"
+
 # ============================================================================
 # PHONE NUMBER CONFIGURATION
 # ============================================================================
@@ -73,6 +156,38 @@ PHONE_REGEX_PATTERNS = [
 # Valid phone number pattern (after cleaning)
 VALID_PHONE_PATTERN = r'^\d{10,15}$'
 
+# Per-country dialing rules used by phone_normalizer:
+#   (region, calling code, trunk prefix, min NSN length, max NSN length, mobile leading digits)
+# NSN = national significant number (no country code, no trunk prefix).
+# Mobile leading digits are only used to disambiguate numbers written without
+# "+" or trunk prefix; empty string means "any".
+PHONE_COUNTRY_RULES = [
+    ("ID", "62",  "0", 8, 12, "8"),
+    ("MY", "60",  "0", 9, 10, "1"),
+    ("SG", "65",  "",  8, 8,  "89"),
+    ("TH", "66",  "0", 8, 9,  "689"),
+    ("PH", "63",  "0", 10, 10, "9"),
+    ("VN", "84",  "0", 9, 10, "35789"),
+    ("BN", "673", "",  7, 7,  "78"),
+    ("TL", "670", "",  7, 8,  "7"),
+    ("US", "1",   "1", 10, 10, ""),
+    ("GB", "44",  "0", 9, 10, "7"),
+    ("AU", "61",  "0", 9, 9,  "4"),
+    ("IN", "91",  "0", 10, 10, "6789"),
+    ("CN", "86",  "0", 11, 11, "1"),
+    ("HK", "852", "",  8, 8,  "4569"),
+    ("TW", "886", "0", 9, 9,  "9"),
+    ("JP", "81",  "0", 10, 10, "789"),
+    ("KR", "82",  "0", 9, 10, "1"),
+    ("SA", "966", "0", 9, 9,  "5"),
+    ("AE", "971", "0", 9, 9,  "5"),
+    ("QA", "974", "",  8, 8,  "3567"),
+    ("TR", "90",  "0", 10, 10, "5"),
+    ("EG", "20",  "0", 10, 10, "1"),
+    ("NL", "31",  "0", 9, 9,  "6"),
+    ("DE", "49",  "0", 10, 11, "1"),
+]
+
 # ============================================================================
 # DATA PROCESSING CONFIGURATION
 # ============================================================================
@@ -81,9 +196,44 @@ PHONE_COLUMN_PATTERNS = ['phone', 'nomor', 'telepon', 'hp', 'whatsapp', 'wa', 'n
 NAME_COLUMN_PATTERNS = ['name', 'nama', 'customer', 'client', 'contact']
 MESSAGE_COLUMN_PATTERNS = ['message', 'pesan', 'text', 'msg', 'content']
 
+# Content sampling for column detection: rows sampled per column and the
+# minimum combined header/content confidence for an automatic pick
+COLUMN_SAMPLE_SIZE = 500
+COLUMN_MIN_CONFIDENCE = 0.35
+
 # Preview rows for column selection
 PREVIEW_ROWS = 5
 
+# GUI preview grid: rows converted per page and pages kept in memory
+PREVIEW_PAGE_ROWS = 200
+PREVIEW_CACHED_PAGES = 8
+
+# Max entries per LRU cache for repeated phone/URL parsing (per campaign)
+PARSE_CACHE_SIZE = 4096
+
+# Rows per chunk when reading CSV files in the background (progress/cancel granularity)
+LOAD_CHUNK_ROWS = 50000
+
+# Bytes per block when pyarrow reads a CSV in the background (progress/cancel granularity)
+LOAD_BLOCK_BYTES = 4 * 1024 * 1024
+
+# Bytes read from the start of a CSV to detect its encoding and delimiter
+CSV_SNIFF_BYTES = 65536
+
+# Delimiters considered when sniffing CSV files
+CSV_DELIMITERS = ",;\t|"
+
+# Report contact preparation progress every N rows
+PROGRESS_REPORT_ROWS = 1000
+
+# Parsed-file / prepared-contact cache: total size limit before the least
+# recently used entries are evicted
+CONTACT_CACHE_MAX_MB = 256
+
+# Added / removed / changed rows listed per kind when a saved campaign's
+# source changed (the full list goes to the log)
+DIFF_PREVIEW_ROWS = 10
+
 # ============================================================================
 # SELENIUM CONFIGURATION
 # ============================================================================
@@ -94,12 +244,62 @@ CHROME_WINDOW_SIZE = "1920,1080"
 # User agent (to appear more human-like)
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
+# Lean launch: switch off Chrome subsystems the bot never uses
+CHROME_LEAN_MODE = False
+LEAN_CHROME_ARGS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-domain-reliability",
+    "--disable-client-side-phishing-detection",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,AutofillServerCommunication",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--metrics-recording-only",
+    "--mute-audio",
+]
+
+# ============================================================================
+# BROWSER PROFILE MAINTENANCE
+# ============================================================================
+# Cache directories of the session profile (relative to SESSION_DIR) that
+# are safe to delete: login state lives in IndexedDB / Local Storage /
+# Cookies, which are never touched
+PROFILE_CACHE_DIRS = [
+    "Default/Cache",
+    "Default/Code Cache",
+    "Default/GPUCache",
+    "Default/DawnCache",
+    "Default/DawnGraphiteCache",
+    "Default/DawnWebGPUCache",
+    "Default/Service Worker/CacheStorage",
+    "Default/Service Worker/ScriptCache",
+    "GrShaderCache",
+    "GraphiteDawnCache",
+    "ShaderCache",
+    "component_crx_cache",
+    "Crashpad/reports",
+]
+
+# Prune the caches automatically before a campaign launches Chrome once
+# they exceed this size (MB); 0 = only from Settings
+PROFILE_PRUNE_MIN_MB = 200
+
 # ============================================================================
 # RETRY AND ERROR HANDLING
 # ============================================================================
 MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds between retries
 
+# Driver watchdog: consecutive driver errors before the Chrome session is
+# restarted, liveness probe interval and timeout (seconds), relaunch attempts
+WATCHDOG_MAX_DRIVER_ERRORS = 3
+WATCHDOG_PROBE_INTERVAL = 60
+WATCHDOG_PROBE_TIMEOUT = 10
+WATCHDOG_MAX_RELAUNCHES = 3
+
 # ============================================================================
 # LOGGING CONFIGURATION
 # ============================================================================
@@ -107,6 +307,17 @@ LOG_LEVEL = "INFO"  # DEBUG, INFO, WARNING, ERROR
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# Profiling (Settings switch / --profile): allocation report length and
+# traceback depth kept by tracemalloc
+PROFILE_TOP_ALLOCATIONS = 25
+PROFILE_TRACE_FRAMES = 1
+
+# Structured campaign events (JSON lines, see event_log / event_analysis):
+# rotated at EVENT_LOG_MAX_MB, keeping EVENT_LOG_BACKUPS older files
+EVENT_LOG_ENABLED = True
+EVENT_LOG_MAX_MB = 10
+EVENT_LOG_BACKUPS = 5
+
 # ============================================================================
 # ANTI-BAN SETTINGS
 # ============================================================================
@@ -119,6 +330,39 @@ AUTO_RESUME_ENABLED = True
 # Hours to wait before auto-resuming (options: 3 or 24)
 AUTO_RESUME_HOURS = 3
 
+# ============================================================================
+# BROWSER RESOURCE MONITOR
+# ============================================================================
+# Seconds between samples of the Chrome process tree, and samples kept for
+# the dashboard chart (240 x 30s = 2 hours)
+RESOURCE_SAMPLE_SECONDS = 30
+RESOURCE_HISTORY = 240
+
+# Recycle the browser at the next safe point (delay / auto-pause) when the
+# process tree exceeds these limits (0 = no limit)
+RECYCLE_RSS_MB = 2500
+RECYCLE_HANDLES = 20000
+
+# ============================================================================
+# UI RESPONSIVENESS
+# ============================================================================
+# Event-loop heartbeat period, and the heartbeat lag logged as a stall (with
+# the main thread's stack) and counted on the Dashboard
+STALL_HEARTBEAT_MS = 100
+STALL_THRESHOLD_SECONDS = 0.5
+
+# ============================================================================
+# METRICS ENDPOINT
+# ============================================================================
+# Prometheus-format /metrics for central monitoring (off by default; the GUI
+# switch and --metrics turn it on). Bound to localhost only.
+METRICS_ENABLED = False
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9477
+
+# Upper bounds (seconds) of the per-stage send latency histogram buckets
+METRICS_LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60)
+
 # ============================================================================
 # SAFETY LIMITS
 # ============================================================================
@@ -0,0 +1,286 @@
+"""
+Velo Bot Contact Cache
+Local cache of parsed spreadsheets and prepared contact lists, keyed by the
+content hash of the source file, so reopening an unchanged file skips both
+parsing and phone sanitization
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from . import config
+from . import utils
+from . import templates
+from . import data_processor
+
+# Bump when the layout of cached frames or contacts changes
+CACHE_VERSION = 2
+
+CONTACT_COLUMNS = ['phone', 'name', 'original_row', 'from_url', 'message', 'template', 'fields']
+
+# ============================================================================
+# STORAGE
+# ============================================================================
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _entry_paths(key: str) -> List[Path]:
+    return [config.CONTACT_CACHE_DIR / f"{key}{ext}" for ext in (".feather", ".pkl", ".json")]
+
+def _write_frame(key: str, df: pd.DataFrame, meta: dict):
+    """
+    Store a DataFrame as Feather (pyarrow) or, if that is unavailable or the
+    frame has types Arrow cannot hold, as a pickle
+    """
+    config.CONTACT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    feather_path, pickle_path, meta_path = _entry_paths(key)
+    written = None
+    if _has_pyarrow():
+        try:
+            df.reset_index(drop=True).to_feather(feather_path)
+            written = feather_path
+        except Exception as e:
+            feather_path.unlink(missing_ok=True)
+            utils.log_message(f"Feather cache not possible ({e}); using pickle", "DEBUG")
+    if written is None:
+        df.to_pickle(pickle_path)
+        written = pickle_path
+
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(dict(meta, version=CACHE_VERSION, data=written.name), f, ensure_ascii=False)
+    # An entry larger than the limit must not evict itself
+    evict(keep=(key,))
+
+def _read_frame(key: str) -> Optional[Tuple[pd.DataFrame, dict]]:
+    """Load a cached frame and its metadata, or None on a miss"""
+    _, _, meta_path = _entry_paths(key)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != CACHE_VERSION:
+            return None
+        data_path = config.CONTACT_CACHE_DIR / meta["data"]
+        if data_path.suffix == ".feather":
+            df = pd.read_feather(data_path)
+        else:
+            df = pd.read_pickle(data_path)
+    except Exception as e:
+        if meta_path.exists():
+            utils.log_message(f"Ignoring unreadable cache entry {key[:12]}: {e}", "DEBUG")
+        return None
+
+    # Mark as recently used for eviction
+    for path in (meta_path, data_path):
+        os.utime(path)
+    return df, meta
+
+# ============================================================================
+# KEYS
+# ============================================================================
+def normalizer_signature() -> str:
+    """Hash of every setting that changes how phone numbers are prepared"""
+    settings = {
+        "country": config.DEFAULT_COUNTRY_CODE,
+        "rules": config.PHONE_COUNTRY_RULES,
+        "links": config.PHONE_REGEX_PATTERNS,
+        "valid": config.VALID_PHONE_PATTERN,
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+def frame_key(file_digest: str) -> str:
+    """Cache key for a parsed spreadsheet"""
+    return "frame_" + hashlib.sha256(f"{CACHE_VERSION}|{file_digest}".encode("utf-8")).hexdigest()
+
+def contacts_key(file_digest: str, column_mapping: Dict[str, Optional[str]],
+                 default_message: Optional[str]) -> str:
+    """
+    Cache key for a prepared contact list
+
+    Args:
+        file_digest: Content hash of the source file
+        column_mapping: Phone/name/message column mapping
+        default_message: Default message text
+
+    Returns:
+        Key covering file content, mapping, default message and normalizer settings
+    """
+    payload = json.dumps({
+        "version": CACHE_VERSION,
+        "file": file_digest,
+        "mapping": {k: column_mapping.get(k) for k in ("phone", "name", "message")},
+        "default": default_message or "",
+        "normalizer": normalizer_signature(),
+    }, sort_keys=True)
+    return "contacts_" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+# ============================================================================
+# CONTACT SERIALIZATION
+# ============================================================================
+def contacts_to_frame(contacts: List[Dict]) -> pd.DataFrame:
+    """Flatten prepared contacts into a columnar frame"""
+    rows = {col: [] for col in CONTACT_COLUMNS}
+    for c in contacts:
+        rows['phone'].append(c['phone'])
+        rows['name'].append(c['name'])
+        rows['original_row'].append(int(c['original_row']))
+        rows['from_url'].append(bool(c.get('from_url', False)))
+        rows['message'].append(c.get('message'))
+        rows['template'].append(c.get('template'))
+        fields = c.get('fields')
+        rows['fields'].append(json.dumps(fields, ensure_ascii=False) if fields else None)
+    return pd.DataFrame(rows, columns=CONTACT_COLUMNS)
+
+def frame_to_contacts(frame: pd.DataFrame) -> List[Dict]:
+    """Rebuild contact dictionaries exactly as prepare_contacts returns them"""
+    contacts = []
+    for phone, name, row, from_url, message, template, fields in frame[CONTACT_COLUMNS].itertuples(
+            index=False, name=None):
+        contact = {
+            'phone': phone,
+            'name': name,
+            'original_row': int(row),
+            'from_url': bool(from_url),
+        }
+        if isinstance(message, str):
+            contact['message'] = message
+        else:
+            contact['template'] = template
+            if isinstance(fields, str):
+                contact['fields'] = json.loads(fields)
+        contacts.append(contact)
+    return contacts
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+def load_spreadsheet(file_path, progress: Optional[Callable] = None,
+                     cancel_event=None) -> Tuple[pd.DataFrame, str]:
+    """
+    Read a spreadsheet through the cache
+
+    Args:
+        file_path: Excel/CSV path
+        progress: Optional callback(rows_done, total) forwarded to process_spreadsheet
+        cancel_event: Optional cancellation event
+
+    Returns:
+        Tuple of (DataFrame, content hash of the file)
+    """
+    file_digest = utils.hash_file(file_path)
+    key = frame_key(file_digest)
+    cached = _read_frame(key)
+    if cached is not None:
+        df, _ = cached
+        utils.log_message(f"Loaded {Path(file_path).name} from cache ({len(df)} rows)", "INFO")
+        if progress:
+            progress(len(df), len(df))
+        return df, file_digest
+
+    df = data_processor.process_spreadsheet(file_path, progress=progress, cancel_event=cancel_event)
+    try:
+        _write_frame(key, df, {"source": Path(file_path).name, "rows": len(df)})
+    except Exception as e:
+        utils.log_message(f"Could not cache parsed file: {e}", "WARNING")
+    return df, file_digest
+
+def prepare_contacts(df: pd.DataFrame, column_mapping: Dict[str, Optional[str]],
+                     default_message: Optional[str], file_digest: Optional[str],
+                     progress: Optional[Callable] = None, cancel_event=None) -> List[Dict]:
+    """
+    data_processor.prepare_contacts with a cache in front of it
+
+    Args:
+        df: DataFrame loaded from the file with content hash file_digest
+        column_mapping: Column mapping
+        default_message: Default message text
+        file_digest: Content hash of the source file (None disables caching)
+        progress: Optional callback(rows_done, total)
+        cancel_event: Optional cancellation event
+
+    Returns:
+        List of contact dictionaries
+    """
+    if not file_digest:
+        return data_processor.prepare_contacts(
+            df, column_mapping, default_message, progress=progress, cancel_event=cancel_event)
+
+    key = contacts_key(file_digest, column_mapping, default_message)
+    cached = _read_frame(key)
+    if cached is not None:
+        frame, meta = cached
+        templates.import_templates(meta.get("templates", {}))
+        contacts = frame_to_contacts(frame)
+        utils.log_message(f"Prepared contacts loaded from cache ({len(contacts)} contacts)", "INFO")
+        if progress:
+            progress(len(df), len(df))
+        return contacts
+
+    contacts = data_processor.prepare_contacts(
+        df, column_mapping, default_message, progress=progress, cancel_event=cancel_event)
+    try:
+        _write_frame(key, contacts_to_frame(contacts),
+                     {"templates": templates.export_templates(contacts), "contacts": len(contacts)})
+    except Exception as e:
+        utils.log_message(f"Could not cache prepared contacts: {e}", "WARNING")
+    return contacts
+
+def cache_size() -> int:
+    """Total bytes used by the cache"""
+    if not config.CONTACT_CACHE_DIR.exists():
+        return 0
+    return sum(p.stat().st_size for p in config.CONTACT_CACHE_DIR.iterdir() if p.is_file())
+
+def evict(max_bytes: int = None, keep=()) -> int:
+    """
+    Delete least recently used entries until the cache fits its size limit
+
+    Args:
+        max_bytes: Size limit (default config.CONTACT_CACHE_MAX_MB)
+        keep: Keys never evicted by this call (e.g. the entry just written)
+
+    Returns:
+        Number of bytes freed
+    """
+    if max_bytes is None:
+        max_bytes = config.CONTACT_CACHE_MAX_MB * 1024 * 1024
+    if not config.CONTACT_CACHE_DIR.exists():
+        return 0
+
+    entries = {}
+    for path in config.CONTACT_CACHE_DIR.iterdir():
+        if path.is_file():
+            stat = path.stat()
+            size, last_used = entries.get(path.stem, (0, 0.0))
+            entries[path.stem] = (size + stat.st_size, max(last_used, stat.st_mtime))
+
+    total = sum(size for size, _ in entries.values())
+    freed = 0
+    for key, (size, _) in sorted(entries.items(), key=lambda kv: kv[1][1]):
+        if total - freed <= max_bytes:
+            break
+        if key in keep:
+            continue
+        for path in _entry_paths(key):
+            path.unlink(missing_ok=True)
+        freed += size
+    if freed:
+        utils.log_message(f"Contact cache: evicted {freed / 1e6:.1f} MB", "DEBUG")
+    return freed
+
+def clear() -> int:
+    """
+    Delete every cache entry
+
+    Returns:
+        Number of bytes freed
+    """
+    return evict(max_bytes=0)
@@ -3,14 +3,20 @@ Velo Bot Data Processor
 Handles Excel/CSV ingestion, column detection, and phone number sanitization
 """
 
+import codecs
+import csv
 import pandas as pd
-import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from colorama import init, Fore, Style
 
 from . import config
 from . import utils
+from . import templates
+from . import phone_normalizer
+from . import column_detector
+from .background import TaskCancelled
 
 # Initialize colorama for Windows
 init()
@@ -18,18 +24,27 @@ init()
 # ============================================================================
 # DATA INGESTION
 # ============================================================================
-def process_spreadsheet(file_path: str) -> pd.DataFrame:
+def process_spreadsheet(file_path: str,
+                        progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                        cancel_event=None) -> pd.DataFrame:
     """
     Read CSV or Excel file with automatic format detection
     
+    When progress or cancel_event is given (background loads), CSV files are
+    read in chunks of config.LOAD_CHUNK_ROWS so rows read can be reported and
+    the load aborted between chunks.
+    
     Args:
         file_path: Path to the spreadsheet file
+        progress: Optional callback(rows_read, total_rows_or_None)
+        cancel_event: Optional threading.Event; when set the load raises TaskCancelled
         
     Returns:
         DataFrame containing the data
         
     Raises:
         ValueError: If file format is not supported
+        TaskCancelled: If cancel_event was set during the load
     """
     file_path = Path(file_path)
     
@@ -38,18 +53,170 @@ def process_spreadsheet(file_path: str) -> pd.DataFrame:
     
     utils.log_message(f"Reading file: {file_path.name}", "INFO")
     
-    # Detect file format and read
+    # Detect file format and read; every column is read as text so phone
+    # numbers keep leading zeros and never turn into floats
     if file_path.suffix.lower() in ['.xlsx', '.xls']:
-        df = pd.read_excel(file_path)
+        df = pd.read_excel(file_path, dtype=str)
     elif file_path.suffix.lower() == '.csv':
-        df = pd.read_csv(file_path)
+        df = read_csv_file(file_path, progress, cancel_event)
     else:
         raise ValueError(f"Unsupported file format: {file_path.suffix}")
     
+    _check_cancelled(cancel_event)
+    if progress:
+        progress(len(df), len(df))
     utils.log_message(f"Loaded {len(df)} rows, {len(df.columns)} columns", "INFO")
     
     return df
 
+def sniff_csv(file_path) -> Tuple[str, str]:
+    """
+    Detect the encoding and delimiter of a CSV from its first block
+    
+    Handles UTF-8/UTF-16 byte order marks, falls back to cp1252 for files
+    that are not valid UTF-8 (older Excel exports), and picks the delimiter
+    among config.CSV_DELIMITERS (Indonesian-locale Excel writes ';').
+    
+    Args:
+        file_path: Path to the CSV file
+        
+    Returns:
+        Tuple of (encoding, delimiter)
+    """
+    with open(file_path, 'rb') as f:
+        block = f.read(config.CSV_SNIFF_BYTES)
+    
+    if block.startswith(codecs.BOM_UTF8):
+        encoding = 'utf-8-sig'
+    elif block.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        encoding = 'utf-16'
+    else:
+        encoding = 'utf-8'
+        try:
+            block.decode(encoding)
+        except UnicodeDecodeError as e:
+            # A multi-byte character cut at the end of the block is still UTF-8
+            if e.start < len(block) - 3:
+                encoding = 'cp1252'
+    
+    text = block.decode(encoding, errors='ignore')
+    # Sniff whole lines only; the block may end mid-row
+    sample = text[:text.rfind('\n') + 1] or text
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=config.CSV_DELIMITERS).delimiter
+    except csv.Error:
+        first_line = sample.split('\n', 1)[0]
+        delimiter = max(config.CSV_DELIMITERS, key=first_line.count)
+        if not first_line.count(delimiter):
+            delimiter = ','
+    return encoding, delimiter
+
+def read_csv_file(file_path, progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                  cancel_event=None) -> pd.DataFrame:
+    """
+    Read a CSV with sniffed encoding/delimiter, all columns as text
+    
+    Uses pyarrow's CSV reader when pyarrow is installed (see _read_csv_arrow),
+    otherwise the C engine. Background reads (progress or cancel_event given)
+    go block by block either way, so rows read can be reported and the load
+    aborted between blocks.
+    
+    Args:
+        file_path: Path to the CSV file
+        progress: Optional callback(rows_read, None)
+        cancel_event: Optional threading.Event; when set the read raises TaskCancelled
+        
+    Returns:
+        DataFrame with string columns (NaN for empty cells)
+    """
+    encoding, delimiter = sniff_csv(file_path)
+    utils.log_message(f"CSV format: encoding={encoding}, delimiter={delimiter!r}", "DEBUG")
+    options = dict(sep=delimiter, encoding=encoding, dtype=str)
+    
+    if _has_pyarrow():
+        try:
+            df = _read_csv_arrow(file_path, encoding, delimiter, progress, cancel_event)
+        except TaskCancelled:
+            raise
+        except Exception as e:
+            utils.log_message(f"pyarrow CSV reader failed ({e}); using default reader", "DEBUG")
+            df = None
+        if df is not None:
+            return df
+    
+    if progress is None and cancel_event is None:
+        return pd.read_csv(file_path, **options)
+    
+    chunks = []
+    rows = 0
+    with pd.read_csv(file_path, chunksize=config.LOAD_CHUNK_ROWS, **options) as reader:
+        for chunk in reader:
+            _check_cancelled(cancel_event)
+            chunks.append(chunk)
+            rows += len(chunk)
+            if progress:
+                progress(rows, None)
+    if not chunks:
+        return pd.read_csv(file_path, **options)
+    return pd.concat(chunks, ignore_index=True)
+
+def _read_csv_arrow(file_path, encoding: str, delimiter: str, progress=None,
+                    cancel_event=None) -> Optional[pd.DataFrame]:
+    """
+    Read a CSV with pyarrow, every column typed as string up front
+    
+    Typing the columns from the header keeps leading zeros (inferring
+    first would read 0812... as an integer). Plain reads use the
+    multithreaded reader; background reads stream blocks of
+    config.LOAD_BLOCK_BYTES, checking cancel_event and reporting rows after
+    each one.
+    
+    Returns:
+        DataFrame, or None when the header needs pandas' handling (blank or
+        duplicate column names)
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    
+    with open(file_path, encoding=encoding, newline='') as f:
+        names = next(csv.reader(f, delimiter=delimiter), [])
+    if not names or any(not n for n in names) or len(set(names)) != len(names):
+        return None
+    
+    read_options = pa_csv.ReadOptions(
+        encoding='utf8' if encoding == 'utf-8' else encoding,
+        block_size=config.LOAD_BLOCK_BYTES)
+    parse_options = pa_csv.ParseOptions(delimiter=delimiter, newlines_in_values=True)
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: pa.string() for name in names}, strings_can_be_null=True)
+    
+    _check_cancelled(cancel_event)
+    if progress is None and cancel_event is None:
+        table = pa_csv.read_csv(file_path, read_options, parse_options, convert_options)
+    else:
+        batches = []
+        rows = 0
+        with pa_csv.open_csv(file_path, read_options, parse_options, convert_options) as reader:
+            for batch in reader:
+                _check_cancelled(cancel_event)
+                batches.append(batch)
+                rows += batch.num_rows
+                if progress:
+                    progress(rows, None)
+            table = pa.Table.from_batches(batches, schema=reader.schema)
+    return table.to_pandas()
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise TaskCancelled()
+
 # ============================================================================
 # COLUMN DETECTION
 # ============================================================================
@@ -57,46 +224,19 @@ def detect_columns(df: pd.DataFrame) -> Dict[str, Optional[str]]:
     """
     Automatically detect which columns contain phone, name, and message
     
+    Columns are ranked by header match plus a bounded sample of their values
+    (see column_detector.rank_columns for the ranked candidates).
+    
     Args:
         df: DataFrame to analyze
         
     Returns:
         Dictionary with detected column names: {'phone': 'col_name', 'name': 'col_name', 'message': 'col_name'}
     """
-    detected = {
-        'phone': None,
-        'name': None,
-        'message': None
-    }
-    
-    columns_lower = {col: col.lower() for col in df.columns}
-    
-    # Detect phone column
-    for col, col_lower in columns_lower.items():
-        for pattern in config.PHONE_COLUMN_PATTERNS:
-            if pattern in col_lower:
-                detected['phone'] = col
-                break
-        if detected['phone']:
-            break
+    chosen = column_detector.pick_columns(column_detector.rank_columns(df))
+    column_detector.log_detection(chosen)
     
-    # Detect name column
-    for col, col_lower in columns_lower.items():
-        for pattern in config.NAME_COLUMN_PATTERNS:
-            if pattern in col_lower:
-                detected['name'] = col
-                break
-        if detected['name']:
-            break
-    
-    # Detect message column
-    for col, col_lower in columns_lower.items():
-        for pattern in config.MESSAGE_COLUMN_PATTERNS:
-            if pattern in col_lower:
-                detected['message'] = col
-                break
-        if detected['message']:
-            break
+    detected = {role: (c.column if c else None) for role, c in chosen.items()}
     
     # Calculate confidence score
     confidence = sum(1 for v in detected.values() if v is not None)
@@ -222,6 +362,9 @@ def clean_number(phone: str, default_country_code: str = None) -> Optional[str]:
     """
     Clean and normalize phone number with country code
     
+    Classification is table-driven (config.PHONE_COUNTRY_RULES); see
+    phone_normalizer.normalize for the rule that matched.
+    
     Args:
         phone: Raw phone number
         default_country_code: Default country code (default from config)
@@ -232,34 +375,10 @@ def clean_number(phone: str, default_country_code: str = None) -> Optional[str]:
     if pd.isna(phone) or not phone:
         return None
     
-    phone = str(phone).strip()
-    
-    if default_country_code is None:
-        default_country_code = config.DEFAULT_COUNTRY_CODE
-    
-    # First, try to extract from wa.me link
-    extracted = utils.extract_phone_from_link(phone)
-    if extracted:
-        phone = extracted
-    
-    # Remove all non-digit characters
-    phone = re.sub(r'\D', '', phone)
-    
-    if not phone:
-        return None
-    
-    # Remove leading zeros
-    phone = phone.lstrip('0')
-    
-    # Add country code if not present
-    if not phone.startswith(default_country_code):
-        phone = default_country_code + phone
-    
-    # Validate
-    if utils.validate_phone_number(phone):
-        return phone
-    
-    return None
+    return _clean_number_cached(str(phone).strip(), default_country_code)
+
+def _clean_number_uncached(phone: str, default_country_code: Optional[str]) -> Optional[str]:
+    return phone_normalizer.normalize(phone, default_country_code)[0]
 
 def parse_wa_link(text: str) -> Optional[str]:
     """
@@ -273,7 +392,8 @@ def parse_wa_link(text: str) -> Optional[str]:
     """
     extracted = utils.extract_phone_from_link(text)
     if extracted:
-        return clean_number(extracted)
+        # Links carry the number in international format
+        return phone_normalizer.normalize(extracted, international=True)[0]
     return None
 
 def extract_message_from_url(url: str) -> Optional[str]:
@@ -294,6 +414,9 @@ def extract_message_from_url(url: str) -> Optional[str]:
     if not url or not isinstance(url, str):
         return None
     
+    return _extract_message_cached(url)
+
+def _extract_message_uncached(url: str) -> Optional[str]:
     import urllib.parse
     
     try:
@@ -341,6 +464,11 @@ def parse_whatsapp_url(url: str) -> Optional[Dict[str, str]]:
     if not url or not isinstance(url, str):
         return None
     
+    result = _parse_whatsapp_url_cached(url)
+    # Hand out a copy so callers cannot mutate the cached entry
+    return dict(result) if result else None
+
+def _parse_whatsapp_url_uncached(url: str) -> Optional[Dict[str, str]]:
     result = {}
     
     # Extract phone number
@@ -355,17 +483,87 @@ def parse_whatsapp_url(url: str) -> Optional[Dict[str, str]]:
     
     return result if result else None
 
+# ============================================================================
+# PARSE CACHES
+# ============================================================================
+# Bounded LRU caches: form-generated sheets repeat the same URL or number
+# across thousands of rows. Cleared at the start of each campaign preparation.
+_clean_number_cached = lru_cache(maxsize=config.PARSE_CACHE_SIZE)(_clean_number_uncached)
+_extract_message_cached = lru_cache(maxsize=config.PARSE_CACHE_SIZE)(_extract_message_uncached)
+_parse_whatsapp_url_cached = lru_cache(maxsize=config.PARSE_CACHE_SIZE)(_parse_whatsapp_url_uncached)
+
+_PARSE_CACHES = {
+    'clean_number': _clean_number_cached,
+    'extract_message_from_url': _extract_message_cached,
+    'parse_whatsapp_url': _parse_whatsapp_url_cached,
+}
+
+def parse_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Get hit/miss counters of the parse caches
+    
+    Returns:
+        Dictionary of function name -> {'hits', 'misses', 'size'}
+    """
+    stats = {}
+    for name, cached in _PARSE_CACHES.items():
+        info = cached.cache_info()
+        stats[name] = {'hits': info.hits, 'misses': info.misses, 'size': info.currsize}
+    return stats
+
+def log_parse_cache_stats():
+    """Write parse cache hit/miss counters to the log"""
+    parts = [f"{name} {s['hits']} hits/{s['misses']} misses"
+             for name, s in parse_cache_stats().items()]
+    utils.log_message(f"Parse cache: {', '.join(parts)}", "INFO")
+
+def clear_parse_caches():
+    """Drop all cached parse results and reset the counters"""
+    for cached in _PARSE_CACHES.values():
+        cached.cache_clear()
+
 # ============================================================================
 # DATA PREPARATION
 # ============================================================================
-def prepare_contacts(df: pd.DataFrame, column_mapping: Dict[str, str], default_message: str = None) -> List[Dict[str, str]]:
+def row_phones(df: pd.DataFrame, phone_col: str) -> List[Optional[str]]:
+    """
+    Phone number prepare_contacts would give every row, without preparing it
+    
+    Args:
+        df: DataFrame with contact data
+        phone_col: Phone column (numbers or WhatsApp links)
+        
+    Returns:
+        List aligned with df rows; None where the row would be skipped
+    """
+    normalized = phone_normalizer.normalize_series(df[phone_col])
+    phones = []
+    for value, phone in zip(df[phone_col], normalized['phone']):
+        text = str(value).strip()
+        if 'api.whatsapp.com' in text or 'wa.me' in text:
+            url_data = parse_whatsapp_url(text)
+            if url_data and 'phone' in url_data:
+                phone = url_data['phone']
+        phones.append(phone or None)
+    return phones
+
+def prepare_contacts(df: pd.DataFrame, column_mapping: Dict[str, str], default_message: str = None,
+                     progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                     cancel_event=None) -> List[Dict[str, str]]:
     """
     Prepare contact list with cleaned phone numbers
     
+    Messages are not materialized here: each contact references a compiled
+    template by id plus only the row fields its placeholders need. Use
+    templates.render_message() right before sending.
+    
     Args:
         df: DataFrame with contact data
         column_mapping: Column mapping from interactive_column_selection
         default_message: Default message if message column not specified
+        progress: Optional callback(rows_done, total_rows), called every
+            config.PROGRESS_REPORT_ROWS rows
+        cancel_event: Optional threading.Event; when set preparation raises TaskCancelled
         
     Returns:
         List of contact dictionaries
@@ -376,9 +574,24 @@ def prepare_contacts(df: pd.DataFrame, column_mapping: Dict[str, str], default_m
     name_col = column_mapping.get('name')
     message_col = column_mapping.get('message')
     
-    utils.log_message(f"Preparing contacts from {len(df)} rows...", "INFO")
+    field_columns = templates.resolve_field_columns(df.columns)
+    default_template = templates.compile_template(default_message or "Hello!")
     
-    for idx, row in df.iterrows():
+    utils.log_message(f"Preparing contacts from {len(df)} rows...", "INFO")
+    clear_parse_caches()
+    url_messages = 0
+    
+    # Normalize the whole phone column at once
+    normalized = phone_normalizer.normalize_series(df[phone_col])
+    utils.log_message(f"Phone rules matched: {phone_normalizer.rule_report(normalized)}", "INFO")
+    
+    total_rows = len(df)
+    for done, ((idx, row), batch_phone) in enumerate(zip(df.iterrows(), normalized['phone'])):
+        if done % config.PROGRESS_REPORT_ROWS == 0:
+            _check_cancelled(cancel_event)
+            if progress:
+                progress(done, total_rows)
+        
         phone_value = str(row[phone_col]).strip()
         
         # Check if it's a WhatsApp API URL with message
@@ -390,7 +603,7 @@ def prepare_contacts(df: pd.DataFrame, column_mapping: Dict[str, str], default_m
         if url_data and 'phone' in url_data:
             phone = url_data['phone']
         else:
-            phone = clean_number(phone_value)
+            phone = batch_phone
         
         if not phone:
             utils.log_message(f"Row {idx+1}: Invalid phone number '{phone_value}'", "WARNING")
@@ -399,30 +612,64 @@ def prepare_contacts(df: pd.DataFrame, column_mapping: Dict[str, str], default_m
         # Get name
         name = utils.clean_string(row[name_col]) if name_col and name_col in row else "Customer"
         
+        contact = {
+            'phone': phone,
+            'name': name,
+            'original_row': idx + 1,
+            'from_url': bool(url_data and 'message' in url_data)
+        }
+        
         # Get message - priority: URL message > column message > default message
-        message = None
         
-        # 1. Try to get message from URL (highest priority)
+        # 1. Message from URL (highest priority) is already final text
         if url_data and 'message' in url_data:
-            message = url_data['message']
-            utils.log_message(f"Row {idx+1}: Using message from WhatsApp URL", "DEBUG")
+            contact['message'] = url_data['message']
+            url_messages += 1
+            contacts.append(contact)
+            continue
         
-        # 2. Try to get message from column
-        elif message_col and message_col in row:
-            message = utils.clean_string(row[message_col])
+        # 2. Column message, 3. default message — both may hold placeholders
+        column_text = ""
+        if message_col and message_col in row and not pd.isna(row[message_col]):
+            column_text = utils.clean_string(row[message_col])
+        template = templates.compile_template(column_text) if column_text else default_template
         
-        # 3. Use default message
-        else:
-            message = default_message or "Hello!"
+        contact['template'] = template.id
+        fields = _template_fields(template, row, field_columns)
+        if fields:
+            contact['fields'] = fields
         
-        contacts.append({
-            'phone': phone,
-            'name': name,
-            'message': message,
-            'original_row': idx + 1,
-            'from_url': bool(url_data and 'message' in url_data)
-        })
+        contacts.append(contact)
     
+    if progress:
+        progress(total_rows, total_rows)
+    if url_messages:
+        utils.log_message(f"{url_messages} contacts use the message from their WhatsApp URL", "DEBUG")
     utils.log_message(f"Prepared {len(contacts)} valid contacts", "INFO")
+    log_parse_cache_stats()
     
     return contacts
+
+def _template_fields(template: templates.CompiledTemplate, row: pd.Series,
+                     field_columns: Dict[str, str]) -> Dict[str, str]:
+    """
+    Pick the row values referenced by a template's placeholders
+    
+    Args:
+        template: Compiled message template
+        row: DataFrame row
+        field_columns: Normalized key -> column name lookup
+        
+    Returns:
+        Dictionary of normalized placeholder key -> cleaned cell value
+    """
+    fields = {}
+    for key in template.fields:
+        if key in templates.FIELD_ALIASES:
+            continue  # resolved from the contact's own name/phone at render time
+        col = field_columns.get(key)
+        if col is None:
+            continue
+        value = row[col]
+        fields[key] = "" if pd.isna(value) else utils.clean_string(value)
+    return fields
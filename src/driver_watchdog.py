@@ -0,0 +1,180 @@
+"""
+Velo Bot Driver Watchdog
+Detects a crashed or hung Chrome/WebDriver session (consecutive driver errors
+or a failed liveness probe), relaunches it with the same profile and resends
+the contact that failed, so a browser crash does not fail the rest of the list
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from . import config
+from . import utils
+from . import retry_queue
+
+class DriverWatchdog:
+    """
+    Owns the WebDriver of a running campaign
+
+    All sends go through send(); the current driver is always watchdog.driver
+    (it changes after a recovery).
+    """
+
+    def __init__(self, driver, launch: Callable, load: Callable,
+                 on_recovering: Optional[Callable[[], None]] = None,
+                 on_recovered: Optional[Callable[[float], None]] = None):
+        """
+        Args:
+            driver: Running WebDriver (WhatsApp Web already loaded)
+            launch: launch() -> new WebDriver (setup_driver, same SESSION_DIR profile)
+            load: load(driver) waits until WhatsApp Web is ready (wait_for_whatsapp_load)
+            on_recovering: Optional callback when a recovery starts (campaign paused)
+            on_recovered: Optional callback(seconds) when the new session is ready
+        """
+        self.driver = driver
+        self.launch = launch
+        self.load = load
+        self.on_recovering = on_recovering
+        self.on_recovered = on_recovered
+        self.consecutive_errors = 0
+        self.recoveries = 0
+        self.last_reason = None
+        self._last_probe = time.monotonic()
+
+    # ========================================================================
+    # HEALTH
+    # ========================================================================
+    def probe(self, timeout: float = None) -> bool:
+        """
+        Liveness probe: a trivial script must return within timeout
+
+        Runs in a helper thread so a hung session cannot block the caller.
+
+        Args:
+            timeout: Seconds (default config.WATCHDOG_PROBE_TIMEOUT)
+
+        Returns:
+            True if the session answered
+        """
+        timeout = config.WATCHDOG_PROBE_TIMEOUT if timeout is None else timeout
+        self._last_probe = time.monotonic()
+        result = {}
+
+        def _run():
+            try:
+                result['ok'] = self.driver.execute_script("return 1") == 1
+            except Exception:
+                result['ok'] = False
+
+        worker = threading.Thread(target=_run, daemon=True)
+        worker.start()
+        worker.join(timeout)
+        return result.get('ok', False)
+
+    def probe_due(self) -> bool:
+        return time.monotonic() - self._last_probe >= config.WATCHDOG_PROBE_INTERVAL
+
+    # ========================================================================
+    # RECOVERY
+    # ========================================================================
+    def _quit_old(self):
+        """Quit the old driver without waiting on a hung session"""
+        old = self.driver
+        if old is None:
+            return
+        worker = threading.Thread(target=lambda: _quietly(old.quit), daemon=True)
+        worker.start()
+        worker.join(config.WATCHDOG_PROBE_TIMEOUT)
+
+    def recover(self, reason: str) -> float:
+        """
+        Replace the session: quit, relaunch with the same profile, reload WhatsApp
+
+        Args:
+            reason: Why the session is considered dead (for the log)
+
+        Returns:
+            Recovery time in seconds
+
+        Raises:
+            The last launch/load error after config.WATCHDOG_MAX_RELAUNCHES attempts
+        """
+        utils.log_message(f"Driver watchdog: {reason}; restarting Chrome session", "WARNING")
+        self.last_reason = reason
+        if self.on_recovering:
+            self.on_recovering()
+        started = time.monotonic()
+        self._quit_old()
+        self.driver = None
+
+        for attempt in range(1, config.WATCHDOG_MAX_RELAUNCHES + 1):
+            try:
+                self.driver = self.launch()
+                self.load(self.driver)
+                break
+            except Exception as e:
+                utils.log_message(f"Relaunch attempt {attempt} failed: {e}", "ERROR")
+                if self.driver is not None:
+                    self._quit_old()
+                    self.driver = None
+                if attempt == config.WATCHDOG_MAX_RELAUNCHES:
+                    raise
+                # The old Chrome may still hold the profile lock
+                time.sleep(config.RETRY_DELAY * attempt)
+
+        elapsed = time.monotonic() - started
+        self.recoveries += 1
+        self.consecutive_errors = 0
+        self._last_probe = time.monotonic()
+        utils.log_message(f"Driver watchdog: session recovered in {elapsed:.1f}s", "INFO")
+        if self.on_recovered:
+            self.on_recovered(elapsed)
+        return elapsed
+
+    # ========================================================================
+    # GUARDED SEND
+    # ========================================================================
+    def send(self, send: Callable, contact: Dict) -> str:
+        """
+        Send through the current driver, recovering the session if it died
+
+        A driver error is followed by an immediate probe; a dead session (or
+        WATCHDOG_MAX_DRIVER_ERRORS errors in a row on a live one) is recovered
+        and the same contact is sent again on the new session.
+
+        Args:
+            send: send(driver, contact) -> retry_queue outcome
+            contact: Contact to send to
+
+        Returns:
+            Outcome of the (last) attempt
+        """
+        if self.probe_due() and not self.probe():
+            self.recover("liveness probe failed")
+
+        outcome = send(self.driver, contact)
+        if outcome != retry_queue.DRIVER_ERROR:
+            self.consecutive_errors = 0
+            return outcome
+
+        self.consecutive_errors += 1
+        if not self.probe():
+            reason = "session not responding"
+        elif self.consecutive_errors >= config.WATCHDOG_MAX_DRIVER_ERRORS:
+            reason = f"{self.consecutive_errors} driver errors in a row"
+        else:
+            return outcome
+
+        self.recover(reason)
+        # Resume from the contact that failed
+        outcome = send(self.driver, contact)
+        if outcome != retry_queue.DRIVER_ERROR:
+            self.consecutive_errors = 0
+        return outcome
+
+def _quietly(fn: Callable):
+    try:
+        fn()
+    except Exception:
+        pass
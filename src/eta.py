@@ -0,0 +1,128 @@
+"""
+Velo Bot ETA
+Live time-to-finish estimate: configured delays and the exact auto-pause
+windows still ahead, plus a moving average of the measured time each send
+takes. Constant time per update, so it can be recomputed on every tick.
+"""
+
+import math
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Optional
+
+from . import config
+from . import utils
+from .campaign_planner import ScheduleSettings
+
+# seconds - expected time to finish; low / high - confidence range
+Eta = namedtuple('Eta', ['seconds', 'low', 'high'])
+
+class EtaEstimator:
+    """
+    Estimates the remaining run time of a campaign
+
+    A contact's cycle is its send (opening the chat, typing, sending) followed
+    by the configured delay. The delay part is known from the settings, so only
+    the send part is learned, as an exponentially weighted moving average (and
+    variance) of observed send times.
+    """
+
+    def __init__(self, settings: ScheduleSettings, smoothing: float = None,
+                 z: float = None):
+        """
+        Args:
+            settings: Delay and pause settings of the run
+            smoothing: EWMA factor (default config.ETA_SMOOTHING)
+            z: z-score of the confidence range (default config.ETA_CONFIDENCE_Z)
+        """
+        self.settings = settings
+        self.smoothing = config.ETA_SMOOTHING if smoothing is None else smoothing
+        self.z = config.ETA_CONFIDENCE_Z if z is None else z
+        # Prior until the first send is measured: the planning estimate
+        self.send_mean = float(settings.send_seconds)
+        self.send_var = (settings.send_seconds / 2) ** 2
+        self.observed = 0
+
+    def observe(self, send_seconds: float):
+        """
+        Feed the measured duration of one send
+
+        Args:
+            send_seconds: Time the send took, excluding delays and pauses
+        """
+        if self.observed == 0:
+            self.send_mean = float(send_seconds)
+        else:
+            a = self.smoothing
+            diff = send_seconds - self.send_mean
+            self.send_mean += a * diff
+            self.send_var = (1 - a) * (self.send_var + a * diff * diff)
+        self.observed += 1
+
+    def pause_windows(self, remaining: int, batch_sent: int) -> int:
+        """
+        Auto-pauses still ahead, assuming every remaining send succeeds
+
+        Args:
+            remaining: Contacts left to send
+            batch_sent: Successful sends since the last pause
+
+        Returns:
+            Number of pauses (never after the last contact)
+        """
+        limit = self.settings.pause_limit
+        if limit <= 0 or remaining <= 1:
+            return 0
+        return (batch_sent + remaining - 1) // limit - batch_sent // limit
+
+    def estimate(self, remaining: int, next_number: int, batch_sent: int = 0,
+                 wait_left: float = 0.0) -> Eta:
+        """
+        Remaining run time
+
+        Args:
+            remaining: Contacts left to send
+            next_number: Message number (1-based) of the next contact, for warm-up
+            batch_sent: Successful sends since the last pause
+            wait_left: Seconds left of the delay or pause currently running
+
+        Returns:
+            Eta in seconds with its confidence range
+        """
+        if remaining <= 0:
+            return Eta(0.0, 0.0, 0.0)
+        s = self.settings
+        gaps = remaining - 1
+        mean_gap = float(s.base_delay)
+        jitter_var = 0.0
+        warmup = 0
+        if not s.fixed_delay:
+            mean_gap += (s.jitter_min + s.jitter_max) / 2
+            jitter_var = (s.jitter_max - s.jitter_min) ** 2 / 12
+            # Gaps after message numbers next_number .. next_number + gaps - 1
+            warmup = max(0, min(s.warmup_count - 1, next_number + gaps - 1) - next_number + 1)
+
+        seconds = (wait_left
+                   + remaining * self.send_mean
+                   + gaps * mean_gap
+                   + warmup * s.warmup_delay
+                   + self.pause_windows(remaining, batch_sent) * s.resume_hours * 3600)
+
+        # Per-send noise plus the uncertainty of the mean itself, which does
+        # not average out over the remaining contacts
+        effective = min(max(self.observed, 1), (2 - self.smoothing) / self.smoothing)
+        variance = (remaining * self.send_var
+                    + remaining ** 2 * self.send_var / effective
+                    + gaps * jitter_var)
+        spread = self.z * math.sqrt(variance)
+        return Eta(seconds, max(wait_left, seconds - spread), seconds + spread)
+
+def describe(eta: Eta, now: Optional[datetime] = None) -> str:
+    """Dashboard text such as "ETA 15:40 (15:10–16:20) · 2h 5m left" """
+    now = now or datetime.now()
+    finish = now + timedelta(seconds=eta.seconds)
+    low = now + timedelta(seconds=eta.low)
+    high = now + timedelta(seconds=eta.high)
+    fmt = "%H:%M" if eta.high < 86400 else "%d %b %H:%M"
+    return (f"ETA {finish:{fmt}} ({low:{fmt}}–{high:{fmt}}) · "
+            f"{utils.format_duration(eta.seconds)} left")
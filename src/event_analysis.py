@@ -0,0 +1,160 @@
+"""
+Velo Bot Event Analysis
+Summarizes event_log JSON-lines files: throughput (excluding pauses),
+failure classes and per-stage latency percentiles.
+
+Usage:
+    python -m src.event_analysis [events.jsonl ...]   (default: config.EVENT_LOG_FILE and its rotations)
+"""
+
+import json
+import sys
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from . import event_log
+from . import results_report
+from . import retry_queue
+
+PERCENTILES = (50, 90, 95, 99)
+
+# ============================================================================
+# READING
+# ============================================================================
+def read_records(paths: Iterable) -> Iterable[Dict]:
+    """Records of the given files in order (malformed lines are skipped)"""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # torn last line of a crashed run
+                if isinstance(record, dict) and 'kind' in record:
+                    yield record
+
+def percentile(values: List[float], p: float) -> float:
+    """p-th percentile with linear interpolation (values need not be sorted)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+# ============================================================================
+# SUMMARY
+# ============================================================================
+def summarize(records: Iterable[Dict]) -> Dict:
+    """
+    Aggregate event records
+
+    Returns:
+        Dict with runs, attempts, sent, failed, retried, restarts,
+        active_seconds, per_hour, failure_classes (attempt outcomes),
+        final_failures and latency (stage -> {count, p50.., max})
+    """
+    runs = {}                      # run -> [first ts, last ts, paused seconds, paused at]
+    latencies = {stage: [] for stage in (*results_report.STAGES, 'total')}
+    attempts = sent = failed = retried = restarts = 0
+    failure_classes, final_failures = Counter(), Counter()
+
+    for record in records:
+        kind = record['kind']
+        run = record.get('run')
+        if run is not None:
+            try:
+                ts = datetime.fromisoformat(record['ts'])
+            except (KeyError, TypeError, ValueError):
+                ts = None
+            if ts is not None:
+                span = runs.setdefault(run, [ts, ts, 0.0, None])
+                span[1] = max(span[1], ts)
+                if kind == event_log.PAUSE and span[3] is None:
+                    span[3] = ts
+                elif kind in (event_log.RESUME, event_log.CAMPAIGN_END) and span[3] is not None:
+                    span[2] += (ts - span[3]).total_seconds()
+                    span[3] = None
+
+        if kind == event_log.STAGE_TIMINGS:
+            attempts += 1
+            if record.get('outcome') != retry_queue.SENT:
+                failure_classes[record.get('outcome')] += 1
+            stages = record.get('stages') or {}
+            for stage, seconds in stages.items():
+                latencies.setdefault(stage, []).append(seconds)
+            if stages:
+                latencies['total'].append(sum(stages.values()))
+        elif kind == event_log.OUTCOME:
+            if record.get('outcome') == retry_queue.SENT:
+                sent += 1
+            elif record.get('queued'):
+                retried += 1
+            else:
+                failed += 1
+                final_failures[record.get('outcome')] += 1
+        elif kind == event_log.DRIVER_RESTART:
+            restarts += 1
+
+    # A run still paused at its last record: the pause is not active time
+    active = sum(max((last - first).total_seconds() - paused
+                     - ((last - paused_at).total_seconds() if paused_at else 0), 0)
+                 for first, last, paused, paused_at in runs.values())
+    latency = {}
+    for stage, values in latencies.items():
+        if values:
+            latency[stage] = {'count': len(values), 'max': max(values),
+                              **{f"p{p}": percentile(values, p) for p in PERCENTILES}}
+    return {
+        'runs': len(runs),
+        'attempts': attempts,
+        'sent': sent,
+        'failed': failed,
+        'retried': retried,
+        'restarts': restarts,
+        'active_seconds': active,
+        'per_hour': sent * 3600 / active if active else 0.0,
+        'failure_classes': dict(failure_classes),
+        'final_failures': dict(final_failures),
+        'latency': latency,
+    }
+
+def format_summary(summary: Dict) -> str:
+    """Console report of summarize()"""
+    lines = [
+        f"Runs: {summary['runs']}   Attempts: {summary['attempts']}   "
+        f"Sent: {summary['sent']}   Failed: {summary['failed']}   "
+        f"Queued for retry: {summary['retried']}   Driver restarts: {summary['restarts']}",
+        f"Throughput: {summary['per_hour']:.1f} sent/hour over "
+        f"{summary['active_seconds'] / 3600:.2f} active hours (pauses excluded)",
+        "",
+        "Failure classes (per attempt / final):",
+    ]
+    classes = sorted(set(summary['failure_classes']) | set(summary['final_failures']), key=str)
+    for outcome in classes:
+        lines.append(f"  {retry_queue.describe(outcome):<16} "
+                     f"{summary['failure_classes'].get(outcome, 0):>6} / "
+                     f"{summary['final_failures'].get(outcome, 0)}")
+    if not classes:
+        lines.append("  none")
+    lines += ["", "Latency (seconds):",
+              f"  {'stage':<9}{'count':>7}" + "".join(f"{'p' + str(p):>8}" for p in PERCENTILES)
+              + f"{'max':>8}"]
+    for stage, stats in summary['latency'].items():
+        lines.append(f"  {stage:<9}{stats['count']:>7}"
+                     + "".join(f"{stats[f'p{p}']:>8.2f}" for p in PERCENTILES)
+                     + f"{stats['max']:>8.2f}")
+    return "\n".join(lines)
+
+def main(argv: List[str] = None):
+    paths = [Path(p) for p in (sys.argv[1:] if argv is None else argv)] or event_log.rotated_files()
+    if not paths:
+        print("No event log found.")
+        return
+    print(format_summary(summarize(read_records(paths))))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Velo Bot Event Log
+Structured campaign event stream: typed records (load, prepared, send start,
+stage timings, outcome, pause, resume, driver restart, ...) handed to
+subscribers and appended to a size-rotated JSON-lines file by a background
+writer, so emitting never waits on the disk. event_analysis summarizes the
+files.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import config
+from . import utils
+from . import campaign_runner
+
+# ============================================================================
+# RECORD KINDS
+# ============================================================================
+LOAD = "load"                      # spreadsheet loaded: source, rows, columns
+PREPARED = "prepared"              # contacts prepared: contacts, skipped
+CAMPAIGN_START = "campaign_start"  # index, total
+SEND_START = "send_start"          # row, phone, number, retry
+STAGE_TIMINGS = "stage_timings"    # row, attempt outcome, stage -> seconds, confirmation
+OUTCOME = "outcome"                # row, outcome, retry, queued (final result of a try)
+PAUSE = "pause"                    # reason, resume_in
+RESUME = "resume"                  # reason
+RETRY_PASS = "retry_pass"          # pending
+DRIVER_RESTART = "driver_restart"  # reason, seconds, restarts
+CAMPAIGN_END = "campaign_end"      # completed, success, failed, confirmations
+
+KINDS = (LOAD, PREPARED, CAMPAIGN_START, SEND_START, STAGE_TIMINGS, OUTCOME, PAUSE,
+         RESUME, RETRY_PASS, DRIVER_RESTART, CAMPAIGN_END)
+
+_STOP = object()
+
+def rotated_files(path=None) -> List[Path]:
+    """Existing files of a rotated event log, oldest first"""
+    path = Path(config.EVENT_LOG_FILE if path is None else path)
+    backups = [p for p in path.parent.glob(path.name + ".*") if p.suffix[1:].isdigit()]
+    backups.sort(key=lambda p: int(p.suffix[1:]), reverse=True)
+    return backups + ([path] if path.exists() else [])
+
+# ============================================================================
+# SINK
+# ============================================================================
+class EventLog:
+    """
+    Typed event records -> subscribers + rotating JSON-lines file
+
+    emit() may be called from any thread; records are queued and written
+    (and delivered to subscribers) in order on one background thread.
+    """
+
+    def __init__(self, path=None, max_bytes: int = None, backups: int = None,
+                 enabled: bool = None):
+        """
+        Args:
+            path: JSON-lines file (default config.EVENT_LOG_FILE)
+            max_bytes: Rotate once the file would exceed this (default config.EVENT_LOG_MAX_MB)
+            backups: Rotated files kept as <path>.1 ... <path>.N (default config.EVENT_LOG_BACKUPS)
+            enabled: Write the file (default config.EVENT_LOG_ENABLED); subscribers
+                are notified either way
+        """
+        self.path = Path(config.EVENT_LOG_FILE if path is None else path)
+        self.max_bytes = config.EVENT_LOG_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        self.backups = config.EVENT_LOG_BACKUPS if backups is None else backups
+        self.enabled = config.EVENT_LOG_ENABLED if enabled is None else enabled
+        self._subscribers: List[Callable[[Dict], None]] = []
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._file = None
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> "EventLog":
+        """Add callback(record); called on the writer thread, in order"""
+        self._subscribers.append(callback)
+        return self
+
+    def emit(self, kind: str, **fields):
+        """Queue a record {"ts", "kind", **fields} (never blocks on I/O)"""
+        record = {'ts': datetime.now().isoformat(timespec='milliseconds'), 'kind': kind}
+        record.update(fields)
+        self._ensure_writer()
+        self._queue.put(record)
+
+    def attach(self, runner) -> "EventLog":
+        """Record a CampaignRunner's events, tagged with a run id"""
+        run = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        runner.subscribe(lambda event: self._observe(run, event))
+        return self
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until everything emitted so far is written"""
+        done = threading.Event()
+        self._ensure_writer()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self, timeout: float = 5.0):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # Campaign events -> records
+    # ------------------------------------------------------------------
+    def _observe(self, run: str, event):
+        if isinstance(event, campaign_runner.Started):
+            self.emit(CAMPAIGN_START, run=run, index=event.index, total=event.total)
+        elif isinstance(event, campaign_runner.Sending):
+            self.emit(SEND_START, run=run, **_contact(event.contact),
+                      number=event.number, retry=event.retry)
+        elif isinstance(event, campaign_runner.Attempted):
+            self.emit(STAGE_TIMINGS, run=run, **_contact(event.contact), outcome=event.outcome,
+                      stages={k: round(v, 3) for k, v in event.stages.items() if v is not None},
+                      confirmation=event.confirmation, retry=event.retry)
+        elif isinstance(event, campaign_runner.Sent):
+            self.emit(OUTCOME, run=run, **_contact(event.contact), outcome="sent",
+                      retry=event.retry, queued=False, confirmation=event.confirmation)
+        elif isinstance(event, campaign_runner.Failed):
+            self.emit(OUTCOME, run=run, **_contact(event.contact), outcome=event.outcome,
+                      retry=event.retry, queued=event.queued)
+        elif isinstance(event, campaign_runner.Paused):
+            self.emit(PAUSE, run=run, reason=event.reason, resume_in=event.resume_in)
+        elif isinstance(event, campaign_runner.Resumed):
+            self.emit(RESUME, run=run, reason=event.reason)
+        elif isinstance(event, campaign_runner.RetryPass):
+            self.emit(RETRY_PASS, run=run, pending=event.pending)
+        elif isinstance(event, campaign_runner.Finished):
+            self.emit(CAMPAIGN_END, run=run, completed=event.completed, success=event.success,
+                      failed=event.failed, confirmations=event.confirmations)
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                if isinstance(item, threading.Event):
+                    if self._file is not None:
+                        self._file.flush()
+                    item.set()
+                    continue
+                self._write(item)
+                for callback in self._subscribers:
+                    try:
+                        callback(item)
+                    except Exception as e:
+                        utils.log_message(f"Event subscriber failed on {item['kind']}: {e}", "WARNING")
+                if self._queue.empty() and self._file is not None:
+                    self._file.flush()
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write(self, record: Dict):
+        if not self.enabled:
+            return
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8")
+            size = self._file.tell()
+            if size and size + len(line.encode("utf-8")) > self.max_bytes:
+                self._rotate()
+            self._file.write(line)
+        except OSError as e:
+            utils.log_message(f"Could not write event log {self.path}: {e}", "WARNING")
+
+    def _rotate(self):
+        """events.jsonl -> .1 -> .2 ... (the oldest beyond `backups` is dropped)"""
+        self._file.close()
+        self._file = None
+        for n in range(self.backups, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{n}")
+            newer = self.path.with_name(f"{self.path.name}.{n - 1}") if n > 1 else self.path
+            if newer.exists():
+                os.replace(newer, older)
+        if self.backups <= 0:
+            self.path.unlink(missing_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+def _contact(contact: Dict) -> Dict:
+    return {'row': contact.get('original_row'), 'phone': contact.get('phone')}
+
+# ============================================================================
+# DEFAULT STREAM
+# ============================================================================
+_default: Optional[EventLog] = None
+
+def events() -> EventLog:
+    """The process-wide event log (config.EVENT_LOG_FILE)"""
+    global _default
+    if _default is None:
+        _default = EventLog()
+    return _default
+
+def emit(kind: str, **fields):
+    """Shortcut for events().emit()"""
+    events().emit(kind, **fields)
+
+def subscribe(callback: Callable[[Dict], None]) -> EventLog:
+    """Shortcut for events().subscribe()"""
+    return events().subscribe(callback)
@@ -0,0 +1,256 @@
+"""
+Velo Bot Metrics Server
+Opt-in localhost endpoint exposing campaign telemetry in the Prometheus text
+format: counters, per-stage send latency histograms, queue depth, pause
+state and driver / process memory. The send loop publishes an immutable
+snapshot after each event; scrapes only read the latest one, so they never
+wait on the campaign.
+"""
+
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from . import config
+from . import utils
+from . import results_report
+from . import retry_queue
+from . import send_confirmation
+from . import campaign_runner
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# ============================================================================
+# COLLECTOR
+# ============================================================================
+class CampaignMetrics:
+    """
+    Campaign observer that keeps the numbers behind /metrics
+
+    Counters are cumulative for the life of the process, across campaigns;
+    gauges describe the campaign attached last. Updated on the runner's
+    thread only; readers use .snapshot (a dict that is replaced, never
+    mutated).
+    """
+
+    def __init__(self, buckets=None):
+        """
+        Args:
+            buckets: Histogram upper bounds in seconds (default config.METRICS_LATENCY_BUCKETS)
+        """
+        self.buckets = tuple(config.METRICS_LATENCY_BUCKETS if buckets is None else buckets)
+        self.runner = None
+        self._attempts = {}                          # outcome -> count
+        self._confirmations = dict.fromkeys(send_confirmation.STATES, 0)
+        self._sent = self._failed = 0
+        self._stage_counts = {stage: [0] * len(self.buckets) for stage in results_report.STAGES}
+        self._stage_totals = {stage: [0, 0.0] for stage in results_report.STAGES}  # count, sum
+        self._restarts_before = 0                    # driver restarts of earlier campaigns
+        self._restarts_seen = 0
+        self._running = False
+        self.snapshot: Dict = {}
+        self._publish()
+
+    def attach(self, runner) -> "CampaignMetrics":
+        """Follow a new campaign (subscribes to its events)"""
+        self._restarts_before += self._restarts_seen
+        self._restarts_seen = 0
+        self.runner = runner
+        runner.subscribe(self.observe)
+        self._publish()
+        return self
+
+    # ------------------------------------------------------------------
+    def observe(self, event):
+        """CampaignRunner observer (runner thread)"""
+        if isinstance(event, campaign_runner.Started):
+            self._running = True
+        elif isinstance(event, campaign_runner.Attempted):
+            self._attempts[event.outcome] = self._attempts.get(event.outcome, 0) + 1
+            for stage, seconds in event.stages.items():
+                if stage in self._stage_counts and seconds is not None:
+                    self._observe_latency(stage, seconds)
+        elif isinstance(event, campaign_runner.Sent):
+            self._sent += 1
+            if event.confirmation in self._confirmations:
+                self._confirmations[event.confirmation] += 1
+        elif isinstance(event, campaign_runner.Failed):
+            if not event.queued:
+                self._failed += 1
+        elif isinstance(event, campaign_runner.Finished):
+            self._running = False
+        elif not isinstance(event, (campaign_runner.Paused, campaign_runner.Resumed,
+                                    campaign_runner.RetryPass)):
+            return  # countdown ticks change nothing exposed here
+        self._publish()
+
+    def _observe_latency(self, stage: str, seconds: float):
+        counts = self._stage_counts[stage]
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                counts[i] += 1
+                break
+        totals = self._stage_totals[stage]
+        totals[0] += 1
+        totals[1] += seconds
+
+    def _publish(self):
+        """Replace the snapshot (a single reference assignment)"""
+        runner = self.runner
+        watchdog = getattr(runner.transport, 'watchdog', None) if runner else None
+        if watchdog is not None:
+            self._restarts_seen = watchdog.recoveries
+        monitor = getattr(runner.transport, 'monitor', None) if runner else None
+        histograms = {}
+        for stage, counts in self._stage_counts.items():
+            cumulative, running = [], 0
+            for count in counts:
+                running += count
+                cumulative.append(running)
+            histograms[stage] = (tuple(cumulative), *self._stage_totals[stage])
+        self.snapshot = {
+            'sent': self._sent,
+            'failed': self._failed,
+            'attempts': dict(self._attempts),
+            'confirmations': dict(self._confirmations),
+            'histograms': histograms,
+            'contacts': len(runner.contacts) if runner else 0,
+            'remaining': max(len(runner.contacts) - runner.index, 0) if runner else 0,
+            'retry_depth': len(runner.retries) if runner else 0,
+            'running': self._running,
+            'paused': bool(runner and runner.is_paused),
+            'restarts': self._restarts_before + self._restarts_seen,
+            'monitor': monitor,
+        }
+
+# ============================================================================
+# EXPOSITION
+# ============================================================================
+def _process_rss() -> Optional[int]:
+    """Resident memory of this process (/proc, psutil fallback)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+def _bound(value: float) -> str:
+    return f"{value:g}"
+
+def render(snapshot: Dict, buckets) -> str:
+    """Prometheus text exposition of a CampaignMetrics snapshot"""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{labels} {value}")
+
+    metric("velo_messages_sent_total", "counter", "Messages sent.",
+           [("", snapshot['sent'])])
+    metric("velo_messages_failed_total", "counter", "Contacts given up on.",
+           [("", snapshot['failed'])])
+    metric("velo_send_attempts_total", "counter", "Send attempts by outcome.",
+           [(f'{{outcome="{outcome}"}}', snapshot['attempts'].get(outcome, 0))
+            for outcome in (retry_queue.SENT, *retry_queue.REASONS)])
+    metric("velo_send_confirmations_total", "counter", "Sent messages by confirmation state.",
+           [(f'{{state="{state}"}}', count) for state, count in snapshot['confirmations'].items()])
+
+    samples = []
+    for stage, (cumulative, count, total) in snapshot['histograms'].items():
+        for bound, value in zip(buckets, cumulative):
+            samples.append((f'_bucket{{stage="{stage}",le="{_bound(bound)}"}}', value))
+        samples.append((f'_bucket{{stage="{stage}",le="+Inf"}}', count))
+        samples.append((f'_sum{{stage="{stage}"}}', f"{total:.6f}"))
+        samples.append((f'_count{{stage="{stage}"}}', count))
+    metric("velo_send_stage_seconds", "histogram", "Send latency per stage.", samples)
+
+    metric("velo_campaign_contacts", "gauge", "Contacts in the current campaign.",
+           [("", snapshot['contacts'])])
+    metric("velo_queue_remaining", "gauge", "Contacts not yet attempted.",
+           [("", snapshot['remaining'])])
+    metric("velo_retry_queue_depth", "gauge", "Contacts waiting for a retry.",
+           [("", snapshot['retry_depth'])])
+    metric("velo_campaign_running", "gauge", "1 while a campaign is running.",
+           [("", int(snapshot['running']))])
+    metric("velo_campaign_paused", "gauge", "1 while the campaign is paused.",
+           [("", int(snapshot['paused']))])
+    metric("velo_driver_restarts_total", "counter", "Chrome sessions relaunched or recycled.",
+           [("", snapshot['restarts'])])
+
+    monitor = snapshot['monitor']
+    sample = monitor.latest() if monitor is not None else None
+    if sample is not None:
+        metric("velo_browser_memory_bytes", "gauge", "Resident memory of chromedriver and Chrome.",
+               [("", sample.rss_bytes)])
+        metric("velo_browser_handles", "gauge", "Open handles of the browser process tree.",
+               [("", sample.handles)])
+        metric("velo_browser_cpu_percent", "gauge", "CPU use of the browser process tree.",
+               [("", f"{sample.cpu_percent:.1f}")])
+    rss = _process_rss()
+    if rss is not None:
+        metric("velo_process_memory_bytes", "gauge", "Resident memory of the bot process.",
+               [("", rss)])
+    return "\n".join(lines) + "\n"
+
+# ============================================================================
+# HTTP SERVER
+# ============================================================================
+class MetricsServer:
+    """GET /metrics on a daemon thread (ThreadingHTTPServer)"""
+
+    def __init__(self, metrics: CampaignMetrics, host: str = None, port: int = None):
+        """
+        Args:
+            metrics: Collector to expose
+            host: Bind address (default config.METRICS_HOST, localhost)
+            port: TCP port (default config.METRICS_PORT; 0 picks a free one)
+        """
+        self.metrics = metrics
+        self.host = config.METRICS_HOST if host is None else host
+        self.port = config.METRICS_PORT if port is None else port
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self) -> "MetricsServer":
+        """Bind and serve (raises OSError if the port is taken)"""
+        metrics = self.metrics
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render(metrics.snapshot, metrics.buckets).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # one line per scrape would flood the bot log
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="metrics-server",
+                         daemon=True).start()
+        utils.log_message(f"Metrics endpoint serving {self.url}", "INFO")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
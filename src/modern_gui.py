@@ -10,14 +10,32 @@ import tkinter as tk
 from tkinter import messagebox, filedialog
 import threading
 import json
-import random
-import time as time_module
+import math
 from datetime import datetime
 from pathlib import Path
 
 from . import config
-from . import data_processor
-from .whatsapp_bot import setup_driver, wait_for_whatsapp_load, send_message
+from . import column_detector
+from . import templates
+from . import sheets_fetcher
+from . import contact_cache
+from . import campaign_identity
+from . import campaign_refresh
+from . import campaign_planner
+from . import eta
+from .background import BackgroundTask
+from .preview_grid import PreviewGrid
+from . import retry_queue
+from . import resource_monitor
+from . import results_report
+from . import campaign_runner
+from . import send_confirmation
+from . import profile_maintenance
+from . import profiling
+from . import stall_detector
+from . import metrics_server
+from . import event_log
+from .whatsapp_bot import SeleniumTransport
 
 # ─── Theme ───────────────────────────────────────────────────────────────────
 ctk.set_appearance_mode("Dark")
@@ -39,17 +57,22 @@ class AutoBlastApp(ctk.CTk):
 
         # ── Bot State ────────────────────────────────────────────────────────
         self.df = None
+        self._source = None             # path or Sheets URL of the loaded data
+        self._source_digest = None      # content hash of the loaded file (contact cache key)
+        self._campaign = None           # campaign identity record (saved with progress)
+        self._refresher = None          # row hashes of the campaign source (Refresh Source)
         self.contacts: list = []
         self.failed_contacts: list = []
-        self.driver = None
+        self._retry_queue = retry_queue.RetryQueue()   # transient failures, retried after the main pass
+        self._runner = None             # CampaignRunner of the running campaign
+        self._transport = None          # its Chrome session (watchdog + resource monitor)
+        self._results_file = None       # results CSV (saved with progress, appended on resume)
         self.is_running = False
         self.is_paused = False
         self.current_index = 0
-        self._session_success = 0       # per-run success counter for auto-pause
 
-        # ── Auto-resume ──────────────────────────────────────────────────────
-        self._auto_resume_cancel = threading.Event()
-        self._auto_resume_thread = None
+        # ── Background load (file / Google Sheets) ──────────────────────────
+        self._load_task = None
 
         # ── Progress file ────────────────────────────────────────────────────
         self.progress_file = Path(__file__).parent / "progress_gui.json"
@@ -70,10 +93,30 @@ class AutoBlastApp(ctk.CTk):
         # ── Campaign start row (1-based, user-settable) ──────────────────────
         self.v_start_row     = tk.IntVar(value=1)
 
+        # ── Browser ──────────────────────────────────────────────────────────
+        self.v_lean_chrome   = tk.BooleanVar(value=config.CHROME_LEAN_MODE)
+        self._profile_task   = None     # background profile size / prune job
+
+        # ── Diagnostics (cProfile + tracemalloc, off by default) ─────────────
+        self.v_profiling     = tk.BooleanVar(value=False)
+        self._profiler       = profiling.Profiler()
+
+        # ── Metrics endpoint (Prometheus text, localhost, opt-in) ────────────
+        self.v_metrics       = tk.BooleanVar(value=config.METRICS_ENABLED)
+        self._metrics        = metrics_server.CampaignMetrics()
+        self._metrics_server = None
+
         # ── UI ───────────────────────────────────────────────────────────────
         self._build_layout()
         self._check_resume_on_startup()
 
+        # ── Event-loop stall detector (heartbeat lag → Dashboard + log) ──────
+        self._stalls = stall_detector.StallDetector(
+            self.after, on_change=self._draw_stalls)
+        self._stalls.start()
+        if self.v_metrics.get():
+            self._toggle_metrics()
+
     # ─────────────────────────────────────────────────────────────────────────
     # LAYOUT BUILDER
     # ─────────────────────────────────────────────────────────────────────────
@@ -174,7 +217,22 @@ class AutoBlastApp(ctk.CTk):
         self._lbl_next = ctk.CTkLabel(
             info, text="Next: Waiting to start...",
             font=ctk.CTkFont(size=13))
-        self._lbl_next.pack(pady=(0, 16))
+        self._lbl_next.pack(pady=(0, 4))
+        self._lbl_eta = ctk.CTkLabel(
+            info, text="ETA --", text_color="#9CA3AF",
+            font=ctk.CTkFont(size=12))
+        self._lbl_eta.pack(pady=(0, 4))
+        self._lbl_resources = ctk.CTkLabel(
+            info, text="Chrome: --", text_color="#9CA3AF",
+            font=ctk.CTkFont(size=11))
+        self._lbl_resources.pack()
+        self._res_chart = tk.Canvas(info, height=36, bg="#2B2B2B",
+                                    highlightthickness=0)
+        self._res_chart.pack(fill="x", padx=16, pady=(2, 4))
+        self._lbl_stalls = ctk.CTkLabel(
+            info, text="UI stalls: 0", text_color="#9CA3AF",
+            font=ctk.CTkFont(size=11))
+        self._lbl_stalls.pack(pady=(0, 12))
 
         # ── Log console ──────────────────────────────────────────────────────
         log_f = ctk.CTkFrame(f)
@@ -191,7 +249,7 @@ class AutoBlastApp(ctk.CTk):
         # ── Control buttons ──────────────────────────────────────────────────
         ctrl = ctk.CTkFrame(f, fg_color="transparent")
         ctrl.grid(row=3, column=0, sticky="ew")
-        ctrl.grid_columnconfigure((0, 1, 2, 3), weight=1)
+        ctrl.grid_columnconfigure((0, 1, 2, 3, 4), weight=1)
 
         self._btn_start = ctk.CTkButton(
             ctrl, text="▶  START", height=46,
@@ -219,7 +277,14 @@ class AutoBlastApp(ctk.CTk):
             font=ctk.CTkFont(size=13),
             fg_color="#475569", hover_color="#334155",
             command=self._export_failed)
-        self._btn_export.grid(row=0, column=3, sticky="ew")
+        self._btn_export.grid(row=0, column=3, sticky="ew", padx=(0, 6))
+
+        self._btn_refresh = ctk.CTkButton(
+            ctrl, text="🔄 Refresh Source", height=46,
+            font=ctk.CTkFont(size=13),
+            fg_color="#475569", hover_color="#334155",
+            command=self._refresh_source)
+        self._btn_refresh.grid(row=0, column=4, sticky="ew")
 
     # ═════════════════════════════════════════════════════════════════════════
     # VIEW: CAMPAIGN
@@ -281,25 +346,38 @@ class AutoBlastApp(ctk.CTk):
             text="ℹ️  Spreadsheet harus di-share ke 'Anyone with the link can view' (publik)",
             text_color="#6B7280", font=ctk.CTkFont(size=11))
 
+        # Load progress row (shown while a load is running)
+        self._load_row = ctk.CTkFrame(file_f, fg_color="transparent")
+        self._load_bar = ctk.CTkProgressBar(self._load_row)
+        self._load_bar.pack(side="left", fill="x", expand=True, padx=(0, 8))
+        self._load_bar.set(0)
+        self._lbl_load = ctk.CTkLabel(self._load_row, text="", width=160,
+                                      text_color="#9CA3AF")
+        self._lbl_load.pack(side="left", padx=(0, 8))
+        ctk.CTkButton(self._load_row, text="Cancel", width=80,
+                      fg_color="#7F1D1D", hover_color="#991B1B",
+                      command=self._cancel_load).pack(side="left")
+
         # Spacer below input
-        ctk.CTkFrame(file_f, fg_color="transparent", height=8).pack()
+        self._load_spacer = ctk.CTkFrame(file_f, fg_color="transparent", height=8)
+        self._load_spacer.pack()
 
         # ── Preview table ─────────────────────────────────────────────────────
         prev_f = ctk.CTkFrame(f)
         prev_f.grid(row=1, column=0, sticky="nsew", pady=(0, 12))
         prev_f.grid_rowconfigure(1, weight=1)
         prev_f.grid_columnconfigure(0, weight=1)
-        ctk.CTkLabel(prev_f, text="2. Data Preview (first 5 rows)",
-                     font=ctk.CTkFont(size=14, weight="bold")).grid(
-            row=0, column=0, sticky="w", padx=16, pady=(12, 0))
-        self._preview_scroll = ctk.CTkScrollableFrame(prev_f, height=160)
-        self._preview_scroll.grid(row=1, column=0, sticky="nsew",
-                                   padx=16, pady=(6, 16))
-        self._lbl_preview_placeholder = ctk.CTkLabel(
-            self._preview_scroll,
-            text="No data loaded. Browse and load a file.",
-            text_color="gray")
-        self._lbl_preview_placeholder.pack(pady=20)
+        self._lbl_preview_title = ctk.CTkLabel(
+            prev_f, text="2. Data Preview",
+            font=ctk.CTkFont(size=14, weight="bold"))
+        self._lbl_preview_title.grid(row=0, column=0, sticky="w", padx=16, pady=(12, 0))
+        self._preview_grid = PreviewGrid(
+            prev_f, height=160,
+            scrollbar_factory=lambda m, orient, command: ctk.CTkScrollbar(
+                m, orientation=orient, command=command),
+            placeholder="No data loaded. Browse and load a file.")
+        self._preview_grid.grid(row=1, column=0, sticky="nsew",
+                                padx=16, pady=(6, 16))
 
         # ── Column mapping ────────────────────────────────────────────────────
         map_f = ctk.CTkFrame(f)
@@ -356,12 +434,21 @@ class AutoBlastApp(ctk.CTk):
             side="left", padx=(8, 0))
 
         # ── Start button shortcut ─────────────────────────────────────────────
+        start_f = ctk.CTkFrame(f, fg_color="transparent")
+        start_f.grid(row=4, column=0, sticky="ew", pady=(8, 0))
+        start_f.grid_columnconfigure(0, weight=1)
         ctk.CTkButton(
-            f, text="▶  Start Campaign →", height=44,
+            start_f, text="▶  Start Campaign →", height=44,
             font=ctk.CTkFont(size=14, weight="bold"),
             fg_color="#16A34A", hover_color="#15803D",
             command=self._start_campaign
-        ).grid(row=4, column=0, sticky="ew", pady=(8, 0))
+        ).grid(row=0, column=0, sticky="ew", padx=(0, 6))
+        ctk.CTkButton(
+            start_f, text="🧪 Dry Run", height=44, width=140,
+            font=ctk.CTkFont(size=13),
+            fg_color="#475569", hover_color="#334155",
+            command=self._dry_run
+        ).grid(row=0, column=1)
 
     # ═════════════════════════════════════════════════════════════════════════
     # VIEW: DELAY
@@ -585,8 +672,44 @@ class AutoBlastApp(ctk.CTk):
             f, text="📄  Export Failed Numbers",
             fg_color="#475569", hover_color="#334155",
             command=self._export_failed
+        ).pack(anchor="w", pady=(0, 8))
+
+        ctk.CTkButton(
+            f, text="🧹  Clear Contact Cache",
+            fg_color="#475569", hover_color="#334155",
+            command=self._clear_contact_cache
         ).pack(anchor="w")
 
+        # Browser profile: size, cache pruning, lean launch
+        ctk.CTkLabel(f, text="🌐  Browser",
+                     font=ctk.CTkFont(size=14, weight="bold")).pack(
+            anchor="w", pady=(20, 8))
+        self._lbl_profile = ctk.CTkLabel(f, text="Browser profile: …",
+                                         text_color="#9CA3AF")
+        self._lbl_profile.pack(anchor="w", pady=(0, 8))
+        ctk.CTkButton(
+            f, text="🧽  Prune Browser Cache",
+            fg_color="#475569", hover_color="#334155",
+            command=self._prune_profile
+        ).pack(anchor="w", pady=(0, 8))
+        ctk.CTkSwitch(f, text="Lean Chrome (no extensions, sync, background networking)",
+                      variable=self.v_lean_chrome).pack(anchor="w")
+
+        # Diagnostics
+        ctk.CTkLabel(f, text="🩺  Diagnostics",
+                     font=ctk.CTkFont(size=14, weight="bold")).pack(
+            anchor="w", pady=(20, 8))
+        ctk.CTkSwitch(f, text="Profiling (load, preparation and campaign)",
+                      variable=self.v_profiling,
+                      command=self._toggle_profiling).pack(anchor="w")
+        ctk.CTkLabel(f, text=f"Reports are saved in {config.DIAGNOSTICS_DIR}",
+                     text_color="#9CA3AF").pack(anchor="w", pady=(4, 0))
+        ctk.CTkSwitch(f, text="Metrics endpoint (Prometheus)",
+                      variable=self.v_metrics,
+                      command=self._toggle_metrics).pack(anchor="w", pady=(12, 0))
+        ctk.CTkLabel(f, text=f"Serves http://{config.METRICS_HOST}:{config.METRICS_PORT}/metrics",
+                     text_color="#9CA3AF").pack(anchor="w", pady=(4, 0))
+
     # ─────────────────────────────────────────────────────────────────────────
     # VIEW NAVIGATION
     # ─────────────────────────────────────────────────────────────────────────
@@ -617,7 +740,9 @@ class AutoBlastApp(ctk.CTk):
     def _show_campaign(self):  self._show_view("campaign")
     def _show_delay(self):     self._show_view("delay")
     def _show_antiban(self):   self._show_view("antiban")
-    def _show_settings(self):  self._show_view("settings")
+    def _show_settings(self):
+        self._show_view("settings")
+        self._measure_profile()
 
     # ─────────────────────────────────────────────────────────────────────────
     # FILE OPERATIONS
@@ -633,98 +758,6 @@ class AutoBlastApp(ctk.CTk):
             self._lbl_url_help.pack_forget()
             self._file_input_row.pack(fill="x", padx=16, pady=(0, 8))
 
-    @staticmethod
-    def _sheets_url_to_csv(url: str) -> str:
-        """
-        Convert a Google Sheets share URL to a direct CSV export URL.
-        Supports:
-          - https://docs.google.com/spreadsheets/d/{ID}/edit...
-          - https://docs.google.com/spreadsheets/d/{ID}/pub...
-        Returns the export URL, or raises ValueError if not a valid Sheets URL.
-        """
-        import re
-        m = re.search(r'/spreadsheets/d/([a-zA-Z0-9_-]+)', url)
-        if not m:
-            raise ValueError(
-                "Bukan link Google Sheets yang valid.\n\n"
-                "Format yang benar:\n"
-                "https://docs.google.com/spreadsheets/d/{ID}/edit"
-            )
-        sheet_id = m.group(1)
-        # Preserve gid (sheet tab) if present
-        gid_match = re.search(r'[#&?]gid=(\d+)', url)
-        gid_param = f"&gid={gid_match.group(1)}" if gid_match else ""
-        return (f"https://docs.google.com/spreadsheets/d/{sheet_id}"
-                f"/export?format=csv{gid_param}")
-
-    @staticmethod
-    def _fetch_sheets_csv(csv_url: str):
-        """
-        Fetch a Google Sheets CSV export URL and return a pandas DataFrame.
-        Uses requests with a browser User-Agent so Google doesn't redirect to
-        a login/warning page. Falls back to the gviz endpoint if needed.
-        Raises an exception with a descriptive message on failure.
-        """
-        import re
-        import io
-        import pandas as pd
-
-        HEADERS = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/122.0.0.0 Safari/537.36"
-            ),
-            "Accept": "text/csv,text/plain,*/*",
-        }
-
-        def _try_url(url):
-            try:
-                import requests
-            except ImportError:
-                raise RuntimeError(
-                    "Modul 'requests' tidak terinstall.\n"
-                    "Jalankan:  pip install requests")
-
-            resp = requests.get(url, headers=HEADERS,
-                                allow_redirects=True, timeout=30)
-            resp.raise_for_status()
-
-            ct = resp.headers.get("Content-Type", "")
-            if "html" in ct.lower():
-                # Google sent a login redirect or warning page
-                return None
-            if not resp.content.strip():
-                return None
-
-            return pd.read_csv(io.StringIO(resp.content.decode("utf-8")))
-
-        # Try primary export URL
-        df = _try_url(csv_url)
-        if df is not None:
-            return df
-
-        # Fallback: gviz endpoint (sometimes works when /export doesn't)
-        m = re.search(r'/spreadsheets/d/([a-zA-Z0-9_-]+)', csv_url)
-        if m:
-            gviz_url = (
-                f"https://docs.google.com/spreadsheets/d/{m.group(1)}"
-                f"/gviz/tq?tqx=out:csv"
-            )
-            df = _try_url(gviz_url)
-            if df is not None:
-                return df
-
-        raise RuntimeError(
-            "Google mengembalikan halaman HTML bukan CSV.\n\n"
-            "Kemungkinan penyebab:\n"
-            "• Sheet belum di-share 'Anyone with the link can view'\n"
-            "• Sheet memerlukan login Google\n"
-            "• Sheet kosong\n\n"
-            "Solusi: Buka Google Sheets → Share → "
-            "Change to 'Anyone with the link' → Done"
-        )
-
     def _browse_file(self):
         fn = filedialog.askopenfilename(
             title="Select Excel or CSV file",
@@ -734,7 +767,9 @@ class AutoBlastApp(ctk.CTk):
             self._v_filepath.set(fn)
 
     def _load_file(self):
-        import pandas as pd
+        if self._load_task is not None:
+            messagebox.showinfo("Loading", "A load is already in progress.")
+            return
 
         mode = self._v_input_mode.get()
 
@@ -746,14 +781,13 @@ class AutoBlastApp(ctk.CTk):
                     "Paste link Google Sheets terlebih dahulu.")
                 return
             try:
-                csv_url = self._sheets_url_to_csv(raw_url)
+                csv_url = sheets_fetcher.sheets_url_to_csv(raw_url)
             except ValueError as e:
                 messagebox.showerror("Invalid URL", str(e))
                 return
-            try:
-                self.df = self._fetch_sheets_csv(csv_url)
-                source_label = "Google Sheets"
-            except Exception as e:
+
+            def _on_fetch_error(e):
+                self._end_load()
                 messagebox.showerror(
                     "Gagal Fetch",
                     f"Tidak bisa membaca spreadsheet.\n\n"
@@ -761,7 +795,21 @@ class AutoBlastApp(ctk.CTk):
                     f"• Sheet sudah di-share ke 'Anyone with the link can view'\n"
                     f"• Internet aktif\n\n"
                     f"Error detail:\n{e}")
-                return
+
+            self._begin_load("Downloading sheet…")
+            self._load_task = BackgroundTask(
+                self,
+                self._profiled("load", lambda report, cancel: self._with_detection(
+                    contact_cache.load_spreadsheet(
+                        sheets_fetcher.fetch_sheet_file(csv_url, progress=report,
+                                                        cancel_event=cancel),
+                        cancel_event=cancel))),
+                on_done=lambda loaded: self._on_data_loaded(*loaded, raw_url, "Google Sheets"),
+                on_error=_on_fetch_error,
+                on_progress=self._on_fetch_progress,
+                on_cancel=self._on_load_cancelled,
+            ).start()
+            return
 
         # ── File mode ─────────────────────────────────────────────────────────
         else:
@@ -769,12 +817,38 @@ class AutoBlastApp(ctk.CTk):
             if not fp:
                 messagebox.showwarning("Warning", "Please select a file first!")
                 return
-            try:
-                self.df = data_processor.process_spreadsheet(fp)
-                source_label = Path(fp).name
-            except Exception as e:
+
+            def _on_read_error(e):
+                self._end_load()
                 messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
-                return
+
+            self._begin_load(f"Reading {Path(fp).name}…")
+            self._load_task = BackgroundTask(
+                self,
+                self._profiled("load", lambda report, cancel: self._with_detection(
+                    contact_cache.load_spreadsheet(fp, progress=report, cancel_event=cancel))),
+                on_done=lambda loaded: self._on_data_loaded(*loaded, fp, Path(fp).name),
+                on_error=_on_read_error,
+                on_progress=self._on_rows_progress,
+                on_cancel=self._on_load_cancelled,
+            ).start()
+
+    @staticmethod
+    def _with_detection(loaded):
+        """Rank columns in the worker thread, next to the load itself (no logging here)."""
+        df, source_digest = loaded
+        return df, source_digest, column_detector.pick_columns(column_detector.rank_columns(df))
+
+    def _on_data_loaded(self, df, source_digest: str, chosen: dict,
+                        source: str, source_label: str):
+        """Swap in a freshly loaded DataFrame (Tk thread) and refresh the view."""
+        self._end_load()
+        column_detector.log_detection(chosen)
+        detected = {role: (c.column if c else None) for role, c in chosen.items()}
+        self.df = df
+        self._source = source
+        self._source_digest = source_digest
+        event_log.emit(event_log.LOAD, source=source_label, rows=len(df), columns=len(df.columns))
 
         # ── Common: preview + column mapping ─────────────────────────────────
         try:
@@ -783,36 +857,66 @@ class AutoBlastApp(ctk.CTk):
             self._om_phone.configure(values=cols)
             self._om_name.configure(values=cols)
             self._om_message.configure(values=cols)
-            # Auto-detect columns
-            for c in self.df.columns:
-                cl = c.lower()
-                if any(x in cl for x in config.PHONE_COLUMN_PATTERNS):
-                    self._om_phone.set(c)
-                elif any(x in cl for x in config.NAME_COLUMN_PATTERNS):
-                    self._om_name.set(c)
-                elif any(x in cl for x in config.MESSAGE_COLUMN_PATTERNS):
-                    self._om_message.set(c)
+            # Auto-detected columns (header + sampled content)
+            self._om_phone.set(detected["phone"] or "")
+            self._om_name.set(detected["name"] or "")
+            self._om_message.set(detected["message"] or "")
             messagebox.showinfo("Loaded",
                 f"✅ {len(self.df)} rows loaded from {source_label}!")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to process data:\n{str(e)}")
 
+    # ─────────────────────────────────────────────────────────────────────────
+    # BACKGROUND LOAD PROGRESS
+    # ─────────────────────────────────────────────────────────────────────────
+    def _begin_load(self, text: str):
+        self._load_bar.configure(mode="indeterminate")
+        self._load_bar.start()
+        self._lbl_load.configure(text=text)
+        self._load_row.pack(fill="x", padx=16, pady=(4, 4),
+                            before=self._load_spacer)
+
+    def _end_load(self):
+        self._load_task = None
+        self._load_bar.stop()
+        self._load_row.pack_forget()
+
+    def _cancel_load(self):
+        if self._load_task is not None:
+            self._load_task.cancel()
+            self._lbl_load.configure(text="Cancelling…")
+
+    def _on_load_cancelled(self):
+        self._end_load()
+        self._log("Load cancelled.")
+
+    def _on_fetch_progress(self, done: int, total):
+        if total:
+            self._load_bar.stop()
+            self._load_bar.configure(mode="determinate")
+            self._load_bar.set(min(done / total, 1.0))
+            self._lbl_load.configure(
+                text=f"{done / 1e6:.1f} / {total / 1e6:.1f} MB")
+        else:
+            self._lbl_load.configure(text=f"{done / 1e6:.1f} MB downloaded")
+
+    def _on_rows_progress(self, done: int, total):
+        if total:
+            self._load_bar.stop()
+            self._load_bar.configure(mode="determinate")
+            self._load_bar.set(min(done / total, 1.0))
+            self._lbl_load.configure(text=f"{done:,} / {total:,} rows")
+        else:
+            self._lbl_load.configure(text=f"{done:,} rows read")
+
     def _refresh_preview(self):
-        for w in self._preview_scroll.winfo_children():
-            w.destroy()
-        if self.df is None or self.df.empty:
-            return
-        cols = self.df.columns.tolist()
-        for ci, col in enumerate(cols):
-            ctk.CTkLabel(self._preview_scroll, text=str(col),
-                         font=ctk.CTkFont(weight="bold")).grid(
-                row=0, column=ci, padx=6, pady=4, sticky="ew")
-        for ri, (_, row) in enumerate(self.df.head(5).iterrows()):
-            for ci, col in enumerate(cols):
-                val = str(row[col])
-                if len(val) > 22: val = val[:19] + "…"
-                ctk.CTkLabel(self._preview_scroll, text=val).grid(
-                    row=ri + 1, column=ci, padx=6, pady=2, sticky="ew")
+        self._preview_grid.set_dataframe(self.df)
+        if self.df is None:
+            self._lbl_preview_title.configure(text="2. Data Preview")
+        else:
+            self._lbl_preview_title.configure(
+                text=f"2. Data Preview ({len(self.df):,} rows × "
+                     f"{len(self.df.columns)} columns)")
 
     # ─────────────────────────────────────────────────────────────────────────
     # DELAY PRESETS
@@ -845,22 +949,15 @@ class AutoBlastApp(ctk.CTk):
     # ─────────────────────────────────────────────────────────────────────────
     # PROGRESS SAVE / LOAD
     # ─────────────────────────────────────────────────────────────────────────
-    def _save_progress(self, success: int, failed: int):
-        try:
-            data = {
-                "file_name": Path(self._v_filepath.get()).name
-                             if self._v_filepath.get() else "Unknown",
-                "contacts": self.contacts,
-                "current_index": self.current_index,
-                "success_count": success,
-                "failed_count": failed,
-                "failed_contacts": self.failed_contacts,
-                "timestamp": datetime.now().isoformat()
-            }
-            with open(self.progress_file, "w", encoding="utf-8") as fh:
-                json.dump(data, fh, indent=2)
-        except Exception as e:
-            self._log(f"⚠️ Progress save error: {e}")
+    def _progress_store(self) -> campaign_runner.JsonProgressStore:
+        """Progress file of this window; the runner adds its own state."""
+        return campaign_runner.JsonProgressStore(self.progress_file, extra=lambda: {
+            "file_name": Path(self._v_filepath.get()).name
+                         if self._v_filepath.get() else "Unknown",
+            "campaign": self._campaign,
+            "contacts": self.contacts,
+            "templates": templates.export_templates(self.contacts),
+        })
 
     def _check_resume_on_startup(self):
         if not self.progress_file.exists():
@@ -870,7 +967,7 @@ class AutoBlastApp(ctk.CTk):
                 p = json.load(fh)
             contacts = p.get("contacts", [])
             idx = p.get("current_index", 0)
-            if contacts and idx < len(contacts):
+            if contacts and (idx < len(contacts) or p.get("retry_queue")):
                 next_row = idx + 1   # 1-based for display
                 ans = messagebox.askyesno(
                     "Resume Previous Session?",
@@ -882,26 +979,95 @@ class AutoBlastApp(ctk.CTk):
                     "Resume dari posisi terakhir?"
                 )
                 if ans:
+                    templates.import_templates(p.get("templates"))
                     self.contacts       = contacts
                     self.current_index  = idx
                     self.failed_contacts = p.get("failed_contacts", [])
-                    # Sync the "Start from Row" field so Campaign tab shows
-                    # the correct resume point (no-op if user changes it).
-                    self.v_start_row.set(next_row)
-                    self._lbl_remaining.configure(
-                        text=str(len(contacts) - idx))
-                    self._lbl_success.configure(
-                        text=str(p.get("success_count", 0)))
-                    self._lbl_failed.configure(
-                        text=str(p.get("failed_count", 0)))
-                    self._log(
-                        f"✅ Progress dimuat — lanjut dari baris {next_row} "
-                        f"({len(contacts) - idx} kontak tersisa)")
+                    self._retry_queue   = retry_queue.RetryQueue(p.get("retry_queue"))
+                    self._campaign      = p.get("campaign")
+                    self._results_file  = p.get("results_file")
+                    success = p.get("success_count", 0)
+                    failed = p.get("failed_count", 0)
+                    self._show_resume_state(success, failed)
+                    if campaign_identity.check_source(self._campaign) == "changed":
+                        self.after(200, lambda: self._offer_source_remap(success, failed))
                 else:
                     self.progress_file.unlink(missing_ok=True)
         except Exception as e:
             self._log(f"Progress load error: {e}")
 
+    def _show_resume_state(self, success: int, failed: int):
+        next_row = self.current_index + 1
+        # Sync the "Start from Row" field so Campaign tab shows
+        # the correct resume point (no-op if user changes it).
+        self.v_start_row.set(next_row)
+        self._lbl_remaining.configure(
+            text=str(len(self.contacts) - self.current_index))
+        self._lbl_success.configure(text=str(success))
+        self._lbl_failed.configure(text=str(failed))
+        self._log(
+            f"✅ Progress dimuat — lanjut dari baris {next_row} "
+            f"({len(self.contacts) - self.current_index} kontak tersisa)")
+
+    def _offer_source_remap(self, success: int, failed: int):
+        """The source file changed after the campaign was saved: offer to re-read it."""
+        record = self._campaign
+        if not messagebox.askyesno(
+            "Source File Changed",
+            f"File sumber sudah berubah sejak progress disimpan:\n"
+            f"{record.get('source')}\n\n"
+            "Baca ulang file dan cocokkan kontak yang sudah diproses "
+            "berdasarkan nomor HP?\n\n"
+            "(No = lanjut dengan daftar kontak yang tersimpan)"
+        ):
+            return
+        old_signatures = campaign_identity.record_signatures(record, self.contacts)
+        old_index = self.current_index
+
+        def _on_reloaded(result):
+            self._end_load()
+            new_contacts, digest = result
+            new_signatures = campaign_identity.contact_signatures(new_contacts)
+            contacts, index, diff = campaign_identity.remap_progress(
+                old_signatures, old_index, new_contacts, new_signatures)
+            summary = campaign_identity.describe_diff(diff)
+            self._log(f"Source changed: {summary} (rows listed in the bot log)")
+            campaign_identity.log_diff_rows(diff, old_signatures, new_signatures)
+            rows = "\n".join(campaign_identity.diff_rows(
+                diff, old_signatures, new_signatures, config.DIFF_PREVIEW_ROWS))
+            if not messagebox.askyesno("Remap Progress",
+                f"Perubahan: {summary}\n\n{rows}\n\n"
+                f"Lanjutkan: {index} kontak sudah diproses, {len(contacts) - index} tersisa?\n\n"
+                "(No = lanjut dengan daftar kontak yang tersimpan)"):
+                self._log("Remap declined: keeping the saved contact list")
+                return
+            self.contacts = contacts
+            self.current_index = index
+            self._source, self._source_digest = record.get("source"), digest
+            self._campaign = campaign_identity.campaign_record(
+                record.get("source"), digest, record.get("mapping"),
+                record.get("default_message"), contacts)
+            self._refresher = None
+            self._show_resume_state(success, failed)
+            self._log(f"Source remapped by phone: {index} processed, "
+                      f"{len(contacts) - index} remaining")
+
+        def _on_reload_error(e):
+            self._end_load()
+            messagebox.showerror("Error", f"Failed to re-read source:\n{e}")
+
+        self._show_campaign()
+        self._begin_load("Re-reading source…")
+        self._load_task = BackgroundTask(
+            self,
+            lambda report, cancel: campaign_identity.reload_contacts(
+                record, progress=report, cancel_event=cancel),
+            on_done=_on_reloaded,
+            on_error=_on_reload_error,
+            on_progress=self._on_rows_progress,
+            on_cancel=self._on_load_cancelled,
+        ).start()
+
     def _delete_progress(self):
         if self.progress_file.exists():
             self.progress_file.unlink(missing_ok=True)
@@ -909,6 +1075,141 @@ class AutoBlastApp(ctk.CTk):
         else:
             messagebox.showinfo("Info", "No saved progress found.")
 
+    def _clear_contact_cache(self):
+        size = contact_cache.cache_size()
+        if not size:
+            messagebox.showinfo("Info", "Contact cache is already empty.")
+            return
+        if messagebox.askyesno("Clear Cache",
+                f"Delete {size / 1e6:.1f} MB of cached files and contacts?\n"
+                "The next load will parse the file again."):
+            freed = contact_cache.clear()
+            messagebox.showinfo("Done", f"Freed {freed / 1e6:.1f} MB.")
+
+    def _toggle_profiling(self):
+        self._profiler.enabled = self.v_profiling.get()
+        if self._profiler.enabled:
+            self._log(f"🩺 Profiling on — reports go to {config.DIAGNOSTICS_DIR}")
+
+    def _toggle_metrics(self):
+        if not self.v_metrics.get():
+            if self._metrics_server is not None:
+                self._metrics_server.stop()
+                self._metrics_server = None
+                self._log("📈 Metrics endpoint stopped")
+            return
+        if self._metrics_server is None:
+            try:
+                self._metrics_server = metrics_server.MetricsServer(self._metrics).start()
+            except OSError as e:
+                self.v_metrics.set(False)
+                messagebox.showerror("Metrics",
+                                     f"Could not serve on port {config.METRICS_PORT}:\n{e}")
+                return
+            self._log(f"📈 Metrics endpoint: {self._metrics_server.url}")
+
+    def _profiled(self, name: str, job):
+        """Wrap a BackgroundTask job in a profiling section (no-op when off)."""
+        def _job(report, cancel):
+            with self._profiler.section(name):
+                return job(report, cancel)
+        return _job
+
+    def _measure_profile(self, prune: bool = False):
+        """Show the profile size (and prune first) without blocking the UI."""
+        if self._profile_task is not None:
+            return
+
+        def _job(report, cancel):
+            result = profile_maintenance.prune() if prune else None
+            return result, profile_maintenance.describe()
+
+        def _on_done(outcome):
+            self._profile_task = None
+            result, text = outcome
+            self._lbl_profile.configure(text=text)
+            if result is not None:
+                if result.skipped_reason:
+                    messagebox.showinfo("Prune Browser Cache",
+                                        f"Not pruned: {result.skipped_reason}.\n"
+                                        "Close the campaign's browser first.")
+                else:
+                    messagebox.showinfo("Done", f"Freed {result.freed_bytes / 1e6:.1f} MB.")
+
+        def _on_error(e):
+            self._profile_task = None
+            self._lbl_profile.configure(text=f"Browser profile: unavailable ({e})")
+
+        self._profile_task = BackgroundTask(self, _job, on_done=_on_done,
+                                            on_error=_on_error).start()
+
+    def _prune_profile(self):
+        if self.is_running:
+            messagebox.showinfo("Info", "Stop the campaign before pruning the browser cache.")
+            return
+        if messagebox.askyesno("Prune Browser Cache",
+                "Delete Chrome's cache folders?\n"
+                "Your WhatsApp login is kept; pages load a little slower once."):
+            self._measure_profile(prune=True)
+
+    def _refresh_source(self):
+        """Re-read the campaign source and queue rows added or edited since."""
+        record = self._campaign
+        if not self.contacts or not record or not record.get("source"):
+            messagebox.showinfo("Info", "No campaign source to refresh.")
+            return
+        if self._load_task is not None:
+            messagebox.showinfo("Loading", "Please wait for the current load to finish.")
+            return
+
+        refresher = self._refresher
+        if refresher is None or refresher.source != record["source"]:
+            # Rows of the loaded DataFrame are the baseline when it is the
+            # version the campaign was prepared from; otherwise every row
+            # counts as new and already processed phones are skipped.
+            same_version = (self.df is not None and self._source_digest
+                            and self._source_digest == record.get("source_fingerprint"))
+            refresher = campaign_refresh.SourceRefresher(
+                record["source"], record.get("mapping"), record.get("default_message"),
+                df=self.df if same_version else None,
+                digest=record.get("source_fingerprint"))
+            self._refresher = refresher
+
+        def _on_refreshed(result):
+            self._end_load()
+            self._btn_refresh.configure(state="normal")
+            # Merged on the Tk thread: the bot thread only ever sees whole
+            # contacts appended or swapped at pending positions.
+            merged = campaign_refresh.merge_contacts(
+                self.contacts, self.current_index, result.contacts, result.keys)
+            self._campaign = dict(self._campaign, source_fingerprint=result.digest)
+            self._lbl_remaining.configure(
+                text=str(len(self.contacts) - self.current_index))
+            self._log(
+                f"🔄 Source refreshed: {result.rows_changed} rows new or changed — "
+                f"{merged.appended} queued, {merged.updated} updated, "
+                f"{merged.skipped} already processed")
+
+        def _on_refresh_error(e):
+            self._end_load()
+            self._btn_refresh.configure(state="normal")
+            messagebox.showerror("Error", f"Failed to refresh source:\n{e}")
+
+        def _on_refresh_cancelled():
+            self._btn_refresh.configure(state="normal")
+            self._on_load_cancelled()
+
+        self._btn_refresh.configure(state="disabled")
+        self._begin_load("Refreshing source…")
+        self._load_task = BackgroundTask(
+            self,
+            lambda report, cancel: refresher.refresh(progress=report, cancel_event=cancel),
+            on_done=_on_refreshed,
+            on_error=_on_refresh_error,
+            on_progress=self._on_rows_progress,
+            on_cancel=_on_refresh_cancelled,
+        ).start()
+
     # ─────────────────────────────────────────────────────────────────────────
     # CAMPAIGN CONTROL
     # ─────────────────────────────────────────────────────────────────────────
@@ -930,59 +1231,219 @@ class AutoBlastApp(ctk.CTk):
                 "message": self._om_message.get() or None,
             }
             default_msg = self._txt_default_msg.get("1.0", "end").strip()
-            try:
-                self.contacts = data_processor.prepare_contacts(
-                    self.df, mapping, default_msg)
-            except Exception as e:
+            if self._load_task is not None:
+                messagebox.showinfo("Loading", "Please wait for the current load to finish.")
+                return
+
+            df, source_digest = self.df, self._source_digest
+
+            def _on_prepare_error(e):
+                self._end_load()
+                self._btn_start.configure(state="normal")
                 messagebox.showerror("Error",
                     f"Failed to prepare contacts:\n{str(e)}")
-                return
-            if not self.contacts:
-                messagebox.showerror("Error", "No valid contacts found!")
-                return
 
-            # Apply user-defined start row — match against original_row
-            # (the actual Excel/spreadsheet row) because prepare_contacts
-            # silently skips invalid phone rows, so contacts[N] != Excel row N+1.
-            try:
-                start_row = max(1, int(self.v_start_row.get()))
-            except (ValueError, tk.TclError):
-                start_row = 1
-
-            self.current_index = 0  # fallback: start from beginning
-            found = False
-            for ci, c in enumerate(self.contacts):
-                if c.get("original_row", ci + 1) >= start_row:
-                    self.current_index = ci
-                    found = True
-                    break
-            if not found:
-                messagebox.showerror(
-                    "Error",
+            def _on_prepare_cancelled():
+                self._end_load()
+                self._btn_start.configure(state="normal")
+                self._log("Contact preparation cancelled.")
+
+            self._btn_start.configure(state="disabled")
+            self._show_campaign()
+            self._begin_load("Preparing contacts…")
+            self._load_task = BackgroundTask(
+                self,
+                self._profiled("prepare", lambda report, cancel: contact_cache.prepare_contacts(
+                    df, mapping, default_msg, source_digest,
+                    progress=report, cancel_event=cancel)),
+                on_done=lambda contacts: self._on_contacts_prepared(
+                    contacts, mapping, default_msg),
+                on_error=_on_prepare_error,
+                on_progress=self._on_rows_progress,
+                on_cancel=_on_prepare_cancelled,
+            ).start()
+            return
+
+        self._confirm_and_start()
+
+    def _on_contacts_prepared(self, contacts, mapping: dict, default_msg: str):
+        """Adopt freshly prepared contacts (Tk thread) and continue the start flow."""
+        self._end_load()
+        event_log.emit(event_log.PREPARED, contacts=len(contacts),
+                       skipped=len(self.df) - len(contacts) if self.df is not None else None)
+        self._btn_start.configure(state="normal")
+        if not contacts:
+            messagebox.showerror("Error", "No valid contacts found!")
+            return
+
+        start_row = self._get_start_row()
+        start_index = self._start_index(contacts, start_row)
+        if start_index is None:
+            messagebox.showerror(
+                "Error",
+                f"Start row {start_row} melebihi semua baris data valid "
+                f"({len(contacts)} kontak ditemukan).\n"
+                f"Ubah ke angka yang lebih kecil.")
+            return
+
+        self.contacts = contacts
+        self.current_index = start_index
+        self.failed_contacts = []
+        self._retry_queue = retry_queue.RetryQueue()
+        self._results_file = None
+        self._campaign = campaign_identity.campaign_record(
+            self._source, self._source_digest, mapping, default_msg, contacts)
+        self._refresher = None
+        self._confirm_and_start()
+
+    def _get_start_row(self) -> int:
+        try:
+            return max(1, int(self.v_start_row.get()))
+        except (ValueError, tk.TclError):
+            return 1
+
+    @staticmethod
+    def _start_index(contacts: list, start_row: int):
+        """Index of the first contact at or after start_row, or None."""
+        # Match against original_row (the actual Excel/spreadsheet row)
+        # because prepare_contacts silently skips invalid phone rows,
+        # so contacts[N] != Excel row N+1.
+        for ci, c in enumerate(contacts):
+            if c.get("original_row", ci + 1) >= start_row:
+                return ci
+        return None
+
+    def _schedule_settings(self) -> campaign_planner.ScheduleSettings:
+        """Delay / pause settings as currently set in the Delay and Anti-Ban views."""
+        return campaign_planner.ScheduleSettings(
+            base_delay=self.v_base_delay.get(),
+            jitter_min=self.v_jitter_min.get(),
+            jitter_max=self.v_jitter_max.get(),
+            warmup_count=self.v_warmup_count.get(),
+            warmup_delay=self.v_warmup_delay.get(),
+            fixed_delay=self.v_fixed_delay.get(),
+            pause_limit=self.v_pause_limit.get(),
+            auto_resume=self.v_auto_resume.get(),
+            resume_hours=self.v_resume_hours.get(),
+            send_seconds=config.PLAN_SEND_SECONDS,
+        )
+
+    def _dry_run(self):
+        """Prepare and schedule the campaign without launching Chrome."""
+        if self.df is None:
+            messagebox.showerror("Error", "Please load a contact file first!")
+            return
+        phone_col = self._om_phone.get()
+        if not phone_col:
+            messagebox.showerror("Error", "Please select the Phone Column!")
+            return
+        if self._load_task is not None:
+            messagebox.showinfo("Loading", "Please wait for the current load to finish.")
+            return
+        mapping = {
+            "phone":   phone_col,
+            "name":    self._om_name.get() or None,
+            "message": self._om_message.get() or None,
+        }
+        default_msg = self._txt_default_msg.get("1.0", "end").strip()
+        df, source_digest = self.df, self._source_digest
+        settings = self._schedule_settings()
+        start_row = self._get_start_row()
+
+        def _plan(report, cancel):
+            contacts = contact_cache.prepare_contacts(
+                df, mapping, default_msg, source_digest,
+                progress=report, cancel_event=cancel)
+            if not contacts:
+                raise ValueError("No valid contacts found!")
+            # Same refusal as Start: never fall back to planning the whole list
+            start_index = self._start_index(contacts, start_row)
+            if start_index is None:
+                raise ValueError(
                     f"Start row {start_row} melebihi semua baris data valid "
-                    f"({len(self.contacts)} kontak ditemukan).\n"
+                    f"({len(contacts)} kontak ditemukan).\n"
                     f"Ubah ke angka yang lebih kecil.")
-                self.contacts = []
+            rows_total = max(0, len(df) - start_row + 1)
+            return campaign_planner.plan_campaign(
+                contacts[start_index:], rows_total, settings,
+                first_number=start_index + 1)
+
+        def _on_planned(plan):
+            self._end_load()
+            summary = campaign_planner.format_summary(plan)
+            self._log("🧪 Dry run:\n" + summary)
+            if not messagebox.askyesno(
+                    "Dry Run", summary + "\n\nSave the planned send time of every contact as CSV?"):
                 return
-            self.failed_contacts = []
-
+            path = filedialog.asksaveasfilename(
+                defaultextension=".csv", filetypes=[("CSV", "*.csv")],
+                initialfile="campaign_plan.csv")
+            if path:
+                campaign_planner.export_schedule(plan, path)
+
+        def _on_plan_error(e):
+            self._end_load()
+            messagebox.showerror("Error", f"Dry run failed:\n{e}")
+
+        self._begin_load("Planning…")
+        self._load_task = BackgroundTask(
+            self,
+            _plan,
+            on_done=_on_planned,
+            on_error=_on_plan_error,
+            on_progress=self._on_rows_progress,
+            on_cancel=self._on_load_cancelled,
+        ).start()
+
+    def _confirm_and_start(self):
         # Show actual spreadsheet row in confirm dialog
-        _actual_row = self.contacts[self.current_index].get(
-            "original_row", self.current_index + 1)
-        remaining = len(self.contacts) - self.current_index
+        if self.current_index < len(self.contacts):
+            _actual_row = self.contacts[self.current_index].get(
+                "original_row", self.current_index + 1)
+            _where = f"(mulai dari baris Excel ke-{_actual_row})"
+        else:
+            _where = "(hanya retry yang tertunda)"
+        remaining = len(self.contacts) - self.current_index + len(self._retry_queue)
         if not messagebox.askyesno(
             "Confirm Start",
             f"Ready to send {remaining} messages.\n"
-            f"(mulai dari baris Excel ke-{_actual_row})\n\n"
+            f"{_where}\n\n"
             f"Base delay: {self.v_base_delay.get()}s  |  "
             f"Auto-pause at: {self.v_pause_limit.get()} successes\n\n"
             "Proceed?"
         ):
             return
 
+        # Seed success_count from previously-saved progress so totals
+        # are correct when resuming after an app-restart.
+        try:
+            if self.progress_file.exists():
+                with open(self.progress_file, "r", encoding="utf-8") as _pf:
+                    saved = json.load(_pf)
+            else:
+                saved = {}
+        except Exception:
+            saved = {}
+
+        self._transport = SeleniumTransport(
+            lean=self.v_lean_chrome.get(),
+            log=self._log,
+            on_recovering=self._on_driver_recovering,
+            on_recovered=self._on_driver_recovered,
+            on_sample=lambda _s: self.after(0, self._draw_resources))
+        self._runner = campaign_runner.CampaignRunner(
+            self.contacts, self._transport, self._schedule_settings(), self._progress_store(),
+            index=self.current_index, success=saved.get("success_count", 0),
+            failed=len(self.failed_contacts), failed_contacts=self.failed_contacts,
+            retries=self._retry_queue, results_file=self._results_file, source=self._source,
+            confirmations=saved.get("confirmations"))
+        self._runner.subscribe(self._on_campaign_event)
+        self._metrics.attach(self._runner)
+        event_log.events().attach(self._runner)
+        self._results_file = str(self._runner.results.path)
+
         self.is_running = True
         self.is_paused = False
-        self._session_success = 0
         self._btn_start.configure(state="disabled")
         self._btn_pause.configure(state="normal")
         self._btn_stop.configure(state="normal")
@@ -992,260 +1453,209 @@ class AutoBlastApp(ctk.CTk):
         threading.Thread(target=self._run_bot, daemon=True).start()
 
     def _toggle_pause(self):
-        if self.is_paused:
-            # Resume
-            self._auto_resume_cancel.set()
-            self.is_paused = False
-            self._btn_pause.configure(text="⏸  PAUSE", fg_color="#D97706")
-            self._lbl_ab_status.configure(text="⬤  Running", text_color="#22C55E")
-            self._lbl_ab_countdown.configure(text="")
-            self._btn_ab_resume.configure(state="disabled")
-            self._log("▶️ RESUMED")
+        if self._runner is None:
+            return
+        if self._runner.is_paused:
+            self._runner.resume()
         else:
-            # Pause
-            self.is_paused = True
+            self._runner.pause()
             self._btn_pause.configure(text="▶  RESUME", fg_color="#16A34A")
             self._lbl_countdown.configure(text="PAUSED")
             self._log("⏸️ PAUSED — click Resume to continue")
-            messagebox.showinfo("Paused", "Bot paused.\nProgress saved. Click Resume to continue.")
+            messagebox.showinfo("Paused", "Bot paused.\nProgress is saved once the current message finishes.\nClick Resume to continue.")
 
     def _stop_campaign(self):
         if messagebox.askyesno("Stop", "Stop sending?\n\nProgress will be saved."):
-            # Signal the bot thread to exit cleanly; is_paused=False lets
-            # the pause-while-loop unblock so the thread can reach finally.
-            self.is_running = False
-            self.is_paused  = False
+            # The runner leaves any pause or countdown and saves progress.
+            if self._runner is not None:
+                self._runner.stop()
             self._log("⏹ Stopping — progress will be saved…")
 
     # ─────────────────────────────────────────────────────────────────────────
     # BOT THREAD
     # ─────────────────────────────────────────────────────────────────────────
     def _run_bot(self):
+        runner = self._runner
         try:
             self._log("=" * 56)
             self._log("🚀 Starting AutoBlast...")
             self._log("=" * 56)
 
-            if not self.driver:
-                self._log("Initializing Chrome WebDriver…")
-                self.driver = setup_driver()
-                self._log("Loading WhatsApp Web…")
-                wait_for_whatsapp_load(self.driver)
-                self._log("✅ WhatsApp Web loaded!")
-
-            # Seed success_count from previously-saved progress so totals
-            # are correct when resuming after an app-restart.
-            try:
-                if self.progress_file.exists():
-                    with open(self.progress_file, "r", encoding="utf-8") as _pf:
-                        _pd = json.load(_pf)
-                    success_count = _pd.get("success_count", 0)
-                else:
-                    success_count = 0
-            except Exception:
-                success_count = 0
-            failed_count  = len(self.failed_contacts)
-            total = len(self.contacts)
-            self._session_success = 0   # counts only THIS batch (resets each pause)
-
-            for idx in range(self.current_index, total):
-                if not self.is_running:
-                    self._log("⏹ Stopped."); break
-
-                # Pause gate
-                while self.is_paused and self.is_running:
-                    time_module.sleep(0.5)
-                if not self.is_running: break
-
-                contact = self.contacts[idx]
-                # Advance index BEFORE sending so that if we pause/save here,
-                # resume will start from the NEXT contact (not re-send this one).
-                self.current_index = idx + 1
-                num = idx + 1
-
-                _name, _phone = contact['name'], contact['phone']
-                self.after(0, lambda n=_name, p=_phone:
-                           self._lbl_next.configure(
-                               text=f"Sending to: {n} ({p})"))
-                self._log(f"\n[{num}/{total}] Excel baris {contact.get('original_row', num)} → {contact['name']} ({contact['phone']})")
-
-                ok = send_message(self.driver, contact["phone"],
-                                  contact["message"], contact["name"])
-
-                if ok:
-                    success_count += 1
-                    self._session_success += 1
-                    self._log(f"  ✅ Sent")
-                else:
-                    failed_count += 1
-                    self.failed_contacts.append({
-                        "phone": contact["phone"], "name": contact["name"],
-                        "reason": "Send failed",
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    self._log(f"  ❌ Failed")
-
-                # Update stat cards
-                _rem, _suc, _fail = total - num, success_count, failed_count
-                self.after(0, lambda r=_rem: self._lbl_remaining.configure(text=str(r)))
-                self.after(0, lambda s=_suc: self._lbl_success.configure(text=str(s)))
-                self.after(0, lambda f=_fail: self._lbl_failed.configure(text=str(f)))
-
-                # ── AUTO-PAUSE CHECK ──────────────────────────────────────
-                limit = self.v_pause_limit.get()
-                if (limit > 0
-                        and self._session_success > 0
-                        and self._session_success % limit == 0
-                        and idx < total - 1):
-
-                    # 1. Save progress FIRST
-                    self._save_progress(success_count, failed_count)
-
-                    # 2. Pause
-                    self.is_paused = True
-                    self._log("")
-                    self._log("=" * 56)
-                    self._log(f"⛔ AUTO-PAUSE: {limit} successful messages reached!")
-                    self._log("Progress saved. Resume manually or wait for auto-resume.")
-                    self._log("=" * 56)
-
-                    self.after(0, lambda: self._lbl_countdown.configure(text="AUTO-PAUSE"))
-                    self.after(0, lambda: self._btn_pause.configure(
-                        text="▶  RESUME", fg_color="#16A34A"))
-                    _lim = limit
-                    self.after(0, lambda l=_lim: self._lbl_ab_status.configure(
-                        text=f"⛔  PAUSED setelah {l} sukses", text_color="#EF4444"))
-                    self.after(0, lambda: self._btn_ab_resume.configure(state="normal"))
-                    self.after(0, lambda: self._lbl_ab_info.configure(
-                        text="Progress tersimpan. Resume manual atau tunggu auto-resume."))
-
-                    # 3. Auto-resume countdown
-                    if self.v_auto_resume.get():
-                        self._auto_resume_cancel.clear()
-                        self._auto_resume_thread = threading.Thread(
-                            target=self._auto_resume_timer,
-                            args=(self.v_resume_hours.get(),),
-                            daemon=True)
-                        self._auto_resume_thread.start()
-
-                    # 4. Wait while paused
-                    while self.is_paused and self.is_running:
-                        time_module.sleep(0.5)
-
-                    # 5. Clear auto-pause UI
-                    self.after(0, lambda: self._lbl_ab_countdown.configure(text=""))
-                    self.after(0, lambda: self._lbl_ab_status.configure(
-                        text="⬤  Running", text_color="#22C55E"))
-                    self.after(0, lambda: self._btn_ab_resume.configure(state="disabled"))
-                    if self.is_running:
-                        # Reset per-batch counter so next N sends trigger the
-                        # next pause cleanly (instead of accumulating indefinitely).
-                        self._session_success = 0
-                        self._log("▶️ RESUMED — batch counter reset, continuing…")
-                # ─────────────────────────────────────────────────────────
-
-                # Regular progress save
-                self._save_progress(success_count, failed_count)
-
-                # Delay between messages
-                if idx < total - 1 and self.is_running:
-                    if num < total:
-                        nxt = self.contacts[num]
-                        _nn, _np = nxt['name'], nxt['phone']
-                        self.after(0, lambda n=_nn, p=_np:
-                                   self._lbl_next.configure(text=f"Next: {n} ({p})"))
-
-                    delay = self._calc_delay(num)
-                    self._log(f"  ⏳ Waiting {delay:.0f}s…")
-
-                    for rem in range(int(delay), 0, -1):
-                        if not self.is_running: break
-                        while self.is_paused and self.is_running:
-                            time_module.sleep(0.5)
-                        if not self.is_running: break
-                        mm, ss = rem // 60, rem % 60
-                        _t = f"{mm:02d}:{ss:02d}"
-                        self.after(0, lambda t=_t: self._lbl_countdown.configure(text=t))
-                        time_module.sleep(1)
-
-            # ── Finished — all contacts processed ────────────────────────────
-            if self.current_index >= total:
+            with self._profiler.section("campaign"):
+                finished = runner.run()
+            if finished.completed:
+                self._results_file = None
                 self._log("\n" + "=" * 56)
                 self._log("🎉 COMPLETED!")
-                self._log(f"Success: {success_count}  |  Failed: {failed_count}")
+                self._log(f"Success: {finished.success}  |  Failed: {finished.failed}")
+                self._log(f"Confirmation: {send_confirmation.summarize(finished.confirmations)}")
+                self._log(f"📄 Results: {finished.results_path}")
+                if finished.annotated_path:
+                    self._log(f"📄 Annotated spreadsheet: {finished.annotated_path}")
                 self._log("=" * 56)
                 self.after(0, lambda: self._lbl_countdown.configure(text="DONE! ✅"))
                 self.after(0, lambda: self._lbl_next.configure(
                     text="All messages sent."))
-                messagebox.showinfo(
-                    "Campaign Complete",
-                    f"Finished sending!\n\n"
-                    f"✅ Success: {success_count}\n❌ Failed: {failed_count}")
-                # Only delete saved progress on full completion
-                if self.progress_file.exists():
-                    self.progress_file.unlink(missing_ok=True)
+                self.after(0, lambda: self._lbl_eta.configure(text="ETA --"))
+                # Dialogs belong to the Tk thread; showing one from here blocks it
+                _msg = (f"Finished sending!\n\n"
+                        f"✅ Success: {finished.success}\n❌ Failed: {finished.failed}")
+                self.after(0, lambda: messagebox.showinfo("Campaign Complete", _msg))
             else:
-                # Stopped mid-run — keep progress so user can resume
-                self._save_progress(success_count, failed_count)
+                # Stopped mid-run — progress is kept so user can resume
                 self._log("\n" + "=" * 56)
                 self._log("⏹ STOPPED — progress saved.")
-                self._log(f"  Sent so far: ✅ {success_count}  ❌ {failed_count}")
-                self._log(f"  Next resume akan lanjut dari baris {self.current_index + 1}.")
+                self._log(f"  Sent so far: ✅ {finished.success}  ❌ {finished.failed}")
+                self._log(f"  Next resume akan lanjut dari baris {runner.index + 1}.")
                 self._log("=" * 56)
 
         except Exception as e:
             self._log(f"❌ ERROR: {e}")
-            # Save progress so user can retry from where it crashed
-            try:
-                self._save_progress(success_count, failed_count)
-                self._log("💾 Progress darurat disimpan.")
-            except Exception:
-                pass
-            messagebox.showerror("Error", str(e))
+            # The runner saved progress so user can retry from where it crashed
+            self._log("💾 Progress darurat disimpan.")
+            _err = str(e)
+            self.after(0, lambda: messagebox.showerror("Error", _err))
         finally:
-            if self.driver and not self.is_paused:
-                self.driver.quit()
-                self.driver = None
+            self.current_index = runner.index
             self.is_running = False
+            self.is_paused = False
             self.after(0, self._reset_controls)
 
-    def _calc_delay(self, msg_count: int) -> float:
-        delay = float(self.v_base_delay.get())
-        if self.v_fixed_delay.get():
-            return delay
-        if msg_count < self.v_warmup_count.get():
-            delay += self.v_warmup_delay.get()
-        delay += random.uniform(self.v_jitter_min.get(), self.v_jitter_max.get())
-        return delay
-
-    # ─────────────────────────────────────────────────────────────────────────
-    # AUTO-RESUME
-    # ─────────────────────────────────────────────────────────────────────────
-    def _manual_resume(self):
-        if self.is_paused:
-            self._auto_resume_cancel.set()
+    def _on_campaign_event(self, event):
+        """CampaignRunner observer (bot thread): log and update the dashboard."""
+        if isinstance(event, campaign_runner.Sending):
+            c = event.contact
+            if not event.retry:
+                self.current_index = event.number
+                self._log(f"\n[{event.number}/{event.total}] Excel baris "
+                          f"{c.get('original_row', event.number)} → {c['name']} ({c['phone']})")
+            self.after(0, lambda n=c['name'], p=c['phone']:
+                       self._lbl_next.configure(text=f"Sending to: {n} ({p})"))
+
+        elif isinstance(event, campaign_runner.Sent):
+            c = event.contact
+            self._log((f"  ✅ Retry sent: {c['name']} ({c['phone']})" if event.retry else "  ✅ Sent")
+                      + self._confirmation_note(event))
+            self._post_counts(event)
+
+        elif isinstance(event, campaign_runner.Failed):
+            reason = retry_queue.describe(event.outcome)
+            if event.queued:
+                # Transient: retried after the main pass, not counted yet
+                self._log(f"  🔁 {reason} — queued for retry")
+            elif event.retry:
+                self._log(f"  ❌ Giving up: {event.contact['name']} ({reason})")
+            else:
+                self._log(f"  ❌ Failed ({reason})")
+            self._post_counts(event)
+
+        elif isinstance(event, campaign_runner.Countdown):
+            rem = event.seconds
+            if event.phase == "auto_resume":
+                _t = f"{rem // 3600:02d}:{(rem % 3600) // 60:02d}:{rem % 60:02d}"
+                self.after(0, lambda t=_t: self._lbl_ab_countdown.configure(text=t))
+            else:
+                if event.next_contact and rem == math.ceil(event.duration):
+                    _nn, _np = event.next_contact['name'], event.next_contact['phone']
+                    self.after(0, lambda n=_nn, p=_np:
+                               self._lbl_next.configure(text=f"Next: {n} ({p})"))
+                    self._log(f"  ⏳ Waiting {event.duration:.0f}s…")
+                _t = f"{rem // 60:02d}:{rem % 60:02d}"
+                self.after(0, lambda t=_t: self._lbl_countdown.configure(text=t))
+            _eta = eta.describe(event.eta)
+            self.after(0, lambda t=_eta: self._lbl_eta.configure(text=t))
+
+        elif isinstance(event, campaign_runner.Paused):
+            self.is_paused = True
+            if event.reason == "auto":
+                limit = self._runner.settings.pause_limit
+                self._log("")
+                self._log("=" * 56)
+                self._log(f"⛔ AUTO-PAUSE: {limit} successful messages reached!")
+                self._log("Progress saved. Resume manually or wait for auto-resume.")
+                self._log("=" * 56)
+                if event.resume_in:
+                    self._log(f"⏳ Auto-resume in {event.resume_in / 3600:.0f}h "
+                              f"({int(event.resume_in) // 60} min)…")
+                self.after(0, lambda: self._lbl_countdown.configure(text="AUTO-PAUSE"))
+                self.after(0, lambda: self._btn_pause.configure(
+                    text="▶  RESUME", fg_color="#16A34A"))
+                self.after(0, lambda l=limit: self._lbl_ab_status.configure(
+                    text=f"⛔  PAUSED setelah {l} sukses", text_color="#EF4444"))
+                self.after(0, lambda: self._btn_ab_resume.configure(state="normal"))
+                self.after(0, lambda: self._lbl_ab_info.configure(
+                    text="Progress tersimpan. Resume manual atau tunggu auto-resume."))
+
+        elif isinstance(event, campaign_runner.Resumed):
             self.is_paused = False
+            self._log("🔔 Auto-resume triggered!" if event.reason == "auto" else "▶️ RESUMED")
             self.after(0, lambda: self._btn_pause.configure(
                 text="⏸  PAUSE", fg_color="#D97706"))
             self.after(0, lambda: self._lbl_ab_status.configure(
                 text="⬤  Running", text_color="#22C55E"))
             self.after(0, lambda: self._lbl_ab_countdown.configure(text=""))
             self.after(0, lambda: self._btn_ab_resume.configure(state="disabled"))
-            self._log("▶️ RESUMED (manual)")
 
-    def _auto_resume_timer(self, hours: float):
-        total = int(hours * 3600)
-        self._log(f"⏳ Auto-resume in {hours:.0f}h ({total // 60} min)…")
-        for rem in range(total, 0, -1):
-            if self._auto_resume_cancel.is_set() or not self.is_running:
-                return
-            h, m, s = rem // 3600, (rem % 3600) // 60, rem % 60
-            _t = f"{h:02d}:{m:02d}:{s:02d}"
-            self.after(0, lambda t=_t: self._lbl_ab_countdown.configure(text=t))
-            time_module.sleep(1)
-        if not self._auto_resume_cancel.is_set() and self.is_paused and self.is_running:
-            self._log(f"🔔 Auto-resume triggered after {hours:.0f}h!")
-            self.after(0, self._manual_resume)
+        elif isinstance(event, campaign_runner.RetryPass):
+            self._log(f"\n🔁 Retrying {event.pending} contacts that failed transiently…")
+
+    @staticmethod
+    def _confirmation_note(event) -> str:
+        """Log suffix with the confirmation state of a Sent event."""
+        if event.confirmation == send_confirmation.CONFIRMED:
+            return f" (confirmed in {event.confirm_seconds:.1f}s)"
+        return f" — ⚠️ {send_confirmation.describe(event.confirmation).lower()}"
+
+    def _post_counts(self, event):
+        """Update the stat cards after a Sent / Failed event (any thread)."""
+        _rem = len(self.contacts) - self.current_index
+        _suc, _fail = event.success, event.failed
+        self.after(0, lambda r=_rem: self._lbl_remaining.configure(text=str(r)))
+        self.after(0, lambda s=_suc: self._lbl_success.configure(text=str(s)))
+        self.after(0, lambda f=_fail: self._lbl_failed.configure(text=str(f)))
+
+    def _draw_resources(self):
+        """Redraw the Chrome memory sparkline and its label (Tk thread)."""
+        monitor = self._transport.monitor if self._transport else None
+        samples = list(monitor.samples) if monitor else []
+        if not samples:
+            return
+        self._lbl_resources.configure(text=resource_monitor.describe(samples[-1]))
+        chart = self._res_chart
+        chart.delete("all")
+        w, h = max(chart.winfo_width(), 2), int(chart["height"])
+        peak = max(s.rss_bytes for s in samples) or 1
+        step = w / max(len(samples) - 1, 1)
+        coords = []
+        for i, s in enumerate(samples):
+            coords += [i * step, h - 2 - (h - 4) * s.rss_bytes / peak]
+        if len(coords) >= 4:
+            chart.create_line(*coords, fill="#3B82F6", width=2)
+        if config.RECYCLE_RSS_MB:
+            limit = config.RECYCLE_RSS_MB * 1048576
+            if limit <= peak:
+                y = h - 2 - (h - 4) * limit / peak
+                chart.create_line(0, y, w, y, fill="#EF4444", dash=(3, 3))
+
+    def _draw_stalls(self, detector):
+        """Show stall count / worst lag; red once the UI has stalled (Tk thread)."""
+        self._lbl_stalls.configure(
+            text=detector.describe(),
+            text_color="#EF4444" if detector.stalls else "#9CA3AF")
+
+    def _on_driver_recovering(self):
+        self._log("⚠️ Chrome session lost — campaign paused, restarting browser…")
+        self.after(0, lambda: self._lbl_next.configure(text="Restarting Chrome…"))
+
+    def _on_driver_recovered(self, seconds: float):
+        self._log(f"✅ Chrome session recovered in {seconds:.0f}s — resuming from the failed contact")
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # AUTO-RESUME
+    # ─────────────────────────────────────────────────────────────────────────
+    def _manual_resume(self):
+        if self._runner is not None and self._runner.is_paused:
+            self._runner.resume()
 
     # ─────────────────────────────────────────────────────────────────────────
     # HELPERS
@@ -1268,7 +1678,6 @@ class AutoBlastApp(ctk.CTk):
         self._lbl_ab_status.configure(text="⬤  Idle", text_color="#6B7280")
         self._lbl_ab_countdown.configure(text="")
         self._btn_ab_resume.configure(state="disabled")
-        self._session_success = 0
 
     def _export_failed(self):
         if not self.failed_contacts:
@@ -1281,12 +1690,7 @@ class AutoBlastApp(ctk.CTk):
                        ("CSV files", "*.csv"), ("All files", "*.*")],
             initialfile=f"failed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
         if fn:
-            with open(fn, "w", encoding="utf-8") as fh:
-                fh.write("Failed WhatsApp Numbers\n" + "=" * 50 + "\n")
-                for c in self.failed_contacts:
-                    fh.write(
-                        f"{c.get('name','')}\t{c.get('phone','')}\t"
-                        f"{c.get('reason','')}\t{c.get('timestamp','')}\n")
+            results_report.export_failed(self.failed_contacts, fn)
             messagebox.showinfo("Exported", f"Saved to:\n{fn}")
 
 
@@ -0,0 +1,276 @@
+"""
+Velo Bot Phone Normalizer
+Table-driven multi-country phone number normalization with a calling-code prefix trie
+"""
+
+import re
+from collections import namedtuple
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from . import config
+from . import utils
+
+PhoneRule = namedtuple(
+    'PhoneRule',
+    ['region', 'calling_code', 'trunk_prefix', 'min_length', 'max_length', 'mobile_prefixes'])
+
+# How the raw value signalled an international number
+INTL_NONE = ''       # plain digits, local interpretation first
+INTL_PLUS = '+'      # explicit "+": must parse as international
+INTL_LINK = '~'      # wa.me / phone= link or "00" prefix: international first, local as fallback
+
+_LINK_PATTERN = re.compile('|'.join(f'(?:{p})' for p in config.PHONE_REGEX_PATTERNS))
+
+# ============================================================================
+# PREFIX TRIE
+# ============================================================================
+class _TrieNode:
+    __slots__ = ('children', 'rule')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.rule: Optional[PhoneRule] = None
+
+_trie_root: Optional[_TrieNode] = None
+_rules_by_code: Dict[str, PhoneRule] = {}
+
+def _build_trie():
+    """Build the calling-code trie from config.PHONE_COUNTRY_RULES (first rule per code wins)"""
+    global _trie_root
+    root = _TrieNode()
+    _rules_by_code.clear()
+    for entry in config.PHONE_COUNTRY_RULES:
+        rule = PhoneRule(*entry)
+        if rule.calling_code in _rules_by_code:
+            continue
+        _rules_by_code[rule.calling_code] = rule
+        node = root
+        for digit in rule.calling_code:
+            node = node.children.setdefault(digit, _TrieNode())
+        node.rule = rule
+    _trie_root = root
+
+def match_calling_code(digits: str) -> Optional[PhoneRule]:
+    """
+    Find the country rule whose calling code prefixes the number
+
+    Args:
+        digits: Digits-only number starting with a calling code
+
+    Returns:
+        Matching PhoneRule or None. Runs in O(len(calling code)).
+    """
+    if _trie_root is None:
+        _build_trie()
+    node = _trie_root
+    match = None
+    for digit in digits:
+        node = node.children.get(digit)
+        if node is None:
+            break
+        if node.rule is not None:
+            match = node.rule
+    return match
+
+def rule_for_country_code(country_code: str) -> PhoneRule:
+    """
+    Get the rule for a calling code, or a permissive rule for codes not in the table
+
+    Args:
+        country_code: Calling code such as "62"
+
+    Returns:
+        PhoneRule for the code
+    """
+    if _trie_root is None:
+        _build_trie()
+    rule = _rules_by_code.get(country_code)
+    if rule is None:
+        rule = PhoneRule('??', country_code, '0', 6, 13, '')
+    return rule
+
+# ============================================================================
+# CLASSIFICATION
+# ============================================================================
+def _length_ok(rule: PhoneRule, nsn: str) -> bool:
+    return rule.min_length <= len(nsn) <= rule.max_length
+
+def _strict_ok(rule: PhoneRule, nsn: str) -> bool:
+    """Length fits and, if the rule lists mobile leading digits, the NSN starts with one"""
+    if not _length_ok(rule, nsn):
+        return False
+    return not rule.mobile_prefixes or nsn[0] in rule.mobile_prefixes
+
+def _classify(digits: str, intl: str, home: PhoneRule) -> Tuple[Optional[str], str]:
+    """
+    Classify a digits-only number
+
+    Args:
+        digits: Digits without "+" or "00" prefix
+        intl: One of INTL_NONE, INTL_PLUS, INTL_LINK
+        home: Rule of the default country
+
+    Returns:
+        Tuple of (normalized number or None, rule label)
+    """
+    if not digits:
+        return None, 'invalid:empty'
+
+    if intl:
+        rule = match_calling_code(digits)
+        if rule is not None:
+            nsn = digits[len(rule.calling_code):]
+            # Tolerate a trunk prefix written after the country code (+62 0812...)
+            if rule.trunk_prefix and nsn.startswith(rule.trunk_prefix):
+                nsn = nsn[len(rule.trunk_prefix):]
+            if _length_ok(rule, nsn):
+                return rule.calling_code + nsn, f'{rule.region}:international'
+        if intl == INTL_PLUS:
+            return None, 'invalid:code' if rule is None else f'{rule.region}:invalid-length'
+
+    # Trunk prefix means the number is written in home-country format
+    if home.trunk_prefix and digits.startswith(home.trunk_prefix):
+        nsn = digits[len(home.trunk_prefix):]
+        if _length_ok(home, nsn):
+            return home.calling_code + nsn, f'{home.region}:trunk'
+        return None, 'invalid:length'
+
+    home_national = _strict_ok(home, digits)
+
+    # Home calling code already present and the rest looks like a home mobile number
+    if digits.startswith(home.calling_code):
+        nsn = digits[len(home.calling_code):]
+        if _strict_ok(home, nsn):
+            return digits, f'{home.region}:international'
+
+    # Another country's calling code, unless the number is a plausible home number
+    rule = match_calling_code(digits)
+    if rule is not None and rule is not home and not home_national:
+        nsn = digits[len(rule.calling_code):]
+        if _strict_ok(rule, nsn):
+            return digits, f'{rule.region}:international'
+
+    # Local number written without trunk prefix
+    if _length_ok(home, digits):
+        return home.calling_code + digits, f'{home.region}:national'
+
+    if digits.startswith(home.calling_code) and _length_ok(home, digits[len(home.calling_code):]):
+        return digits, f'{home.region}:international'
+
+    return None, 'invalid:length'
+
+def _finalize(result: Tuple[Optional[str], str]) -> Tuple[Optional[str], str]:
+    number, label = result
+    if number is not None and not utils.validate_phone_number(number):
+        return None, 'invalid:length'
+    return number, label
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+def split_raw(raw: str) -> Tuple[str, str]:
+    """
+    Reduce a raw cell value to (digits, international hint)
+
+    Args:
+        raw: Raw phone text, wa.me link or API URL
+
+    Returns:
+        Tuple of (digits, INTL_* hint)
+    """
+    text = str(raw).strip()
+    match = _LINK_PATTERN.search(text)
+    if match:
+        return next(g for g in match.groups() if g), INTL_LINK
+
+    digits = re.sub(r'\D', '', text)
+    if text.startswith('+'):
+        return digits, INTL_PLUS
+    if digits.startswith('00'):
+        return digits[2:], INTL_LINK
+    return digits, INTL_NONE
+
+def normalize(raw: str, default_country_code: str = None,
+              international: bool = False) -> Tuple[Optional[str], str]:
+    """
+    Normalize a single phone number
+
+    Args:
+        raw: Raw phone value
+        default_country_code: Home calling code (default from config)
+        international: Treat bare digits as already carrying a calling code
+
+    Returns:
+        Tuple of (normalized number or None, matched rule label such as "ID:trunk")
+    """
+    if default_country_code is None:
+        default_country_code = config.DEFAULT_COUNTRY_CODE
+    digits, intl = split_raw(raw)
+    if international and not intl:
+        intl = INTL_LINK
+    return _finalize(_classify(digits, intl, rule_for_country_code(default_country_code)))
+
+def normalize_series(values: pd.Series, default_country_code: str = None) -> pd.DataFrame:
+    """
+    Vectorized normalization of a whole phone column
+
+    Raw values are deduplicated first; string cleanup then runs as pandas
+    vector operations over the distinct values and the trie is consulted once
+    per distinct (digits, hint) pair, so repeated values cost nothing extra.
+
+    Args:
+        values: Raw phone column
+        default_country_code: Home calling code (default from config)
+
+    Returns:
+        DataFrame with 'phone' (None when invalid) and 'rule' columns, same index
+    """
+    if default_country_code is None:
+        default_country_code = config.DEFAULT_COUNTRY_CODE
+    home = rule_for_country_code(default_country_code)
+
+    distinct = pd.Series(values.dropna().unique(), dtype=object)
+    text = distinct.astype('string').str.strip()
+
+    linked = None
+    for pattern in config.PHONE_REGEX_PATTERNS:
+        found = text.str.extract(pattern, expand=False)
+        linked = found if linked is None else linked.fillna(found)
+    if linked is None:
+        linked = pd.Series(pd.NA, index=text.index, dtype='string')
+
+    digits = text.str.replace(r'\D', '', regex=True)
+    plus = text.str.startswith('+').fillna(False).astype(bool)
+    idd = digits.str.startswith('00').fillna(False).astype(bool) & ~plus
+    digits = digits.mask(idd, digits.str[2:])
+
+    hint = pd.Series(INTL_NONE, index=text.index, dtype='string')
+    hint = hint.mask(plus, INTL_PLUS).mask(idd | linked.notna(), INTL_LINK)
+    keys = (hint + linked.fillna(digits)).astype(object)
+
+    classified = {}
+    for key in keys.unique():
+        intl = key[:1] if key[:1] in (INTL_PLUS, INTL_LINK) else INTL_NONE
+        classified[key] = _finalize(_classify(key[len(intl):], intl, home))
+
+    phone_map = {raw: classified[key][0] for raw, key in zip(distinct, keys)}
+    rule_map = {raw: classified[key][1] for raw, key in zip(distinct, keys)}
+
+    phones = values.map(phone_map).astype(object)
+    phones[phones.isna()] = None
+    rules = values.map(rule_map).fillna('invalid:empty').astype(object)
+    return pd.DataFrame({'phone': phones, 'rule': rules}, index=values.index)
+
+def rule_report(normalized: pd.DataFrame) -> Dict[str, int]:
+    """
+    Count how many numbers matched each rule
+
+    Args:
+        normalized: Output of normalize_series
+
+    Returns:
+        Dictionary of rule label -> count, most frequent first
+    """
+    return {str(k): int(v) for k, v in normalized['rule'].value_counts().items()}
@@ -0,0 +1,305 @@
+"""
+Velo Bot Preview Grid
+Virtualized, canvas-based table for previewing a DataFrame. Only the cells
+inside the viewport are drawn and rows are pulled from the DataFrame one page
+at a time, so cost depends on the window size rather than the data size.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+import tkinter.font as tkfont
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+from . import config
+
+DEFAULT_COLORS = {
+    "bg": "#2B2B2B",
+    "fg": "#DCE4EE",
+    "row_alt": "#323232",
+    "header_bg": "#1F538D",
+    "header_fg": "#FFFFFF",
+    "gutter_bg": "#242424",
+    "gutter_fg": "#8A8F98",
+    "placeholder": "#808080",
+}
+
+# ============================================================================
+# CANVAS ITEM POOL
+# ============================================================================
+class _ItemPool:
+    """Reuses canvas items between redraws instead of deleting and recreating them"""
+
+    def __init__(self, canvas: tk.Canvas, kind: str, tag: str):
+        self.canvas = canvas
+        self.kind = kind
+        self.tag = tag
+        self.items: List[int] = []
+        self.used = 0
+
+    def take(self, *coords, **options) -> int:
+        if self.used < len(self.items):
+            item = self.items[self.used]
+            self.canvas.coords(item, *coords)
+            self.canvas.itemconfigure(item, state="normal", **options)
+        else:
+            if self.kind == "text":
+                item = self.canvas.create_text(*coords, tags=self.tag, **options)
+            else:
+                item = self.canvas.create_rectangle(*coords, width=0, tags=self.tag, **options)
+            self.items.append(item)
+        self.used += 1
+        return item
+
+    def finish(self):
+        """Hide items not used by this redraw"""
+        for item in self.items[self.used:]:
+            self.canvas.itemconfigure(item, state="hidden")
+        self.used = 0
+
+# ============================================================================
+# PREVIEW GRID
+# ============================================================================
+class PreviewGrid(tk.Frame):
+    """
+    Scrollable read-only table over a DataFrame
+
+    Fixed row height and column width let the visible cell range be computed
+    directly from the scroll offset. The header row and the row-number gutter
+    stay frozen while scrolling.
+    """
+
+    def __init__(self, master,
+                 scrollbar_factory: Optional[Callable] = None,
+                 row_height: int = 24, col_width: int = 140, gutter_width: int = 56,
+                 page_rows: int = None, colors: dict = None,
+                 placeholder: str = "", **kwargs):
+        """
+        Args:
+            master: Parent widget
+            scrollbar_factory: Optional callable(master, orient, command) returning a
+                scrollbar with a set(first, last) method (default ttk.Scrollbar)
+            row_height: Row height in pixels
+            col_width: Column width in pixels
+            gutter_width: Width of the row-number gutter in pixels
+            page_rows: Rows converted per page (default config.PREVIEW_PAGE_ROWS)
+            colors: Overrides for DEFAULT_COLORS
+            placeholder: Text shown while no data is set
+        """
+        self.colors = dict(DEFAULT_COLORS, **(colors or {}))
+        canvas_size = {k: kwargs.pop(k) for k in ("width", "height") if k in kwargs}
+        kwargs.setdefault("bg", self.colors["bg"])
+        super().__init__(master, **kwargs)
+
+        self.row_height = row_height
+        self.col_width = col_width
+        self.gutter_width = gutter_width
+        self.page_rows = page_rows or config.PREVIEW_PAGE_ROWS
+        self.placeholder = placeholder
+
+        self.font = tkfont.nametofont("TkDefaultFont")
+        self.header_font = self.font.copy()
+        self.header_font.configure(weight="bold")
+        self._max_chars = max(1, (col_width - 12) // max(1, self.font.measure("0")))
+
+        self.canvas = tk.Canvas(self, highlightthickness=0, bd=0, bg=self.colors["bg"],
+                                **canvas_size)
+        if scrollbar_factory is None:
+            scrollbar_factory = lambda m, orient, command: ttk.Scrollbar(
+                m, orient=orient, command=command)
+        self.vbar = scrollbar_factory(self, "vertical", self.yview)
+        self.hbar = scrollbar_factory(self, "horizontal", self.xview)
+
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.vbar.grid(row=0, column=1, sticky="ns")
+        self.hbar.grid(row=1, column=0, sticky="ew")
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        # Layers, bottom to top: body backgrounds, body text, frozen backgrounds, frozen text
+        self._body_rects = _ItemPool(self.canvas, "rect", "body_bg")
+        self._body_texts = _ItemPool(self.canvas, "text", "body_text")
+        self._frame_rects = _ItemPool(self.canvas, "rect", "frame_bg")
+        self._frame_texts = _ItemPool(self.canvas, "text", "frame_text")
+        self._pools = (self._body_rects, self._body_texts, self._frame_rects, self._frame_texts)
+
+        self._df: Optional[pd.DataFrame] = None
+        self._columns: List[str] = []
+        self._pages: "OrderedDict[int, list]" = OrderedDict()
+        self._x0 = 0
+        self._y0 = 0
+        self._redraw_pending = False
+
+        self.canvas.bind("<Configure>", lambda e: self._schedule_redraw())
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Shift-MouseWheel>", self._on_shift_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self._scroll_rows(-3))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll_rows(3))
+        self.canvas.bind("<Shift-Button-4>", lambda e: self._scroll_px(-self.col_width, 0))
+        self.canvas.bind("<Shift-Button-5>", lambda e: self._scroll_px(self.col_width, 0))
+
+        self._schedule_redraw()
+
+    # ------------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------------
+    def set_dataframe(self, df: Optional[pd.DataFrame]):
+        """Show a DataFrame (None clears the grid). Rows are read lazily."""
+        self._df = df
+        self._columns = [] if df is None else [str(c) for c in df.columns]
+        self._pages.clear()
+        self._x0 = self._y0 = 0
+        self._schedule_redraw()
+
+    def clear(self):
+        self.set_dataframe(None)
+
+    @property
+    def row_count(self) -> int:
+        return 0 if self._df is None else len(self._df)
+
+    def _page(self, page_index: int) -> list:
+        """Rows of one page as display strings, kept in a small LRU"""
+        page = self._pages.get(page_index)
+        if page is not None:
+            self._pages.move_to_end(page_index)
+            return page
+
+        start = page_index * self.page_rows
+        block = self._df.iloc[start:start + self.page_rows]
+        page = [
+            [self._format(v) for v in values]
+            for values in block.itertuples(index=False, name=None)
+        ]
+        self._pages[page_index] = page
+        while len(self._pages) > config.PREVIEW_CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return page
+
+    def _format(self, value) -> str:
+        if value is None or (not isinstance(value, str) and pd.isna(value)):
+            return ""
+        text = str(value).replace("\n", " ")
+        if len(text) > self._max_chars:
+            text = text[:max(1, self._max_chars - 1)] + "…"
+        return text
+
+    # ------------------------------------------------------------------------
+    # Scrolling (scrollbar protocol)
+    # ------------------------------------------------------------------------
+    def _extent(self):
+        """Scrollable content size and viewport size in pixels (excluding frozen parts)"""
+        width = max(1, self.canvas.winfo_width() - self.gutter_width)
+        height = max(1, self.canvas.winfo_height() - self.row_height)
+        return (len(self._columns) * self.col_width, self.row_count * self.row_height,
+                width, height)
+
+    def xview(self, *args):
+        total_w, _, view_w, _ = self._extent()
+        self._x0 = self._apply_view(args, self._x0, total_w, view_w, self.col_width)
+        self._schedule_redraw()
+
+    def yview(self, *args):
+        _, total_h, _, view_h = self._extent()
+        self._y0 = self._apply_view(args, self._y0, total_h, view_h, self.row_height)
+        self._schedule_redraw()
+
+    @staticmethod
+    def _apply_view(args, offset: int, total: int, view: int, unit: int) -> int:
+        if not args:
+            return offset
+        if args[0] == "moveto":
+            offset = int(float(args[1]) * total)
+        elif args[0] == "scroll":
+            step = unit if args[2] == "units" else max(unit, view - unit)
+            offset += int(args[1]) * step
+        return max(0, min(offset, max(0, total - view)))
+
+    def _scroll_px(self, dx: int, dy: int):
+        total_w, total_h, view_w, view_h = self._extent()
+        self._x0 = max(0, min(self._x0 + dx, max(0, total_w - view_w)))
+        self._y0 = max(0, min(self._y0 + dy, max(0, total_h - view_h)))
+        self._schedule_redraw()
+
+    def _scroll_rows(self, rows: int):
+        self._scroll_px(0, rows * self.row_height)
+
+    def _on_wheel(self, event):
+        self._scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_shift_wheel(self, event):
+        self._scroll_px(-self.col_width if event.delta > 0 else self.col_width, 0)
+
+    # ------------------------------------------------------------------------
+    # Rendering
+    # ------------------------------------------------------------------------
+    def _schedule_redraw(self):
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._redraw)
+
+    def _redraw(self):
+        self._redraw_pending = False
+        c = self.colors
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        total_w, total_h, view_w, view_h = self._extent()
+
+        # Keep offsets valid after resizes or a new, smaller DataFrame
+        self._x0 = max(0, min(self._x0, max(0, total_w - view_w)))
+        self._y0 = max(0, min(self._y0, max(0, total_h - view_h)))
+        self.hbar.set(*self._fractions(self._x0, view_w, total_w))
+        self.vbar.set(*self._fractions(self._y0, view_h, total_h))
+
+        if self._df is None or not self._columns:
+            if self.placeholder:
+                self._frame_texts.take(width // 2, height // 2, text=self.placeholder,
+                                       fill=c["placeholder"], font=self.font, anchor="center")
+            self._finish()
+            return
+
+        rh, cw, gw = self.row_height, self.col_width, self.gutter_width
+        first_col = self._x0 // cw
+        last_col = min(len(self._columns), (self._x0 + view_w) // cw + 1)
+        first_row = self._y0 // rh
+        last_row = min(self.row_count, (self._y0 + view_h) // rh + 1)
+
+        for r in range(first_row, last_row):
+            y = rh + r * rh - self._y0
+            values = self._page(r // self.page_rows)[r % self.page_rows]
+            if r % 2:
+                self._body_rects.take(gw, y, width, y + rh, fill=c["row_alt"])
+            for ci in range(first_col, last_col):
+                x = gw + ci * cw - self._x0
+                self._body_texts.take(x + 6, y + rh // 2, text=values[ci], fill=c["fg"],
+                                      font=self.font, anchor="w")
+            # Frozen gutter: 1-based row number (matches the Excel row / start row)
+            if y + rh // 2 < rh:
+                continue  # partially scrolled up under the header
+            self._frame_texts.take(gw - 6, y + rh // 2, text=str(r + 1),
+                                   fill=c["gutter_fg"], font=self.font, anchor="e")
+        self._frame_rects.take(0, rh, gw, height, fill=c["gutter_bg"])
+
+        # Frozen header
+        self._frame_rects.take(0, 0, width, rh, fill=c["header_bg"])
+        for ci in range(first_col, last_col):
+            x = gw + ci * cw - self._x0
+            if x < gw:
+                continue  # partially scrolled out under the gutter
+            self._frame_texts.take(x + 6, rh // 2, text=self._format(self._columns[ci]),
+                                   fill=c["header_fg"], font=self.header_font, anchor="w")
+        self._finish()
+
+    def _finish(self):
+        for pool in self._pools:
+            pool.finish()
+        for pool in self._pools:
+            self.canvas.tag_raise(pool.tag)
+
+    @staticmethod
+    def _fractions(offset: int, view: int, total: int):
+        if total <= 0:
+            return 0.0, 1.0
+        return offset / total, min(1.0, (offset + view) / total)
@@ -0,0 +1,139 @@
+"""
+Velo Bot Profile Maintenance
+Measures the persistent Chrome session profile and prunes its cache
+directories (HTTP cache, code cache, GPU / shader caches, service worker
+script caches) without touching login state. Pruning is refused while a
+Chrome process holds the profile.
+"""
+
+import os
+import shutil
+import socket
+from collections import namedtuple
+from pathlib import Path
+from typing import Optional
+
+from . import config
+from . import utils
+
+PruneResult = namedtuple('PruneResult', ['freed_bytes', 'removed', 'skipped_reason'])
+
+def _profile_dir(profile=None) -> Path:
+    return Path(config.SESSION_DIR if profile is None else profile)
+
+def _tree_size(path: Path) -> int:
+    """Bytes of all regular files below path (symlinks are not followed)"""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue  # deleted meanwhile
+            total += stat.st_size
+    return total
+
+# ============================================================================
+# MEASURING
+# ============================================================================
+def profile_size(profile=None) -> int:
+    """Total bytes of the session profile"""
+    path = _profile_dir(profile)
+    return _tree_size(path) if path.is_dir() else 0
+
+def cache_dirs(profile=None):
+    """Existing config.PROFILE_CACHE_DIRS of the profile (never outside it)"""
+    base = _profile_dir(profile).resolve()
+    for relative in config.PROFILE_CACHE_DIRS:
+        path = base / relative
+        if path.is_dir() and not path.is_symlink() and base in path.resolve().parents:
+            yield path
+
+def cache_size(profile=None) -> int:
+    """Bytes that prune() would free"""
+    return sum(_tree_size(path) for path in cache_dirs(profile))
+
+def describe(profile=None) -> str:
+    """Settings text such as "Browser profile: 1,204 MB (cache 967 MB)" """
+    return (f"Browser profile: {profile_size(profile) / 1048576:,.0f} MB "
+            f"(cache {cache_size(profile) / 1048576:,.0f} MB)")
+
+# ============================================================================
+# PRUNING
+# ============================================================================
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def profile_in_use(profile=None) -> bool:
+    """
+    True while a Chrome process holds the profile
+
+    POSIX Chrome keeps a SingletonLock symlink to "<host>-<pid>" (stale ones
+    left by a crash are recognized); Windows Chrome keeps "lockfile" open
+    exclusively.
+    """
+    base = _profile_dir(profile)
+    lock = base / "SingletonLock"
+    if os.path.lexists(lock):
+        try:
+            host, _, pid = os.readlink(lock).rpartition("-")
+            if host == socket.gethostname() and pid.isdigit():
+                return _pid_alive(int(pid))
+        except OSError:
+            pass
+        return True
+    lockfile = base / "lockfile"
+    if lockfile.exists():
+        try:
+            with open(lockfile, "a"):
+                pass
+        except OSError:
+            return True
+    return False
+
+def prune(profile=None) -> PruneResult:
+    """
+    Delete the profile's cache directories (Chrome recreates them)
+
+    Args:
+        profile: Profile directory (default config.SESSION_DIR)
+
+    Returns:
+        PruneResult(freed_bytes, removed dirs, skipped_reason or None)
+    """
+    if profile_in_use(profile):
+        utils.log_message("Browser profile is in use; cache not pruned", "WARNING")
+        return PruneResult(0, [], "Chrome is using the profile")
+    freed, removed = 0, []
+    for path in list(cache_dirs(profile)):
+        size = _tree_size(path)
+        shutil.rmtree(path, ignore_errors=True)
+        if not path.exists():
+            freed += size
+            removed.append(str(path))
+    utils.log_message(f"Pruned browser cache: {freed / 1048576:,.1f} MB freed "
+                      f"from {len(removed)} directories", "INFO")
+    return PruneResult(freed, removed, None)
+
+def maybe_prune(profile=None, min_bytes: Optional[int] = None) -> Optional[PruneResult]:
+    """
+    Prune before a campaign launches Chrome, once the caches outgrow the limit
+
+    Args:
+        profile: Profile directory (default config.SESSION_DIR)
+        min_bytes: Threshold (default config.PROFILE_PRUNE_MIN_MB; 0 disables)
+
+    Returns:
+        PruneResult, or None if nothing was due
+    """
+    if min_bytes is None:
+        min_bytes = config.PROFILE_PRUNE_MIN_MB * 1024 * 1024
+    if not min_bytes or cache_size(profile) < min_bytes:
+        return None
+    return prune(profile)
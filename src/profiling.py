@@ -0,0 +1,119 @@
+"""
+Velo Bot Profiling
+Opt-in diagnostics: wraps file loading, contact preparation and the campaign
+loop in cProfile and tracemalloc, writing .prof files and top-allocation
+reports into a timestamped folder under config.DIAGNOSTICS_DIR. When
+disabled, section() is a shared no-op context manager.
+"""
+
+import contextlib
+import cProfile
+import threading
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from . import config
+from . import utils
+
+_NO_OP = contextlib.nullcontext()
+
+class Profiler:
+    """
+    Profiles named sections of work into one diagnostics folder per session
+
+    Sections may run on worker threads; cProfile only sees the thread that
+    entered the section, tracemalloc sees the whole process.
+    """
+
+    def __init__(self, enabled: bool = False, root=None):
+        """
+        Args:
+            enabled: Start enabled (can be toggled later)
+            root: Parent of the diagnostics folders (default config.DIAGNOSTICS_DIR)
+        """
+        self.enabled = enabled
+        self.root = Path(config.DIAGNOSTICS_DIR if root is None else root)
+        self.directory: Optional[Path] = None
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._active = 0                 # open sections, across threads
+        self._started_tracing = False    # tracemalloc was started by this profiler
+
+    def section(self, name: str):
+        """Context manager profiling the enclosed block (no-op when disabled)"""
+        if not self.enabled:
+            return _NO_OP
+        return self._profile(name)
+
+    def _output_stem(self, name: str) -> Path:
+        with self._lock:
+            if self.directory is None:
+                self.directory = self.root / datetime.now().strftime("%Y%m%d_%H%M%S")
+                self.directory.mkdir(parents=True, exist_ok=True)
+                utils.log_message(f"Profiling enabled: writing to {self.directory}", "INFO")
+            count = self._counts[name] = self._counts.get(name, 0) + 1
+        return self.directory / (name if count == 1 else f"{name}_{count}")
+
+    @contextlib.contextmanager
+    def _profile(self, name: str):
+        stem = self._output_stem(name)
+        self._enter_tracing()
+        try:
+            before = tracemalloc.take_snapshot()
+        except BaseException:
+            self._exit_tracing()
+            raise
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Another profiler is active on this thread (nested section)
+            utils.log_message(f"cProfile unavailable for {name}: {e}", "DEBUG")
+            profile = None
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+                profile.dump_stats(stem.with_suffix(".prof"))
+            try:
+                after = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                self._exit_tracing()
+            _write_allocations(stem.with_name(stem.name + "_alloc.txt"), name, before, after,
+                               current, peak)
+            utils.log_message(f"Profile of {name} written to {stem}.*", "INFO")
+
+    def _enter_tracing(self):
+        """Count an open section; the first one starts tracemalloc if it is off"""
+        with self._lock:
+            if self._active == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start(config.PROFILE_TRACE_FRAMES)
+                self._started_tracing = True
+            self._active += 1
+
+    def _exit_tracing(self):
+        """Close a section; the last one stops tracemalloc if this profiler started it"""
+        with self._lock:
+            self._active -= 1
+            if self._active == 0 and self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+def _write_allocations(path: Path, name: str, before, after, current: int, peak: int):
+    """Top allocations grown during the section, and the largest still alive"""
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    before, after = before.filter_traces(ignore), after.filter_traces(ignore)
+    top = config.PROFILE_TOP_ALLOCATIONS
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{name}: traced memory {current / 1048576:.1f} MB, peak {peak / 1048576:.1f} MB\n\n")
+        f.write(f"Top {top} allocation growth (by line)\n")
+        for stat in after.compare_to(before, "lineno")[:top]:
+            f.write(f"  {stat}\n")
+        f.write(f"\nTop {top} live allocations at the end (by line)\n")
+        for stat in after.statistics("lineno")[:top]:
+            f.write(f"  {stat}\n")
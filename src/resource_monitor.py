@@ -0,0 +1,206 @@
+"""
+Velo Bot Resource Monitor
+Samples the memory, CPU and open handles of the WebDriver's process tree
+(chromedriver + Chrome) at low frequency and flags when the browser should
+be recycled. Reads /proc on Linux and falls back to psutil when installed.
+"""
+
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from . import config
+from . import utils
+
+ResourceSample = namedtuple('ResourceSample', ['timestamp', 'rss_bytes', 'cpu_percent',
+                                               'handles', 'processes'])
+
+PROC = Path("/proc")
+
+# ============================================================================
+# PROCESS TREE
+# ============================================================================
+def driver_pid(driver) -> Optional[int]:
+    """PID of the chromedriver process behind a Selenium driver"""
+    try:
+        return driver.service.process.pid
+    except AttributeError:
+        return None
+
+def _proc_children() -> Dict[int, List[int]]:
+    """Parent pid -> child pids, from /proc/<pid>/stat"""
+    children: Dict[int, List[int]] = {}
+    for entry in PROC.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # Field 4 (ppid) follows the parenthesized command name
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+    return children
+
+def process_tree(root_pid: int) -> List[int]:
+    """root_pid and all of its descendants (/proc)"""
+    children = _proc_children()
+    tree, stack = [], [root_pid]
+    while stack:
+        pid = stack.pop()
+        tree.append(pid)
+        stack.extend(children.get(pid, []))
+    return tree
+
+def _read_proc(pid: int):
+    """(rss bytes, cpu ticks, open fds) of one process from /proc"""
+    base = PROC / str(pid)
+    fields = (base / "stat").read_text().rsplit(")", 1)[1].split()
+    ticks = int(fields[11]) + int(fields[12])          # utime + stime
+    rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+    try:
+        handles = len(os.listdir(base / "fd"))
+    except OSError:
+        handles = 0
+    return rss, ticks, handles
+
+# ============================================================================
+# SAMPLER
+# ============================================================================
+class ResourceMonitor:
+    """
+    Low-frequency sampler of the browser's process tree
+
+    Samples are taken on a daemon thread every config.RESOURCE_SAMPLE_SECONDS;
+    recycle_reason() is checked by the run loop at safe points.
+    """
+
+    def __init__(self, get_driver: Callable, on_sample: Optional[Callable] = None,
+                 interval: float = None, history: int = None):
+        """
+        Args:
+            get_driver: Returns the current driver (changes after a recycle)
+            on_sample: Optional callback(ResourceSample), called on the sampler thread
+            interval: Seconds between samples (default config.RESOURCE_SAMPLE_SECONDS)
+            history: Samples kept (default config.RESOURCE_HISTORY)
+        """
+        self.get_driver = get_driver
+        self.on_sample = on_sample
+        self.interval = config.RESOURCE_SAMPLE_SECONDS if interval is None else interval
+        self.samples = deque(maxlen=config.RESOURCE_HISTORY if history is None else history)
+        self._cpu_ticks: Dict[int, int] = {}
+        self._cpu_time = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    def _measure(self, root_pid: int):
+        """Totals over the tree: (rss, cpu ticks by pid, handles, process count)"""
+        if PROC.is_dir():
+            rss = handles = 0
+            ticks = {}
+            for pid in process_tree(root_pid):
+                try:
+                    p_rss, p_ticks, p_handles = _read_proc(pid)
+                except (OSError, IndexError, ValueError):
+                    continue  # exited meanwhile
+                rss += p_rss
+                handles += p_handles
+                ticks[pid] = p_ticks
+            return rss, ticks, handles, os.sysconf("SC_CLK_TCK")
+
+        try:
+            import psutil
+        except ImportError:
+            return None
+        try:
+            root = psutil.Process(root_pid)
+            procs = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        rss = handles = 0
+        ticks = {}
+        for proc in procs:
+            try:
+                rss += proc.memory_info().rss
+                times = proc.cpu_times()
+                ticks[proc.pid] = int((times.user + times.system) * 100)
+                handles += proc.num_handles() if hasattr(proc, "num_handles") else proc.num_fds()
+            except psutil.Error:
+                continue
+        return rss, ticks, handles, 100
+
+    def sample(self) -> Optional[ResourceSample]:
+        """
+        Take one sample now (also used right after a recycle)
+
+        Returns:
+            ResourceSample, or None if the driver's processes cannot be read
+        """
+        driver = self.get_driver()
+        pid = driver_pid(driver) if driver is not None else None
+        if pid is None:
+            return None
+        measured = self._measure(pid)
+        if measured is None:
+            return None
+        rss, ticks, handles, ticks_per_second = measured
+
+        now = time.monotonic()
+        cpu = 0.0
+        if self._cpu_time is not None and now > self._cpu_time:
+            # Only processes seen in both samples; new ones count from the next sample
+            used = sum(t - self._cpu_ticks[pid] for pid, t in ticks.items() if pid in self._cpu_ticks)
+            cpu = 100.0 * max(used, 0) / ticks_per_second / (now - self._cpu_time)
+        self._cpu_ticks, self._cpu_time = ticks, now
+
+        sample = ResourceSample(time.time(), rss, cpu, handles, len(ticks))
+        self.samples.append(sample)
+        if self.on_sample:
+            self.on_sample(sample)
+        return sample
+
+    # ------------------------------------------------------------------
+    def start(self) -> "ResourceMonitor":
+        def _loop():
+            while not self._stop.wait(self.interval):
+                try:
+                    self.sample()
+                except Exception as e:
+                    utils.log_message(f"Resource sample failed: {e}", "DEBUG")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # ------------------------------------------------------------------
+    def latest(self) -> Optional[ResourceSample]:
+        return self.samples[-1] if self.samples else None
+
+    def recycle_reason(self) -> Optional[str]:
+        """
+        Why the browser should be recycled, based on the latest sample
+
+        Returns:
+            Reason text, or None while within config.RECYCLE_RSS_MB / RECYCLE_HANDLES
+        """
+        sample = self.latest()
+        if sample is None:
+            return None
+        if config.RECYCLE_RSS_MB and sample.rss_bytes > config.RECYCLE_RSS_MB * 1024 * 1024:
+            return f"browser memory {sample.rss_bytes / 1048576:.0f} MB > {config.RECYCLE_RSS_MB} MB"
+        if config.RECYCLE_HANDLES and sample.handles > config.RECYCLE_HANDLES:
+            return f"{sample.handles} open handles > {config.RECYCLE_HANDLES}"
+        return None
+
+def describe(sample: ResourceSample) -> str:
+    """Dashboard text such as "Chrome: 812 MB · CPU 4% · 1,203 handles · 9 processes" """
+    return (f"Chrome: {sample.rss_bytes / 1048576:,.0f} MB · CPU {sample.cpu_percent:.0f}% · "
+            f"{sample.handles:,} handles · {sample.processes} processes")
@@ -0,0 +1,301 @@
+"""
+Velo Bot Results Report
+Streams one CSV row per send attempt while a campaign runs and, at the end,
+writes a copy of the source spreadsheet with per-row status columns
+"""
+
+import csv
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+
+from . import config
+from . import utils
+from . import retry_queue
+from . import data_processor
+from . import sheets_fetcher
+from . import send_confirmation
+from .campaign_refresh import is_sheets_url
+
+RESULT_COLUMNS = [
+    'original_row', 'phone', 'name', 'attempt', 'status', 'failure_class', 'confirmation',
+    'started_at', 'finished_at', 'open_seconds', 'compose_seconds', 'send_seconds',
+    'confirm_seconds', 'total_seconds',
+]
+
+# Send stages timed by whatsapp_bot.attempt_send ('confirm': Enter -> sent tick)
+STAGES = ('open', 'compose', 'send', 'confirm')
+
+STATUS_HEADERS = ['Send Status', 'Failure Reason', 'Attempts', 'Last Attempt',
+                  'Confirmation', 'Confirm Seconds']
+
+def failure_class(outcome: str) -> str:
+    """'' for a sent message, 'transient' or 'permanent' for failures"""
+    if outcome == retry_queue.SENT:
+        return ""
+    return "transient" if outcome in retry_queue.TRANSIENT else "permanent"
+
+def new_results_path(source: Optional[str]) -> Path:
+    """Timestamped results CSV in config.RESULTS_DIR, named after the source"""
+    config.RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    if source and not is_sheets_url(source):
+        stem = Path(source).stem
+    else:
+        stem = "sheet"
+    return config.RESULTS_DIR / f"{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_results.csv"
+
+# ============================================================================
+# STREAMING WRITER
+# ============================================================================
+class ResultsWriter:
+    """
+    Appends one row per send attempt to a CSV, flushed after every row
+
+    Appending lets a resumed campaign continue the same file; attempt numbers
+    carry on from the rows already in it, and its header (possibly from an
+    older version with fewer columns) is kept.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Results CSV (created with a header if missing or empty)
+        """
+        self.path = Path(path)
+        self._attempts: Dict[tuple, int] = {}
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, newline='', encoding='utf-8') as f:
+                columns = next(csv.reader(f))
+            for row in _read_results(self.path):
+                key = (row['original_row'], row['phone'])
+                self._attempts[key] = max(self._attempts.get(key, 0), int(row['attempt'] or 0))
+            self._file = open(self.path, 'a', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, columns, extrasaction='ignore')
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, RESULT_COLUMNS, extrasaction='ignore')
+            self._writer.writeheader()
+            self._file.flush()
+
+    def record(self, contact: Dict, outcome: str, started: datetime, finished: datetime,
+               stages: Optional[Dict[str, float]] = None,
+               confirmation: Optional[str] = None) -> Dict:
+        """
+        Append one attempt
+
+        Args:
+            contact: Contact dictionary (original_row, phone, name)
+            outcome: retry_queue outcome of the attempt
+            started: Wall-clock start of the attempt
+            finished: Wall-clock end of the attempt
+            stages: Seconds per stage in STAGES (missing stages stay empty)
+            confirmation: send_confirmation state of a sent message
+
+        Returns:
+            The row written (column -> value)
+        """
+        stages = stages or {}
+        key = (str(contact.get('original_row', '')), str(contact.get('phone', '')))
+        attempt = self._attempts.get(key, 0) + 1
+        self._attempts[key] = attempt
+        row = {
+            'original_row': contact.get('original_row', ''), 'phone': contact.get('phone', ''),
+            'name': contact.get('name', ''), 'attempt': attempt, 'status': outcome,
+            'failure_class': failure_class(outcome), 'confirmation': confirmation or '',
+            'started_at': started.isoformat(timespec='seconds'),
+            'finished_at': finished.isoformat(timespec='seconds'),
+            'total_seconds': _seconds((finished - started).total_seconds()),
+        }
+        for stage in STAGES:
+            row[f'{stage}_seconds'] = _seconds(stages.get(stage))
+        self._writer.writerow(row)
+        self._file.flush()
+        return row
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "ResultsWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _seconds(value: Optional[float]) -> str:
+    return "" if value is None else f"{value:.3f}"
+
+def _read_results(path: Path) -> Iterator[Dict[str, str]]:
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+# ============================================================================
+# FINAL STATUS
+# ============================================================================
+def final_statuses(results_path) -> Dict[int, Dict[str, str]]:
+    """
+    Last attempt per source row
+
+    Args:
+        results_path: Results CSV written by ResultsWriter
+
+    Returns:
+        Dictionary of original_row -> {'status', 'reason', 'attempts', 'last_attempt',
+        'confirmation', 'confirm_seconds'}
+    """
+    statuses = {}
+    for row in _read_results(Path(results_path)):
+        try:
+            original_row = int(row['original_row'])
+        except (TypeError, ValueError):
+            continue
+        sent = row['status'] == retry_queue.SENT
+        statuses[original_row] = {
+            'status': "Sent" if sent else "Failed",
+            'reason': "" if sent else retry_queue.describe(row['status']),
+            'attempts': int(row['attempt'] or 0),
+            'last_attempt': row['finished_at'],
+            'confirmation': send_confirmation.describe(row.get('confirmation') or ''),
+            'confirm_seconds': row.get('confirm_seconds') or '',
+        }
+    return statuses
+
+def source_file(source: str) -> Optional[Path]:
+    """Local file behind a campaign source (the cached download for a Sheets URL)"""
+    if not source:
+        return None
+    if is_sheets_url(source):
+        path = sheets_fetcher.cache_paths(sheets_fetcher.sheets_url_to_csv(source))[0]
+    else:
+        path = Path(source)
+    return path if path.exists() else None
+
+def _is_blank(row) -> bool:
+    return all(value is None or str(value).strip() == "" for value in row)
+
+def _source_rows(path: Path) -> Iterator[list]:
+    """
+    Header then data rows of a spreadsheet, streamed without loading it whole
+
+    Rows are the ones pandas reads: CSV lines that are empty or whitespace
+    only are skipped (pd.read_csv skip_blank_lines), while delimiter-only
+    CSV lines and blank Excel rows are kept.
+    """
+    suffix = path.suffix.lower()
+    if suffix == '.csv':
+        encoding, delimiter = data_processor.sniff_csv(path)
+        with open(path, newline='', encoding=encoding) as f:
+            for row in csv.reader(f, delimiter=delimiter):
+                if len(row) <= 1 and _is_blank(row):
+                    continue
+                yield row
+    elif suffix == '.xlsx':
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+    else:
+        df = pd.read_excel(path, dtype=str, header=None)
+        for row in df.itertuples(index=False):
+            yield ["" if pd.isna(value) else value for value in row]
+
+# ============================================================================
+# ANNOTATED SPREADSHEET
+# ============================================================================
+def write_annotated(source, results_path, out_path=None) -> Path:
+    """
+    Copy the source spreadsheet to .xlsx with status columns appended
+
+    Rows are streamed from the source and into an openpyxl write-only
+    workbook, so memory stays flat for large lists. Rows are numbered like
+    prepare_contacts' original_row (first data row = 1, counted over the
+    rows pandas reads, blank ones included).
+
+    Args:
+        source: Spreadsheet path or Sheets URL the campaign was loaded from
+        results_path: Results CSV written by ResultsWriter
+        out_path: Destination .xlsx (default: results file name + _annotated.xlsx)
+
+    Returns:
+        Path written
+
+    Raises:
+        FileNotFoundError: If the source file is no longer available
+    """
+    path = source_file(source)
+    if path is None:
+        raise FileNotFoundError(f"Source spreadsheet not found: {source}")
+    results_path = Path(results_path)
+    if out_path is None:
+        out_path = results_path.with_name(results_path.stem.replace('_results', '') + '_annotated.xlsx')
+    out_path = Path(out_path)
+    statuses = final_statuses(results_path)
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Results")
+    header = None
+    data_row = 0
+    counts = {"Sent": 0, "Failed": 0, "Not sent": 0}
+    for row in _source_rows(path):
+        if header is None:
+            header = list(row)
+            sheet.append(header + STATUS_HEADERS)
+            continue
+        row = list(row) + [None] * (len(header) - len(row))
+        data_row += 1
+        status = statuses.get(data_row)
+        if status is None and _is_blank(row):
+            sheet.append(row)
+        elif status is None:
+            counts["Not sent"] += 1
+            sheet.append(row + ["Not sent", "", 0, "", "", ""])
+        else:
+            counts[status['status']] += 1
+            confirm_seconds = status['confirm_seconds']
+            sheet.append(row + [status['status'], status['reason'],
+                                status['attempts'], status['last_attempt'],
+                                status['confirmation'],
+                                float(confirm_seconds) if confirm_seconds else None])
+    workbook.save(out_path)
+    utils.log_message(f"Annotated spreadsheet saved to {out_path} "
+                      f"({counts['Sent']} sent, {counts['Failed']} failed, "
+                      f"{counts['Not sent']} not sent)", "INFO")
+    return out_path
+
+def export_failed(failed_contacts: List[Dict], file_path) -> Path:
+    """
+    Write failed contacts as a real CSV (.csv) or the readable text list
+
+    Args:
+        failed_contacts: Dicts with name, phone, reason, timestamp
+        file_path: Destination; a .csv suffix selects CSV output
+
+    Returns:
+        Path written
+    """
+    path = Path(file_path)
+    fields = ['name', 'phone', 'reason', 'timestamp']
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        if path.suffix.lower() == '.csv':
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            for contact in failed_contacts:
+                writer.writerow({field: contact.get(field, '') for field in fields})
+        else:
+            f.write("Failed WhatsApp Numbers\n")
+            f.write("=" * 60 + "\n")
+            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"Total Failed: {len(failed_contacts)}\n")
+            f.write("=" * 60 + "\n\n")
+            for idx, contact in enumerate(failed_contacts, 1):
+                f.write(f"{idx}. {contact.get('name', '')}\n")
+                f.write(f"   Phone: {contact.get('phone', '')}\n")
+                f.write(f"   Reason: {contact.get('reason', 'Unknown')}\n")
+                f.write(f"   Time: {contact.get('timestamp', 'Unknown')}\n\n")
+    return path
@@ -0,0 +1,130 @@
+"""
+Velo Bot Retry Queue
+Classifies send failures and defers transient ones (timeouts, driver errors)
+to a queue that is drained with backoff after the main pass. Invalid numbers
+are never retried.
+"""
+
+import time
+from typing import Callable, Dict, List, Optional
+
+from . import config
+from . import utils
+
+# ============================================================================
+# SEND OUTCOMES
+# ============================================================================
+SENT = "sent"
+INVALID_NUMBER = "invalid_number"
+TIMEOUT = "timeout"
+DRIVER_ERROR = "driver_error"
+
+# Failures worth another attempt later
+TRANSIENT = (TIMEOUT, DRIVER_ERROR)
+
+REASONS = {
+    INVALID_NUMBER: "Invalid number",
+    TIMEOUT: "Timeout",
+    DRIVER_ERROR: "Driver error",
+}
+
+def describe(outcome: str) -> str:
+    """Human-readable failure reason for failed_contacts and logs"""
+    return REASONS.get(outcome, "Send failed")
+
+# ============================================================================
+# QUEUE
+# ============================================================================
+class RetryQueue:
+    """
+    Deferred retries of transiently failed contacts
+
+    Each entry is a JSON-serializable dict:
+        contact  - the contact dictionary
+        reason   - outcome of the last attempt
+        attempts - failed attempts so far
+        due      - wall-clock time (epoch seconds) of the next attempt, so the
+                   backoff survives a restart
+    """
+
+    def __init__(self, entries: Optional[List[Dict]] = None, max_retries: int = None,
+                 retry_delay: float = None):
+        """
+        Args:
+            entries: Entries restored from saved progress
+            max_retries: Retries per contact (default config.MAX_RETRIES)
+            retry_delay: Backoff base in seconds (default config.RETRY_DELAY),
+                doubled after every failed retry
+        """
+        self.entries: List[Dict] = list(entries or [])
+        self.max_retries = config.MAX_RETRIES if max_retries is None else max_retries
+        self.retry_delay = config.RETRY_DELAY if retry_delay is None else retry_delay
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def to_list(self) -> List[Dict]:
+        """Entries for the progress file"""
+        return list(self.entries)
+
+    def record_failure(self, contact: Dict, outcome: str, attempts: int = 1) -> bool:
+        """
+        Queue a failed contact if the failure is transient and retries are left
+
+        Args:
+            contact: Contact that failed
+            outcome: Send outcome (INVALID_NUMBER, TIMEOUT, DRIVER_ERROR)
+            attempts: Failed attempts including this one
+
+        Returns:
+            True if queued, False if the failure is permanent
+        """
+        if outcome not in TRANSIENT or attempts > self.max_retries:
+            return False
+        self.entries.append({
+            'contact': contact,
+            'reason': outcome,
+            'attempts': attempts,
+            'due': time.time() + self.retry_delay * 2 ** (attempts - 1),
+        })
+        return True
+
+    def drain(self, send: Callable[[Dict], str], wait: Callable[[float], bool],
+              on_result: Callable[[Dict, str], None],
+              min_gap: Optional[Callable[[], float]] = None,
+              on_requeue: Optional[Callable[[Dict, str], None]] = None):
+        """
+        Retry queued contacts, earliest due first, until the queue is empty
+
+        Args:
+            send: send(contact) -> outcome
+            wait: wait(seconds) -> False if the run was stopped meanwhile; called
+                before every retry (with 0 when it is already due), so it is
+                also where the caller pauses between retries
+            on_result: on_result(contact, outcome) for every contact that was
+                sent or failed for good (not for re-queued ones)
+            min_gap: Optional callable giving the regular delay between
+                messages, applied even when the backoff has already expired
+            on_requeue: Optional on_requeue(contact, outcome) for contacts
+                queued again after a failed retry
+
+        An entry leaves the queue only once send() returns, so a send that
+        raises keeps it queued (and in the saved progress).
+        """
+        while self.entries:
+            entry = min(self.entries, key=lambda e: e['due'])
+            pause = max(entry['due'] - time.time(), min_gap() if min_gap else 0.0)
+            if not wait(max(pause, 0.0)):
+                return
+
+            contact = entry['contact']
+            attempt = entry['attempts'] + 1
+            utils.log_message(
+                f"Retry {attempt - 1}/{self.max_retries} for {contact['name']} "
+                f"({contact['phone']}) after {describe(entry['reason']).lower()}", "INFO")
+            outcome = send(contact)
+            self.entries.remove(entry)
+            if outcome == SENT or not self.record_failure(contact, outcome, attempt):
+                on_result(contact, outcome)
+            elif on_requeue is not None:
+                on_requeue(contact, outcome)
@@ -0,0 +1,208 @@
+"""
+Velo Bot Selector Registry
+Every WhatsApp Web element is looked up by logical name through an ordered
+list of candidate locators (CSS fast paths first, XPath fallbacks). The
+candidate that last matched is tried first, lookup time and hit rate are
+recorded per locator, and candidates can be replaced by a versioned JSON
+selector pack so a markup change does not need a new build.
+"""
+
+import json
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import InvalidSelectorException
+
+from . import config
+from . import utils
+
+STRATEGIES = {
+    "css": By.CSS_SELECTOR,
+    "xpath": By.XPATH,
+}
+
+LocatorStats = namedtuple('LocatorStats', ['element', 'strategy', 'value', 'lookups', 'hits',
+                                           'seconds'])
+
+# ============================================================================
+# SELECTOR PACKS
+# ============================================================================
+def _validate(selectors: Dict) -> Dict[str, List[Tuple[str, str]]]:
+    """Normalize {name: [[strategy, value], ...]}; ValueError if malformed"""
+    if not isinstance(selectors, dict):
+        raise ValueError("'selectors' must be an object of element -> locator list")
+    validated = {}
+    for name, candidates in selectors.items():
+        if not isinstance(candidates, list) or not candidates:
+            raise ValueError(f"{name}: expected a non-empty list of locators")
+        locators = []
+        for candidate in candidates:
+            if (not isinstance(candidate, (list, tuple)) or len(candidate) != 2
+                    or candidate[0] not in STRATEGIES or not isinstance(candidate[1], str)):
+                raise ValueError(f"{name}: bad locator {candidate!r} "
+                                 f"(expected [\"css\" or \"xpath\", selector])")
+            locators.append((candidate[0], candidate[1]))
+        validated[name] = locators
+    return validated
+
+def load_pack(path) -> Tuple[str, Dict[str, List[Tuple[str, str]]]]:
+    """
+    Read a selector pack
+
+    Args:
+        path: JSON file {"version": "...", "selectors": {name: [[strategy, value], ...]}}
+
+    Returns:
+        (version, selectors)
+
+    Raises:
+        ValueError: If the pack is malformed
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        try:
+            pack = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"not valid JSON: {e}") from e
+    if not isinstance(pack, dict):
+        raise ValueError("pack must be a JSON object")
+    return str(pack.get('version', 'unversioned')), _validate(pack.get('selectors', {}))
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+class SelectorRegistry:
+    """
+    Logical element name -> ordered candidate locators, with self-healing order
+
+    Lookups may come from several threads (send loop, GUI); the bookkeeping
+    is guarded by a lock, the WebDriver calls are not.
+    """
+
+    def __init__(self, selectors: Dict[str, List[Tuple[str, str]]], version: str = "builtin"):
+        """
+        Args:
+            selectors: Element name -> [(strategy, value), ...] in preference order
+            version: Pack version (for logs)
+        """
+        self.version = version
+        self.selectors = {name: list(candidates) for name, candidates in selectors.items()}
+        self._preferred: Dict[str, int] = {}
+        self._stats: Dict[Tuple[str, int], List] = {}   # (name, index) -> [lookups, hits, seconds]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, pack_file=None) -> "SelectorRegistry":
+        """
+        config.SELECTORS, with elements replaced by the selector pack if present
+
+        Args:
+            pack_file: Pack path (default config.SELECTOR_PACK_FILE)
+        """
+        selectors = {name: list(candidates) for name, candidates in config.SELECTORS.items()}
+        version = "builtin"
+        path = Path(config.SELECTOR_PACK_FILE if pack_file is None else pack_file)
+        if path.exists():
+            try:
+                version, pack = load_pack(path)
+                selectors.update(pack)
+                utils.log_message(f"Selector pack {version} loaded from {path} "
+                                  f"({len(pack)} elements)", "INFO")
+            except (OSError, ValueError) as e:
+                utils.log_message(f"Ignoring selector pack {path}: {e}", "WARNING")
+        return cls(selectors, version)
+
+    def candidates(self, name: str) -> List[Tuple[int, Tuple[str, str]]]:
+        """(index, locator) pairs in lookup order: last match first, then declared order"""
+        try:
+            candidates = list(enumerate(self.selectors[name]))
+        except KeyError:
+            raise KeyError(f"Unknown selector: {name}") from None
+        preferred = self._preferred.get(name)
+        if preferred:
+            candidates.insert(0, candidates.pop(preferred))
+        return candidates
+
+    def find_all(self, root, name: str) -> list:
+        """
+        Elements of the first candidate that matches anything
+
+        Args:
+            root: Driver, or an element to search inside
+            name: Logical element name
+
+        Returns:
+            Matching elements ([] if no candidate matches)
+        """
+        for index, (strategy, value) in self.candidates(name):
+            started = time.perf_counter()
+            try:
+                found = root.find_elements(STRATEGIES[strategy], value)
+            except InvalidSelectorException:
+                found = []
+            self._count(name, index, found, time.perf_counter() - started)
+            if found:
+                return found
+        return []
+
+    def _count(self, name: str, index: int, found: list, seconds: float):
+        with self._lock:
+            stats = self._stats.setdefault((name, index), [0, 0, 0.0])
+            stats[0] += 1
+            stats[2] += seconds
+            if not found:
+                return
+            stats[1] += 1
+            if self._preferred.get(name, 0) != index:
+                # Healed onto a fallback (or back to the first choice)
+                self._preferred[name] = index
+                strategy, value = self.selectors[name][index]
+                level = "WARNING" if index else "INFO"
+                utils.log_message(f"Selector '{name}' now matched by {strategy} {value}", level)
+
+    def wait(self, driver, name: str, timeout: float):
+        """
+        First element matching any candidate, polling until timeout
+
+        Raises:
+            TimeoutException: If no candidate matched in time
+        """
+        return WebDriverWait(driver, timeout).until(
+            lambda d: (self.find_all(d, name) or [False])[0],
+            message=f"No selector for '{name}' matched: {self.selectors[name]}")
+
+    # ------------------------------------------------------------------
+    def stats(self) -> List[LocatorStats]:
+        with self._lock:
+            return [LocatorStats(name, *self.selectors[name][index], *values)
+                    for (name, index), values in sorted(self._stats.items())]
+
+    def describe_stats(self) -> str:
+        """One line per locator used: hits / lookups and average lookup time"""
+        lines = [f"Selectors ({self.version}):"]
+        for s in self.stats():
+            lines.append(f"  {s.element:<22} {s.strategy:<5} {s.hits}/{s.lookups} hits, "
+                         f"avg {1000 * s.seconds / s.lookups:.1f} ms  {s.value}")
+        return "\n".join(lines)
+
+_registry: Optional[SelectorRegistry] = None
+_registry_lock = threading.Lock()
+
+def registry() -> SelectorRegistry:
+    """Shared registry, built from config and the selector pack on first use"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SelectorRegistry.from_config()
+        return _registry
+
+def reload() -> SelectorRegistry:
+    """Re-read config and the selector pack (e.g. after editing the pack)"""
+    global _registry
+    with _registry_lock:
+        _registry = SelectorRegistry.from_config()
+        return _registry
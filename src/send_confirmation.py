@@ -0,0 +1,83 @@
+"""
+Velo Bot Send Confirmation
+After Enter is pressed, waits (bounded by config.MESSAGE_SEND_TIMEOUT) for
+the new outgoing bubble to appear in the open chat and reach the sent-tick
+state, and classes the send as confirmed, pending or unconfirmed
+"""
+
+import time
+from collections import namedtuple
+from typing import Optional
+
+from selenium.common.exceptions import StaleElementReferenceException
+
+from . import config
+from . import selector_registry
+
+# ============================================================================
+# CONFIRMATION STATES
+# ============================================================================
+CONFIRMED = "confirmed"      # bubble shows a sent / delivered / read tick
+PENDING = "pending"          # bubble appeared but still shows the clock
+UNCONFIRMED = "unconfirmed"  # no new outgoing bubble appeared
+
+STATES = (CONFIRMED, PENDING, UNCONFIRMED)
+
+LABELS = {
+    CONFIRMED: "Confirmed",
+    PENDING: "Pending (clock)",
+    UNCONFIRMED: "Unconfirmed",
+}
+
+Confirmation = namedtuple('Confirmation', ['status', 'seconds'])
+
+def describe(status: str) -> str:
+    """Readable confirmation state for logs and reports"""
+    return LABELS.get(status, "")
+
+# ============================================================================
+# WAITING
+# ============================================================================
+def last_outgoing(driver):
+    """Newest outgoing bubble of the open chat, or None"""
+    bubbles = selector_registry.registry().find_all(driver, 'outgoing_message')
+    return bubbles[-1] if bubbles else None
+
+def wait_for_confirmation(driver, previous=None, timeout: float = None,
+                          poll: float = None) -> Confirmation:
+    """
+    Wait for a new outgoing bubble with a sent tick
+
+    Args:
+        driver: Chrome WebDriver with the chat open
+        previous: last_outgoing() taken before pressing Enter
+        timeout: Seconds to wait (default config.MESSAGE_SEND_TIMEOUT)
+        poll: Seconds between checks (default config.CONFIRM_POLL_SECONDS)
+
+    Returns:
+        Confirmation(status, seconds until confirmed or given up)
+    """
+    timeout = config.MESSAGE_SEND_TIMEOUT if timeout is None else timeout
+    poll = config.CONFIRM_POLL_SECONDS if poll is None else poll
+    previous_id = previous.id if previous is not None else None
+    started = time.monotonic()
+    appeared = False
+
+    while True:
+        try:
+            bubble = last_outgoing(driver)
+            if bubble is not None and bubble.id != previous_id:
+                appeared = True
+                if selector_registry.registry().find_all(bubble, 'message_tick'):
+                    return Confirmation(CONFIRMED, time.monotonic() - started)
+        except StaleElementReferenceException:
+            pass  # chat re-rendered between lookups; look again
+        elapsed = time.monotonic() - started
+        if elapsed >= timeout:
+            return Confirmation(PENDING if appeared else UNCONFIRMED, elapsed)
+        time.sleep(min(poll, timeout - elapsed))
+
+def summarize(counts: Optional[dict]) -> str:
+    """e.g. "12 confirmed · 1 pending · 0 unconfirmed" """
+    counts = counts or {}
+    return " · ".join(f"{counts.get(state, 0)} {state}" for state in STATES)
@@ -0,0 +1,250 @@
+"""
+Velo Bot Google Sheets Fetcher
+Downloads public Google Sheets as CSV over a shared HTTP session, streaming to
+a local cache that is revalidated with ETag / Last-Modified
+"""
+
+import json
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import pandas as pd
+
+from . import config
+from . import utils
+from . import data_processor
+from .background import TaskCancelled
+
+REQUEST_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/122.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/csv,text/plain,*/*",
+}
+
+CHUNK_SIZE = 64 * 1024
+
+_session = None
+_session_lock = threading.Lock()
+
+# ============================================================================
+# URL HELPERS
+# ============================================================================
+def sheets_url_to_csv(url: str) -> str:
+    """
+    Convert a Google Sheets share URL to a direct CSV export URL.
+    Supports:
+      - https://docs.google.com/spreadsheets/d/{ID}/edit...
+      - https://docs.google.com/spreadsheets/d/{ID}/pub...
+    Returns the export URL, or raises ValueError if not a valid Sheets URL.
+    """
+    m = re.search(r'/spreadsheets/d/([a-zA-Z0-9_-]+)', url)
+    if not m:
+        raise ValueError(
+            "Bukan link Google Sheets yang valid.\n\n"
+            "Format yang benar:\n"
+            "https://docs.google.com/spreadsheets/d/{ID}/edit"
+        )
+    sheet_id = m.group(1)
+    # Preserve gid (sheet tab) if present
+    gid_match = re.search(r'[#&?]gid=(\d+)', url)
+    gid_param = f"&gid={gid_match.group(1)}" if gid_match else ""
+    return (f"https://docs.google.com/spreadsheets/d/{sheet_id}"
+            f"/export?format=csv{gid_param}")
+
+def sheet_key(csv_url: str) -> Tuple[str, str]:
+    """
+    Extract the (sheet id, gid) pair that identifies a sheet tab
+
+    Args:
+        csv_url: Export or share URL
+
+    Returns:
+        Tuple of sheet id and gid ("default" when the URL has none)
+    """
+    m = re.search(r'/spreadsheets/d/([a-zA-Z0-9_-]+)', csv_url)
+    gid = re.search(r'[#&?]gid=(\d+)', csv_url)
+    return (m.group(1) if m else "unknown"), (gid.group(1) if gid else "default")
+
+def _gviz_url(csv_url: str) -> Optional[str]:
+    """Fallback gviz endpoint for the same sheet tab"""
+    m = re.search(r'^(.*?/spreadsheets/d/[a-zA-Z0-9_-]+)', csv_url)
+    if not m:
+        return None
+    gid = re.search(r'[#&?]gid=(\d+)', csv_url)
+    gid_param = f"&gid={gid.group(1)}" if gid else ""
+    return f"{m.group(1)}/gviz/tq?tqx=out:csv{gid_param}"
+
+# ============================================================================
+# HTTP SESSION & CACHE
+# ============================================================================
+def get_session():
+    """
+    Shared requests.Session so repeated loads reuse the TLS connection
+
+    Returns:
+        requests.Session with browser-like headers
+    """
+    global _session
+    try:
+        import requests
+    except ImportError:
+        raise RuntimeError(
+            "Modul 'requests' tidak terinstall.\n"
+            "Jalankan:  pip install requests")
+
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update(REQUEST_HEADERS)
+        return _session
+
+def cache_paths(csv_url: str, variant: str = "export") -> Tuple[Path, Path]:
+    """
+    Local cache file and metadata file for a sheet tab
+
+    Args:
+        csv_url: Export URL of the sheet
+        variant: "export" or "gviz"
+
+    Returns:
+        Tuple of (csv path, metadata json path)
+    """
+    sheet_id, gid = sheet_key(csv_url)
+    config.SHEETS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    base = config.SHEETS_CACHE_DIR / f"{sheet_id}_{gid}_{variant}"
+    return base.with_suffix(".csv"), base.with_suffix(".json")
+
+def _load_meta(meta_path: Path) -> dict:
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _download(url: str, csv_path: Path, meta_path: Path,
+              progress: Optional[Callable[[int, Optional[int]], None]],
+              cancel_event: Optional[threading.Event]) -> Optional[Path]:
+    """
+    Conditionally download url into csv_path
+
+    Returns:
+        Path of the up-to-date CSV, or None if the server answered with HTML
+        (login / warning page) or an empty body
+    """
+    meta = _load_meta(meta_path) if csv_path.exists() else {}
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    resp = get_session().get(url, headers=headers, allow_redirects=True,
+                             stream=True, timeout=(10, 30))
+    with resp:
+        if resp.status_code == 304:
+            utils.log_message(f"Sheet unchanged, using cached copy ({csv_path.name})", "INFO")
+            return csv_path
+        resp.raise_for_status()
+
+        if "html" in resp.headers.get("Content-Type", "").lower():
+            return None
+
+        total = resp.headers.get("Content-Length")
+        total = int(total) if total and total.isdigit() else None
+        done = 0
+        part_path = csv_path.with_suffix(".part")
+        try:
+            with open(part_path, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise TaskCancelled()
+                    f.write(chunk)
+                    done += len(chunk)
+                    if progress:
+                        progress(done, total)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+
+        if done == 0 or (done < CHUNK_SIZE and not part_path.read_bytes().strip()):
+            part_path.unlink(missing_ok=True)
+            return None
+
+        part_path.replace(csv_path)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "url": url,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "fetched_at": datetime.now().isoformat(),
+            }, f, indent=2)
+        utils.log_message(f"Downloaded sheet ({done} bytes)", "INFO")
+        return csv_path
+
+# ============================================================================
+# PUBLIC API
+# ============================================================================
+def fetch_sheet_file(csv_url: str,
+                     progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                     cancel_event: Optional[threading.Event] = None) -> Path:
+    """
+    Make sure the local cache holds the current CSV of a sheet tab
+
+    Tries the export endpoint first and falls back to the gviz endpoint.
+
+    Args:
+        csv_url: Export URL from sheets_url_to_csv
+        progress: Optional callback(bytes_done, bytes_total_or_None)
+        cancel_event: Optional event; when set the download aborts with TaskCancelled
+
+    Returns:
+        Path to the cached CSV file
+
+    Raises:
+        RuntimeError: If Google returned HTML instead of CSV
+    """
+    csv_path, meta_path = cache_paths(csv_url, "export")
+    path = _download(csv_url, csv_path, meta_path, progress, cancel_event)
+    if path is not None:
+        return path
+
+    # Fallback: gviz endpoint (sometimes works when /export doesn't)
+    gviz_url = _gviz_url(csv_url)
+    if gviz_url:
+        csv_path, meta_path = cache_paths(csv_url, "gviz")
+        path = _download(gviz_url, csv_path, meta_path, progress, cancel_event)
+        if path is not None:
+            return path
+
+    raise RuntimeError(
+        "Google mengembalikan halaman HTML bukan CSV.\n\n"
+        "Kemungkinan penyebab:\n"
+        "• Sheet belum di-share 'Anyone with the link can view'\n"
+        "• Sheet memerlukan login Google\n"
+        "• Sheet kosong\n\n"
+        "Solusi: Buka Google Sheets → Share → "
+        "Change to 'Anyone with the link' → Done"
+    )
+
+def fetch_sheet(csv_url: str,
+                progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                cancel_event: Optional[threading.Event] = None) -> pd.DataFrame:
+    """
+    Fetch a Google Sheets CSV export URL and return a pandas DataFrame
+
+    Args:
+        csv_url: Export URL from sheets_url_to_csv
+        progress: Optional callback(bytes_done, bytes_total_or_None)
+        cancel_event: Optional cancellation event
+
+    Returns:
+        DataFrame with the sheet contents
+    """
+    path = fetch_sheet_file(csv_url, progress, cancel_event)
+    return data_processor.read_csv_file(path)
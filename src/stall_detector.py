@@ -0,0 +1,104 @@
+"""
+Velo Bot Stall Detector
+Watches the Tk event loop: a heartbeat scheduled with after() measures how
+late it fires, and a helper thread captures the main thread's stack (via
+sys._current_frames) once the heartbeat is overdue, so the blocking call
+behind a "Not Responding" window shows up in the log
+"""
+
+import sys
+import threading
+import time
+import traceback
+from collections import namedtuple
+from typing import Callable, Optional
+
+from . import config
+from . import utils
+
+StallRecord = namedtuple('StallRecord', ['timestamp', 'seconds', 'stack'])
+
+class StallDetector:
+    """
+    Heartbeat watchdog for a single-threaded event loop
+
+    start() must be called on the event-loop thread; that thread's stack is
+    the one captured during a stall.
+    """
+
+    def __init__(self, schedule: Callable, interval_ms: int = None, threshold: float = None,
+                 on_change: Optional[Callable[['StallDetector'], None]] = None):
+        """
+        Args:
+            schedule: schedule(ms, callback) on the event loop (Tk's widget.after)
+            interval_ms: Heartbeat period (default config.STALL_HEARTBEAT_MS)
+            threshold: Lag in seconds counted as a stall (default config.STALL_THRESHOLD_SECONDS)
+            on_change: Optional callback(detector), on the event loop, when the
+                stall count or the worst lag changes
+        """
+        self.schedule = schedule
+        self.interval_ms = config.STALL_HEARTBEAT_MS if interval_ms is None else interval_ms
+        self.threshold = config.STALL_THRESHOLD_SECONDS if threshold is None else threshold
+        self.on_change = on_change
+        self.stalls = 0
+        self.worst_lag = 0.0
+        self.last: Optional[StallRecord] = None
+        self._thread_id = None
+        self._due = None
+        self._stack = None
+        self._stop = threading.Event()
+
+    # ========================================================================
+    # CONTROL
+    # ========================================================================
+    def start(self):
+        """Start the heartbeat and the watcher thread (call on the event-loop thread)"""
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._due = time.monotonic() + self.interval_ms / 1000
+        self.schedule(self.interval_ms, self._beat)
+        threading.Thread(target=self._watch, name="stall-detector", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    # ========================================================================
+    # HEARTBEAT (event-loop thread)
+    # ========================================================================
+    def _beat(self):
+        if self._stop.is_set():
+            return
+        now = time.monotonic()
+        lag = max(now - self._due, 0.0)
+        captured, self._stack = self._stack, None
+        stack = captured[1] if captured and captured[0] == self._due else ""
+        self._due = now + self.interval_ms / 1000
+        self.schedule(self.interval_ms, self._beat)
+
+        changed = lag > self.worst_lag
+        self.worst_lag = max(self.worst_lag, lag)
+        if lag >= self.threshold:
+            self.stalls += 1
+            self.last = StallRecord(time.time(), lag, stack)
+            utils.log_message(f"UI thread stalled for {lag:.2f}s"
+                              + (f"; main thread was in:\n{stack}" if stack else ""), "WARNING")
+            changed = True
+        if changed and self.on_change:
+            self.on_change(self)
+
+    # ========================================================================
+    # WATCHER (helper thread)
+    # ========================================================================
+    def _watch(self):
+        poll = min(self.interval_ms / 1000, self.threshold / 2)
+        while not self._stop.wait(poll):
+            due = self._due
+            if self._stack is None and time.monotonic() - due >= self.threshold:
+                frame = sys._current_frames().get(self._thread_id)
+                if frame is not None:
+                    # Tagged with the beat it belongs to, in case that beat fires meanwhile
+                    self._stack = (due, "".join(traceback.format_stack(frame)).rstrip())
+
+    def describe(self) -> str:
+        """Dashboard text such as "UI stalls: 2 · worst lag 1.4s" """
+        return f"UI stalls: {self.stalls} · worst lag {self.worst_lag:.1f}s"
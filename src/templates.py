@@ -0,0 +1,176 @@
+"""
+Velo Bot Message Templates
+Compiles message text with {placeholders} once and renders it per contact at send time
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Placeholder syntax: {column name} — no nesting, no line breaks inside braces
+PLACEHOLDER_PATTERN = re.compile(r'\{([^{}\n]+)\}')
+
+# Placeholders that always resolve to prepared contact fields
+FIELD_ALIASES = ('name', 'phone')
+
+# ============================================================================
+# COMPILED TEMPLATE
+# ============================================================================
+class CompiledTemplate:
+    """
+    Message text parsed once into literal chunks and placeholder keys
+
+    Rendering interleaves chunks and field values, so the per-contact cost is a
+    single join instead of a regex scan of the whole message.
+    """
+
+    __slots__ = ('id', 'text', 'fields', '_chunks', '_keys')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.id = template_id(text)
+
+        chunks: List[str] = []
+        keys: List[Tuple[str, str]] = []
+        pos = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            chunks.append(text[pos:match.start()])
+            keys.append((normalize_key(match.group(1)), match.group(0)))
+            pos = match.end()
+        chunks.append(text[pos:])
+
+        self._chunks = tuple(chunks)
+        self._keys = tuple(keys)
+        # Unique keys in order of first appearance
+        self.fields = tuple(dict.fromkeys(key for key, _ in keys))
+
+    def render(self, values: Optional[Dict[str, str]] = None) -> str:
+        """
+        Render the template with per-contact values
+
+        Args:
+            values: Mapping of normalized placeholder key to value
+
+        Returns:
+            Rendered message. Placeholders without a value are kept verbatim.
+        """
+        if not self._keys:
+            return self.text
+
+        values = values or {}
+        out = [self._chunks[0]]
+        for (key, raw), chunk in zip(self._keys, self._chunks[1:]):
+            value = values.get(key)
+            out.append(raw if value is None else value)
+            out.append(chunk)
+        return "".join(out)
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+_REGISTRY: Dict[str, CompiledTemplate] = {}
+
+def normalize_key(key: str) -> str:
+    """Normalize a placeholder or column name for case-insensitive lookup"""
+    return " ".join(str(key).split()).lower()
+
+def template_id(text: str) -> str:
+    """
+    Content-addressed template id, stable across runs
+
+    Args:
+        text: Template text
+
+    Returns:
+        Short hex digest of the text
+    """
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+def compile_template(text: str) -> CompiledTemplate:
+    """
+    Compile template text, reusing the cached compiled form if available
+
+    Args:
+        text: Template text
+
+    Returns:
+        CompiledTemplate registered under its id
+    """
+    tid = template_id(text)
+    template = _REGISTRY.get(tid)
+    if template is None:
+        template = CompiledTemplate(text)
+        _REGISTRY[tid] = template
+    return template
+
+def get_template(tid: str) -> Optional[CompiledTemplate]:
+    """Look up a compiled template by id"""
+    return _REGISTRY.get(tid)
+
+def export_templates(contacts: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Collect the template texts referenced by a contact list
+
+    Args:
+        contacts: Prepared contacts
+
+    Returns:
+        Mapping of template id to template text, for saving with progress
+    """
+    exported = {}
+    for contact in contacts:
+        tid = contact.get('template')
+        if tid and tid not in exported and tid in _REGISTRY:
+            exported[tid] = _REGISTRY[tid].text
+    return exported
+
+def import_templates(saved: Optional[Dict[str, str]]):
+    """
+    Re-register templates loaded from saved progress
+
+    Args:
+        saved: Mapping of template id to template text
+    """
+    for text in (saved or {}).values():
+        compile_template(text)
+
+# ============================================================================
+# RENDERING
+# ============================================================================
+def resolve_field_columns(columns: Iterable[str]) -> Dict[str, str]:
+    """
+    Map normalized placeholder keys to DataFrame column names
+
+    Args:
+        columns: Available column names
+
+    Returns:
+        Dictionary of normalized key -> column name (first match wins)
+    """
+    resolved = {}
+    for col in columns:
+        resolved.setdefault(normalize_key(col), col)
+    return resolved
+
+def render_message(contact: Dict[str, Any]) -> str:
+    """
+    Produce the final message text for a prepared contact
+
+    Args:
+        contact: Contact dictionary from prepare_contacts or saved progress
+
+    Returns:
+        Message to send
+    """
+    # Literal messages (WhatsApp URL text, progress from older versions)
+    if contact.get('message') is not None:
+        return contact['message']
+
+    template = _REGISTRY.get(contact.get('template', ''))
+    if template is None:
+        raise KeyError(f"Unknown message template: {contact.get('template')}")
+
+    values = dict(contact.get('fields') or {})
+    values.setdefault('name', contact.get('name', ''))
+    values.setdefault('phone', contact.get('phone', ''))
+    return template.render(values)
@@ -3,6 +3,7 @@ Velo Bot Utility Functions
 Helper functions for timing, logging, progress tracking, and validation
 """
 
+import hashlib
 import json
 import random
 import time
@@ -25,18 +26,9 @@ def calculate_delay(message_count: int) -> float:
     Returns:
         Delay in seconds
     """
-    # Base delay
-    delay = config.BASE_DELAY
-    
-    # Add warm-up delay for first N messages
-    if message_count < config.WARMUP_COUNT:
-        delay += config.WARMUP_DELAY
-    
-    # Add randomized jitter
-    jitter = random.uniform(config.JITTER_MIN, config.JITTER_MAX)
-    delay += jitter
-    
-    return delay
+    # campaign_planner imports utils, so import it here
+    from .campaign_planner import message_delay, settings_from_config
+    return message_delay(message_count, settings_from_config())
 
 def human_delay(min_seconds: float = 0.5, max_seconds: float = 2.0):
     """
@@ -51,13 +43,14 @@ def human_delay(min_seconds: float = 0.5, max_seconds: float = 2.0):
 # ============================================================================
 # LOGGING UTILITIES
 # ============================================================================
-def log_message(message: str, level: str = "INFO"):
+def log_message(message: str, level: str = "INFO", console: bool = True):
     """
     Log a message with timestamp to both console and file
     
     Args:
         message: Message to log
         level: Log level (DEBUG, INFO, WARNING, ERROR)
+        console: Also print it (False writes long listings to the file only)
     """
     timestamp = datetime.now().strftime(config.LOG_DATE_FORMAT)
     log_entry = f"{timestamp} - {level} - {message}"
@@ -71,8 +64,9 @@ def log_message(message: str, level: str = "INFO"):
     }
     reset_code = "\033[0m"
     
-    colored_entry = f"{color_codes.get(level, '')}{log_entry}{reset_code}"
-    print(colored_entry)
+    if console:
+        colored_entry = f"{color_codes.get(level, '')}{log_entry}{reset_code}"
+        print(colored_entry)
     
     # Write to log file
     with open(config.LOG_FILE, "a", encoding="utf-8") as f:
@@ -121,6 +115,31 @@ def clear_progress():
     except Exception as e:
         log_message(f"Failed to clear progress: {str(e)}", "WARNING")
 
+# ============================================================================
+# FILE FINGERPRINTS
+# ============================================================================
+def hash_file(file_path, chunk_size: int = 1 << 20) -> str:
+    """
+    SHA-256 of a file's content, read in fixed-size chunks
+    
+    Args:
+        file_path: File to hash
+        chunk_size: Bytes per read (memory use stays constant for huge files)
+        
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            digest.update(view[:n])
+    return digest.hexdigest()
+
 # ============================================================================
 # PHONE NUMBER VALIDATION
 # ============================================================================
@@ -3,17 +3,15 @@ Velo Bot Main Automation Module
 Selenium-based automation for WhatsApp Web message broadcasting
 """
 
+import math
 import time
 import sys
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from datetime import datetime
 
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
@@ -21,18 +19,39 @@ from webdriver_manager.chrome import ChromeDriverManager
 from . import config
 from . import utils
 from . import data_processor
+from . import templates
+from . import contact_cache
+from . import campaign_identity
+from . import campaign_planner
+from . import eta
+from . import retry_queue
+from . import driver_watchdog
+from . import resource_monitor
+from . import send_confirmation
+from . import selector_registry
+from . import profile_maintenance
+from . import profiling
+from . import metrics_server
+from . import event_log
+from . import campaign_runner
 
 # ============================================================================
 # SELENIUM DRIVER SETUP
 # ============================================================================
-def setup_driver() -> webdriver.Chrome:
+def setup_driver(lean: Optional[bool] = None) -> webdriver.Chrome:
     """
     Initialize Selenium WebDriver with Chrome and session persistence
     
+    Args:
+        lean: Launch with config.LEAN_CHROME_ARGS (default config.CHROME_LEAN_MODE)
+    
     Returns:
         Configured Chrome WebDriver instance
     """
     utils.log_message("Initializing Chrome WebDriver...", "INFO")
+    started = time.monotonic()
+    if lean is None:
+        lean = config.CHROME_LEAN_MODE
     
     # Chrome options
     options = webdriver.ChromeOptions()
@@ -57,6 +76,11 @@ def setup_driver() -> webdriver.Chrome:
     }
     options.add_experimental_option("prefs", prefs)
     
+    # Lean mode: no extensions, background networking, sync, ...
+    if lean:
+        for argument in config.LEAN_CHROME_ARGS:
+            options.add_argument(argument)
+    
     # Headless mode (optional, not recommended for WhatsApp)
     if config.CHROME_HEADLESS:
         options.add_argument("--headless")
@@ -69,7 +93,8 @@ def setup_driver() -> webdriver.Chrome:
     # Set timeouts
     driver.set_page_load_timeout(config.PAGE_LOAD_TIMEOUT)
     
-    utils.log_message("Chrome WebDriver initialized successfully", "INFO")
+    utils.log_message(f"Chrome WebDriver initialized in {time.monotonic() - started:.1f}s"
+                      f"{' (lean mode)' if lean else ''}", "INFO")
     
     return driver
 
@@ -90,12 +115,11 @@ def wait_for_whatsapp_load(driver: webdriver.Chrome, timeout: int = None):
     utils.log_message("Loading WhatsApp Web...", "INFO")
     driver.get("https://web.whatsapp.com")
     
-    # Wait for either QR code or chat panel (indicating logged in)
-    wait = WebDriverWait(driver, timeout)
+    selectors = selector_registry.registry()
     
     try:
         # Check if QR code is present
-        qr_element = driver.find_elements(By.XPATH, config.XPATH_QR_CODE)
+        qr_element = selectors.find_all(driver, 'qr_code')
         
         if qr_element:
             utils.log_message("QR Code detected. Please scan with your phone...", "INFO")
@@ -107,7 +131,7 @@ def wait_for_whatsapp_load(driver: webdriver.Chrome, timeout: int = None):
             print(f"{'='*60}\n")
         
         # Wait for chat panel to appear (login successful)
-        wait.until(EC.presence_of_element_located((By.XPATH, config.XPATH_CHAT_LOADED)))
+        selectors.wait(driver, 'chat_loaded', timeout)
         utils.log_message("WhatsApp Web loaded successfully!", "INFO")
         
         # Additional wait for full initialization
@@ -133,6 +157,39 @@ def send_message(driver: webdriver.Chrome, phone: str, message: str, name: str =
     Returns:
         True if successful, False otherwise
     """
+    return attempt_send(driver, phone, message, name) == retry_queue.SENT
+
+def attempt_send(driver: webdriver.Chrome, phone: str, message: str, name: str = "Customer",
+                 stages: Optional[Dict[str, float]] = None,
+                 confirmation: Optional[Dict] = None) -> str:
+    """
+    Send a message and classify the result
+    
+    Args:
+        driver: Chrome WebDriver instance
+        phone: Phone number (with country code, no +)
+        message: Message text to send
+        name: Contact name (for logging)
+        stages: Optional dict filled with seconds spent per stage
+            ('open', 'compose', 'send', 'confirm'; see results_report.STAGES)
+        confirmation: Optional dict that receives 'status' (a send_confirmation
+            state) once Enter has been pressed
+        
+    Returns:
+        retry_queue.SENT, INVALID_NUMBER, TIMEOUT or DRIVER_ERROR. A send whose
+        tick never appeared is still SENT (a retry could deliver it twice);
+        the confirmation state tells it apart.
+    """
+    stages = {} if stages is None else stages
+    confirmation = {} if confirmation is None else confirmation
+    stage_started = time.monotonic()
+    
+    def _stage(stage: str):
+        nonlocal stage_started
+        now = time.monotonic()
+        stages[stage] = now - stage_started
+        stage_started = now
+    
     try:
         # Navigate to chat via wa.me link
         url = f"https://web.whatsapp.com/send?phone={phone}"
@@ -144,14 +201,14 @@ def send_message(driver: webdriver.Chrome, phone: str, message: str, name: str =
         
         # Check for invalid number popup
         if detect_invalid_number(driver):
+            _stage('open')
             utils.log_message(f"Invalid WhatsApp number: {phone}", "WARNING")
-            return False
+            return retry_queue.INVALID_NUMBER
         
         # Wait for message box
-        wait = WebDriverWait(driver, config.ELEMENT_WAIT_TIMEOUT)
-        message_box = wait.until(
-            EC.presence_of_element_located((By.XPATH, config.XPATH_MESSAGE_BOX))
-        )
+        message_box = selector_registry.registry().wait(
+            driver, 'message_box', config.ELEMENT_WAIT_TIMEOUT)
+        _stage('open')
         
         # Human-like delay before typing
         utils.human_delay(0.5, 1.5)
@@ -190,22 +247,33 @@ def send_message(driver: webdriver.Chrome, phone: str, message: str, name: str =
         
         # Human-like delay before sending
         utils.human_delay(0.5, 1.0)
+        _stage('compose')
         
-        # Send message (Enter key)
+        # Send message (Enter key), remembering the newest bubble before it
+        previous = send_confirmation.last_outgoing(driver)
         message_box.send_keys(Keys.ENTER)
+        _stage('send')
         
-        # Wait for message to be sent
-        time.sleep(2)
+        # Wait for the new bubble to leave the pending-clock state
+        result = send_confirmation.wait_for_confirmation(driver, previous)
+        _stage('confirm')
+        confirmation['status'] = result.status
         
-        utils.log_message(f"✓ Message sent to {name} ({phone})", "INFO")
-        return True
+        if result.status == send_confirmation.CONFIRMED:
+            utils.log_message(f"✓ Message sent to {name} ({phone}), "
+                              f"confirmed in {result.seconds:.1f}s", "INFO")
+        else:
+            utils.log_message(f"Message to {name} ({phone}) sent but "
+                              f"{send_confirmation.describe(result.status).lower()} "
+                              f"after {result.seconds:.0f}s", "WARNING")
+        return retry_queue.SENT
         
     except TimeoutException:
         utils.log_message(f"Timeout sending message to {phone}", "ERROR")
-        return False
+        return retry_queue.TIMEOUT
     except Exception as e:
         utils.log_message(f"Error sending message to {phone}: {str(e)}", "ERROR")
-        return False
+        return retry_queue.DRIVER_ERROR
 
 def detect_invalid_number(driver: webdriver.Chrome) -> bool:
     """
@@ -221,13 +289,15 @@ def detect_invalid_number(driver: webdriver.Chrome) -> bool:
         # Wait briefly for popup
         time.sleep(1)
         
+        selectors = selector_registry.registry()
+        
         # Check for invalid number message
-        invalid_elements = driver.find_elements(By.XPATH, config.XPATH_INVALID_NUMBER)
+        invalid_elements = selectors.find_all(driver, 'invalid_number')
         if invalid_elements:
             return True
         
         # Check alternative popup
-        invalid_alt = driver.find_elements(By.XPATH, config.XPATH_INVALID_NUMBER_ALT)
+        invalid_alt = selectors.find_all(driver, 'invalid_number_popup')
         if invalid_alt:
             # Check if popup contains error text
             popup_text = invalid_alt[0].text.lower()
@@ -239,9 +309,108 @@ def detect_invalid_number(driver: webdriver.Chrome) -> bool:
     except Exception:
         return False
 
+# ============================================================================
+# SELENIUM TRANSPORT
+# ============================================================================
+class SeleniumTransport:
+    """
+    campaign_runner transport that sends through Chrome / WhatsApp Web
+
+    Owns the browser for one run: the driver watchdog (relaunches a crashed
+    session) and the resource monitor (recycles an oversized browser at the
+    runner's safe points).
+    """
+    
+    def __init__(self, driver: Optional[webdriver.Chrome] = None,
+                 log: Optional[Callable[[str], None]] = None,
+                 on_recovering: Optional[Callable[[], None]] = None,
+                 on_recovered: Optional[Callable[[float], None]] = None,
+                 on_sample: Optional[Callable] = None,
+                 lean: Optional[bool] = None):
+        """
+        Args:
+            driver: Already running driver with WhatsApp Web loaded (None: launch one)
+            log: Optional status callback for the frontend's log
+            on_recovering: Forwarded to DriverWatchdog
+            on_recovered: Forwarded to DriverWatchdog
+            on_sample: Forwarded to ResourceMonitor (called on its thread)
+            lean: Forwarded to setup_driver (default config.CHROME_LEAN_MODE)
+        """
+        self._driver = driver
+        self.log = log or (lambda message: None)
+        self.on_recovering = on_recovering
+        self.on_recovered = on_recovered
+        self.on_sample = on_sample
+        self.lean = lean
+        self.watchdog = None
+        self.monitor = None
+    
+    @property
+    def driver(self) -> Optional[webdriver.Chrome]:
+        return self.watchdog.driver if self.watchdog else self._driver
+    
+    def open(self):
+        if self._driver is None:
+            # Between campaigns: Chrome is not running, so its caches can go
+            pruned = profile_maintenance.maybe_prune()
+            if pruned and pruned.freed_bytes:
+                self.log(f"Pruned {pruned.freed_bytes / 1048576:,.0f} MB of browser cache")
+            self.log("Initializing Chrome WebDriver...")
+            self._driver = setup_driver(self.lean)
+            self.log("Loading WhatsApp Web...")
+            wait_for_whatsapp_load(self._driver)
+            self.log("WhatsApp Web loaded!")
+        # Restarts Chrome (same profile) if the session crashes or hangs
+        self.watchdog = driver_watchdog.DriverWatchdog(
+            self._driver, lambda: setup_driver(self.lean), wait_for_whatsapp_load,
+            on_recovering=self.on_recovering, on_recovered=self._recovered)
+        # Samples Chrome's memory / handles; recycled between messages when too big
+        self.monitor = resource_monitor.ResourceMonitor(
+            lambda: self.watchdog.driver, on_sample=self.on_sample).start()
+    
+    def _recovered(self, seconds: float):
+        event_log.emit(event_log.DRIVER_RESTART, reason=self.watchdog.last_reason,
+                       seconds=round(seconds, 1), restarts=self.watchdog.recoveries)
+        if self.on_recovered:
+            self.on_recovered(seconds)
+    
+    def send(self, contact: Dict, stages: Dict[str, float], confirmation: Optional[Dict] = None) -> str:
+        def _attempt(driver, c):
+            return attempt_send(driver, c['phone'], templates.render_message(c), c['name'],
+                                stages, confirmation)
+        return self.watchdog.send(_attempt, contact)
+    
+    def safe_point(self):
+        reason = self.monitor.recycle_reason() if self.monitor else None
+        if reason:
+            self.watchdog.recover(f"recycling browser: {reason}")
+            self.monitor.sample()
+    
+    def close(self):
+        if self.monitor is not None:
+            self.monitor.stop()
+        utils.log_message(selector_registry.registry().describe_stats(), "INFO")
+        driver = self.driver
+        if driver is not None:
+            utils.log_message("Closing browser...", "INFO")
+            driver.quit()
+        self._driver = self.watchdog = None
+
 # ============================================================================
 # MAIN EXECUTION
 # ============================================================================
+def _log_event(event):
+    """CLI observer of the campaign runner (the runner logs sends itself)"""
+    if isinstance(event, campaign_runner.Countdown):
+        # ETA once per wait, on its first tick
+        if event.phase == 'delay' and event.seconds == math.ceil(event.duration):
+            utils.log_message(eta.describe(event.eta), "INFO")
+    elif isinstance(event, campaign_runner.Paused) and event.reason == 'auto':
+        if event.resume_in:
+            utils.log_message(f"Auto-resume in {utils.format_duration(event.resume_in)}", "INFO")
+        else:
+            utils.log_message("Auto-resume is off: press Ctrl+C to stop, run again to resume", "INFO")
+
 def main():
     """Main execution function"""
     
@@ -251,15 +420,27 @@ def main():
     print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}\n")
     
-    # Get input file
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
+    # Get input file (--dry-run plans the campaign without opening Chrome,
+    # --lean launches Chrome with config.LEAN_CHROME_ARGS, --profile writes
+    # cProfile / tracemalloc reports to config.DIAGNOSTICS_DIR, --metrics
+    # serves Prometheus metrics on config.METRICS_PORT)
+    args = sys.argv[1:]
+    dry_run = '--dry-run' in args
+    lean = True if '--lean' in args else None
+    profiler = profiling.Profiler(enabled='--profile' in args)
+    metrics_on = config.METRICS_ENABLED or '--metrics' in args
+    args = [a for a in args if a not in ('--dry-run', '--lean', '--profile', '--metrics')]
+    if args:
+        input_file = args[0]
     else:
         input_file = input("Enter path to Excel/CSV file: ").strip()
     
     try:
-        # Load spreadsheet
-        df = data_processor.process_spreadsheet(input_file)
+        # Load spreadsheet (served from the contact cache when unchanged)
+        with profiler.section("load"):
+            df, file_digest = contact_cache.load_spreadsheet(input_file)
+        event_log.emit(event_log.LOAD, source=str(input_file), rows=len(df),
+                       columns=len(df.columns))
         
         # Interactive column selection
         column_mapping = data_processor.interactive_column_selection(df)
@@ -270,22 +451,36 @@ def main():
             default_message = input("\nEnter default message to send: ").strip()
         
         # Prepare contacts
-        contacts = data_processor.prepare_contacts(df, column_mapping, default_message)
+        with profiler.section("prepare"):
+            contacts = contact_cache.prepare_contacts(df, column_mapping, default_message, file_digest)
+        event_log.emit(event_log.PREPARED, contacts=len(contacts),
+                       skipped=len(df) - len(contacts))
         
         if not contacts:
             utils.log_message("No valid contacts found!", "ERROR")
             return
         
+        if dry_run:
+            plan = campaign_planner.plan_campaign(
+                contacts, len(df), campaign_planner.settings_from_config())
+            print("\n" + "="*60)
+            print("🧪 DRY RUN")
+            print("="*60)
+            print(campaign_planner.format_summary(plan))
+            print("="*60 + "\n")
+            campaign_planner.export_schedule(
+                plan, Path(input_file).with_name(f"{Path(input_file).stem}_plan.csv"))
+            return
+        
         # Safety check
         if len(contacts) > config.MAX_MESSAGES_PER_SESSION:
             utils.log_message(f"Warning: {len(contacts)} contacts exceeds safety limit of {config.MAX_MESSAGES_PER_SESSION}", "WARNING")
             if not utils.confirm_action("Continue anyway?"):
                 return
         
-        # Calculate estimated time
-        avg_delay = config.BASE_DELAY + (config.JITTER_MIN + config.JITTER_MAX) / 2
-        warmup_extra = config.WARMUP_DELAY * min(len(contacts), config.WARMUP_COUNT)
-        estimated_time = (avg_delay * len(contacts)) + warmup_extra
+        # Estimate time: delays, warm-up, auto-pause windows and send time
+        estimator = eta.EtaEstimator(campaign_planner.settings_from_config())
+        estimated_time = estimator.estimate(len(contacts), 1).seconds
         
         # Display summary
         utils.display_summary(len(contacts), estimated_time)
@@ -297,76 +492,97 @@ def main():
                 return
         
         # Check for existing progress
+        signatures = campaign_identity.contact_signatures(contacts)
+        campaign = campaign_identity.campaign_record(
+            input_file, file_digest, column_mapping, default_message, contacts, signatures)
+        signatures_file = campaign_identity.signatures_file(config.PROGRESS_FILE)
         progress = utils.load_progress()
         start_index = 0
-        
-        if progress and progress.get('file') == input_file:
+        saved = progress.get('campaign') if progress else None
+        
+        retries = retry_queue.RetryQueue()
+        results_file = None
+        
+        if saved and (saved.get('source') == campaign['source']
+                      or saved.get('source_fingerprint') == file_digest):
+            processed = progress.get('processed', 0)
+            if saved.get('contacts_fingerprint') == campaign['contacts_fingerprint']:
+                if utils.confirm_action(f"Resume from message {processed + 1}?"):
+                    start_index = processed
+                    retries = retry_queue.RetryQueue(progress.get('retry_queue'))
+                    results_file = progress.get('results_file')
+            else:
+                # Source was edited or re-exported: match processed contacts by phone.
+                # The remapped (processed-first) order is only used if accepted.
+                old_signatures = campaign_identity.record_signatures(saved, path=signatures_file)
+                remapped, remapped_index, diff = campaign_identity.remap_progress(
+                    old_signatures, processed, contacts, signatures)
+                utils.log_message(
+                    f"Source changed since the saved campaign: {campaign_identity.describe_diff(diff)}",
+                    "WARNING")
+                campaign_identity.log_diff_rows(diff, old_signatures, signatures)
+                for line in campaign_identity.diff_rows(diff, old_signatures, signatures,
+                                                        config.DIFF_PREVIEW_ROWS):
+                    print(f"  {line}")
+                if utils.confirm_action(
+                        f"Resume and skip {remapped_index} contacts already processed (matched by phone)?"):
+                    contacts, start_index = remapped, remapped_index
+                    signatures = campaign_identity.contact_signatures(contacts)
+                    campaign = campaign_identity.campaign_record(
+                        input_file, file_digest, column_mapping, default_message, contacts,
+                        signatures)
+                    retries = retry_queue.RetryQueue(progress.get('retry_queue'))
+                    results_file = progress.get('results_file')
+                else:
+                    utils.clear_progress()
+        elif progress and not saved and progress.get('file') == input_file:
+            # Progress from an older version: no fingerprint to verify against
+            utils.log_message("Saved progress has no campaign fingerprint; "
+                              "resuming by position assumes the file is unchanged", "WARNING")
             if utils.confirm_action(f"Resume from message {progress.get('processed', 0) + 1}?"):
                 start_index = progress.get('processed', 0)
         else:
             utils.clear_progress()
         
-        # Initialize driver
-        driver = setup_driver()
-        
-        try:
-            # Load WhatsApp Web
-            wait_for_whatsapp_load(driver)
-            
-            # Send messages
-            success_count = 0
-            failed_count = 0
-            
-            for idx, contact in enumerate(contacts[start_index:], start=start_index):
-                message_num = idx + 1
-                
-                utils.log_message(f"\n[{message_num}/{len(contacts)}] Processing {contact['name']}...", "INFO")
-                
-                # Send message
-                success = send_message(
-                    driver,
-                    contact['phone'],
-                    contact['message'],
-                    contact['name']
-                )
-                
-                if success:
-                    success_count += 1
-                else:
-                    failed_count += 1
-                
-                # Save progress
-                utils.save_progress({
-                    'file': input_file,
-                    'total': len(contacts),
-                    'processed': message_num,
-                    'success': success_count,
-                    'failed': failed_count,
-                    'last_update': datetime.now().isoformat()
-                })
-                
-                # Calculate and apply delay (except for last message)
-                if message_num < len(contacts):
-                    delay = utils.calculate_delay(message_num)
-                    utils.log_message(f"Waiting {delay:.1f}s before next message...", "DEBUG")
-                    time.sleep(delay)
-            
-            # Final summary
-            print(f"\n{'='*60}")
-            print("✅ COMPLETED")
-            print("="*60)
-            print(f"Total messages: {len(contacts)}")
-            print(f"Successful: {success_count}")
-            print(f"Failed: {failed_count}")
-            print(f"{'='*60}\n")
-            
-            # Clear progress on successful completion
-            utils.clear_progress()
-            
-        finally:
-            # Close driver
-            utils.log_message("Closing browser...", "INFO")
-            driver.quit()
+        # Signatures are written once; the per-send progress save only
+        # references them through campaign['contacts_fingerprint']
+        campaign_identity.save_signatures(signatures_file, campaign, signatures)
+        
+        # Counts and failures carried over when resuming
+        resumed = progress if progress and (start_index or len(retries)) else {}
+        store = campaign_runner.JsonProgressStore(config.PROGRESS_FILE, extra=lambda: {
+            'file': input_file,
+            'campaign': campaign,
+            'total': len(contacts),
+            'processed': runner.index,
+        })
+        runner = campaign_runner.CampaignRunner(
+            contacts, SeleniumTransport(lean=lean), campaign_planner.settings_from_config(), store,
+            index=start_index, success=resumed.get('success_count', 0),
+            failed=resumed.get('failed_count', 0), failed_contacts=resumed.get('failed_contacts'),
+            retries=retries, results_file=results_file, source=input_file,
+            confirmations=resumed.get('confirmations'))
+        runner.subscribe(_log_event)
+        event_log.events().attach(runner)
+        if metrics_on:
+            metrics_server.MetricsServer(metrics_server.CampaignMetrics().attach(runner)).start()
+        utils.log_message(f"Writing per-contact results to {runner.results.path}", "INFO")
+        
+        with profiler.section("campaign"):
+            finished = runner.run()
+        
+        # Final summary
+        print(f"\n{'='*60}")
+        print("✅ COMPLETED" if finished.completed else "⏹ STOPPED")
+        print("="*60)
+        print(f"Total messages: {len(contacts)}")
+        print(f"Successful: {finished.success} "
+              f"({send_confirmation.summarize(finished.confirmations)})")
+        print(f"Failed: {finished.failed}")
+        print(f"Results: {finished.results_path}")
+        if finished.annotated_path:
+            print(f"Annotated: {finished.annotated_path}")
+        print(f"{'='*60}\n")
     
     except KeyboardInterrupt:
         utils.log_message("\n\nOperation interrupted by user", "WARNING")
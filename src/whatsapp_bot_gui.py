@@ -10,13 +10,25 @@ import threading
 import pandas as pd
 from pathlib import Path
 import json
+import math
 from datetime import datetime, timedelta
-import time as time_module
 
 from . import config
 from . import utils
-from . import data_processor
-from .whatsapp_bot import setup_driver, wait_for_whatsapp_load, send_message, detect_invalid_number
+from . import templates
+from . import column_detector
+from . import contact_cache
+from . import campaign_identity
+from . import campaign_planner
+from . import eta
+from .background import BackgroundTask
+from . import retry_queue
+from . import resource_monitor
+from . import results_report
+from . import campaign_runner
+from . import send_confirmation
+from . import event_log
+from .whatsapp_bot import SeleniumTransport
 
 class WhatsAppBotGUI:
     def __init__(self, root):
@@ -28,13 +40,20 @@ class WhatsAppBotGUI:
         # Variables
         self.file_path = tk.StringVar()
         self.df = None
+        self.source_digest = None  # content hash of the loaded file (contact cache key)
+        self.source_path = None    # path of the loaded file
+        self.campaign = None       # campaign identity record (saved with progress)
         self.column_mapping = {}
         self.contacts = []
         self.is_running = False
         self.is_paused = False
-        self.driver = None
+        self.runner = None         # CampaignRunner of the running campaign
+        self.results_file = None   # results CSV (saved with progress, appended on resume)
         self.current_index = 0
         self.failed_contacts = []  # Store failed contacts
+        self.retry_queue = retry_queue.RetryQueue()  # transient failures, retried after the main pass
+        self.confirmations = None  # sent messages per confirmation state (resume)
+        self._load_task = None     # running background load / preparation
         
         # Delay settings variables
         self.base_delay = tk.IntVar(value=config.BASE_DELAY)
@@ -48,9 +67,6 @@ class WhatsAppBotGUI:
         self.pause_limit = tk.IntVar(value=config.PAUSE_LIMIT)
         self.auto_resume_enabled = tk.BooleanVar(value=config.AUTO_RESUME_ENABLED)
         self.auto_resume_hours = tk.DoubleVar(value=config.AUTO_RESUME_HOURS)
-        self._auto_resume_thread = None         # holds the auto-resume countdown thread
-        self._auto_resume_cancel = threading.Event()  # set this to cancel the countdown
-        self._session_success_count = 0         # success counter for this run (resets each start)
         
         # Progress file for GUI
         self.progress_file = Path(__file__).parent / "progress_gui.json"
@@ -121,6 +137,15 @@ class WhatsAppBotGUI:
         tk.Button(file_frame, text="Browse", command=self.browse_file, bg="#4CAF50", fg="white").pack(side=tk.LEFT, padx=5)
         tk.Button(file_frame, text="Load File", command=self.load_file, bg="#2196F3", fg="white").pack(side=tk.LEFT, padx=5)
         
+        # Load progress (shown only while loading or preparing contacts)
+        self.load_frame = tk.Frame(parent)
+        self.load_bar = ttk.Progressbar(self.load_frame, mode='indeterminate')
+        self.load_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.load_label = tk.Label(self.load_frame, text="", width=24, anchor=tk.W)
+        self.load_label.pack(side=tk.LEFT, padx=5)
+        tk.Button(self.load_frame, text="Cancel", command=self.cancel_load, bg="#F44336", fg="white").pack(side=tk.LEFT, padx=5)
+        self.load_frame_anchor = file_frame
+        
         # Preview frame
         preview_frame = tk.LabelFrame(parent, text="Data Preview", padx=10, pady=10)
         preview_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -399,6 +424,14 @@ Lower delays = higher risk of account suspension. Use with caution!"""
                                           font=("Arial", 10), bg="#FFF9C4")
         self.next_message_label.pack()
         
+        self.eta_label = tk.Label(countdown_frame, text="ETA --",
+                                  font=("Arial", 9), bg="#FFF9C4", fg="#616161")
+        self.eta_label.pack()
+        
+        self.resources_label = tk.Label(countdown_frame, text="Chrome: --",
+                                        font=("Arial", 8), bg="#FFF9C4", fg="#616161")
+        self.resources_label.pack()
+        
         # Progress frame
         progress_frame = tk.LabelFrame(parent, text="Progress", padx=10, pady=10)
         progress_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -466,35 +499,94 @@ Lower delays = higher risk of account suspension. Use with caution!"""
             self.file_path.set(filename)
     
     def load_file(self):
-        """Load and preview the selected file"""
+        """Load the selected file in the background and preview it"""
         if not self.file_path.get():
             messagebox.showerror("Error", "Please select a file first!")
             return
+        if self._load_task is not None:
+            messagebox.showinfo("Loading", "A load is already in progress.")
+            return
         
-        try:
-            self.df = data_processor.process_spreadsheet(self.file_path.get())
-            
-            # Update preview
-            preview = f"File: {Path(self.file_path.get()).name}\n"
-            preview += f"Rows: {len(self.df)}, Columns: {len(self.df.columns)}\n\n"
-            preview += self.df.head(5).to_string(index=False)
-            
-            self.preview_text.delete("1.0", tk.END)
-            self.preview_text.insert("1.0", preview)
-            
-            # Update column dropdowns
-            columns = [""] + list(self.df.columns)
-            self.phone_combo['values'] = columns
-            self.name_combo['values'] = columns
-            self.message_combo['values'] = columns
-            
-            self.log("File loaded successfully!")
-            self.update_status(f"Loaded: {len(self.df)} rows")
-            self.update_estimate()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
-            self.log(f"ERROR: {str(e)}")
+        file_path = self.file_path.get()
+        self.begin_load(f"Reading {Path(file_path).name}...")
+        self._load_task = BackgroundTask(
+            self.root,
+            lambda report, cancel: contact_cache.load_spreadsheet(
+                file_path, progress=report, cancel_event=cancel),
+            on_done=lambda loaded: self.on_file_loaded(*loaded, file_path),
+            on_error=self.on_load_error,
+            on_progress=self.on_load_progress,
+            on_cancel=self.on_load_cancelled,
+        ).start()
+    
+    def on_file_loaded(self, df, source_digest, file_path):
+        """Swap in the loaded DataFrame (Tk thread)"""
+        self.end_load()
+        self.df = df
+        self.source_digest = source_digest
+        self.source_path = file_path
+        event_log.emit(event_log.LOAD, source=Path(file_path).name, rows=len(df),
+                       columns=len(df.columns))
+        
+        # Update preview
+        preview = f"File: {Path(file_path).name}\n"
+        preview += f"Rows: {len(self.df)}, Columns: {len(self.df.columns)}\n\n"
+        preview += self.df.head(5).to_string(index=False)
+        
+        self.preview_text.delete("1.0", tk.END)
+        self.preview_text.insert("1.0", preview)
+        
+        # Update column dropdowns
+        columns = [""] + list(self.df.columns)
+        self.phone_combo['values'] = columns
+        self.name_combo['values'] = columns
+        self.message_combo['values'] = columns
+        
+        self.log("File loaded successfully!")
+        self.update_status(f"Loaded: {len(self.df)} rows")
+        self.update_estimate()
+    
+    def begin_load(self, text):
+        """Show the load progress row"""
+        self.load_bar.config(mode='indeterminate')
+        self.load_bar.start(10)
+        self.load_label.config(text=text)
+        self.load_frame.pack(fill=tk.X, padx=10, after=self.load_frame_anchor)
+        self.update_status(text)
+    
+    def end_load(self):
+        """Hide the load progress row"""
+        self._load_task = None
+        self.load_bar.stop()
+        self.load_frame.pack_forget()
+    
+    def cancel_load(self):
+        """Cancel the running load or contact preparation"""
+        if self._load_task is not None:
+            self._load_task.cancel()
+            self.load_label.config(text="Cancelling...")
+    
+    def on_load_progress(self, done, total):
+        """Update the load progress row with rows processed"""
+        if total:
+            self.load_bar.stop()
+            self.load_bar.config(mode='determinate', maximum=total, value=done)
+            self.load_label.config(text=f"{done:,} / {total:,} rows")
+        else:
+            self.load_label.config(text=f"{done:,} rows read")
+    
+    def on_load_error(self, e):
+        self.end_load()
+        self.start_button.config(state=tk.NORMAL)
+        self.update_status("Ready")
+        messagebox.showerror("Error", f"Failed to load data:\n{str(e)}")
+        self.log(f"ERROR: {str(e)}")
+    
+    def on_load_cancelled(self):
+        self.end_load()
+        self.start_button.config(state=tk.NORMAL)
+        self.update_status("Ready")
+        self.log("Load cancelled.")
     
     def auto_detect_columns(self):
         """Auto-detect columns"""
@@ -502,20 +594,25 @@ Lower delays = higher risk of account suspension. Use with caution!"""
             messagebox.showwarning("Warning", "Please load a file first!")
             return
         
-        detected = data_processor.detect_columns(self.df)
+        chosen = column_detector.pick_columns(column_detector.rank_columns(self.df))
+        column_detector.log_detection(chosen)
+        
+        def _fmt(role):
+            c = chosen[role]
+            return f"{c.column} ({c.confidence:.0%})" if c else "Not found"
         
-        if detected['phone']:
-            self.phone_combo.set(detected['phone'])
-        if detected['name']:
-            self.name_combo.set(detected['name'])
-        if detected['message']:
-            self.message_combo.set(detected['message'])
+        if chosen['phone']:
+            self.phone_combo.set(chosen['phone'].column)
+        if chosen['name']:
+            self.name_combo.set(chosen['name'].column)
+        if chosen['message']:
+            self.message_combo.set(chosen['message'].column)
         
         self.log("Auto-detection completed!")
         messagebox.showinfo("Auto-Detection", 
-                           f"Detected:\nPhone: {detected['phone'] or 'Not found'}\n"
-                           f"Name: {detected['name'] or 'Not found'}\n"
-                           f"Message: {detected['message'] or 'Not found'}")
+                           f"Detected:\nPhone: {_fmt('phone')}\n"
+                           f"Name: {_fmt('name')}\n"
+                           f"Message: {_fmt('message')}")
     
     def apply_preset(self, preset_name):
         """Apply delay preset"""
@@ -576,25 +673,30 @@ Lower delays = higher risk of account suspension. Use with caution!"""
         
         if self.df is not None:
             total = len(self.df)
+            # Delays, warm-up and every auto-pause window, plus the expected send time
+            estimate = eta.EtaEstimator(self.schedule_settings()).estimate(total, 1)
+            mode_text = " (FIXED)" if self.use_fixed_delay.get() else ""
             
-            if self.use_fixed_delay.get():
-                # Fixed delay: exact time
-                avg_delay = self.base_delay.get()
-                estimated_seconds = avg_delay * total
-                mode_text = " (FIXED)"
-            else:
-                # Variable delay: with jitter
-                avg_delay = self.base_delay.get() + (self.jitter_min.get() + self.jitter_max.get()) / 2
-                warmup_extra = self.warmup_delay.get() * min(total, self.warmup_count.get())
-                estimated_seconds = (avg_delay * total) + warmup_extra
-                mode_text = ""
-            
-            hours = int(estimated_seconds // 3600)
-            minutes = int((estimated_seconds % 3600) // 60)
-            
-            estimate_text = f"For {total} messages: ~{hours}h {minutes}m{mode_text}"
+            estimate_text = (f"For {total} messages: ~{utils.format_duration(estimate.seconds)}"
+                             f" ({utils.format_duration(estimate.low)} – "
+                             f"{utils.format_duration(estimate.high)}){mode_text}")
             self.estimate_label.config(text=estimate_text)
     
+    def schedule_settings(self):
+        """Current delay / anti-ban settings for planning and ETA"""
+        return campaign_planner.ScheduleSettings(
+            base_delay=self.base_delay.get(),
+            jitter_min=self.jitter_min.get(),
+            jitter_max=self.jitter_max.get(),
+            warmup_count=self.warmup_count.get(),
+            warmup_delay=self.warmup_delay.get(),
+            fixed_delay=self.use_fixed_delay.get(),
+            pause_limit=self.pause_limit.get(),
+            auto_resume=self.auto_resume_enabled.get(),
+            resume_hours=self.auto_resume_hours.get(),
+            send_seconds=config.PLAN_SEND_SECONDS,
+        )
+    
     def check_resume_on_startup(self):
         """Check if there's saved progress and ask to resume"""
         if self.progress_file.exists():
@@ -602,7 +704,8 @@ Lower delays = higher risk of account suspension. Use with caution!"""
                 with open(self.progress_file, 'r') as f:
                     progress = json.load(f)
                 
-                if progress.get('contacts') and progress.get('current_index', 0) < len(progress['contacts']):
+                if progress.get('contacts') and (progress.get('current_index', 0) < len(progress['contacts'])
+                                                 or progress.get('retry_queue')):
                     response = messagebox.askyesno(
                         "Resume Previous Session",
                         f"Found saved progress:\n\n"
@@ -624,9 +727,14 @@ Lower delays = higher risk of account suspension. Use with caution!"""
         """Load saved progress"""
         try:
             # Restore contacts
+            templates.import_templates(progress.get('templates'))
             self.contacts = progress.get('contacts', [])
             self.current_index = progress.get('current_index', 0)
             self.failed_contacts = progress.get('failed_contacts', [])
+            self.retry_queue = retry_queue.RetryQueue(progress.get('retry_queue'))
+            self.confirmations = progress.get('confirmations')
+            self.campaign = progress.get('campaign')
+            self.results_file = progress.get('results_file')
             
             # Update UI
             self.progress_bar['maximum'] = len(self.contacts)
@@ -643,30 +751,73 @@ Lower delays = higher risk of account suspension. Use with caution!"""
             messagebox.showinfo("Progress Loaded", 
                               f"Ready to resume from message {self.current_index + 1}")
             
+            if campaign_identity.check_source(self.campaign) == "changed":
+                self.offer_source_remap(success, failed)
+            
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load progress:\n{str(e)}")
     
-    def save_progress_state(self, success_count, failed_count):
-        """Save current progress to file"""
-        try:
-            progress = {
-                'file_name': Path(self.file_path.get()).name if self.file_path.get() else 'Unknown',
-                'contacts': self.contacts,
-                'current_index': self.current_index,
-                'success_count': success_count,
-                'failed_count': failed_count,
-                'failed_contacts': self.failed_contacts,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            with open(self.progress_file, 'w') as f:
-                json.dump(progress, f, indent=2)
-            
-            self.log(f"Progress saved: {self.current_index}/{len(self.contacts)}")
-            
-        except Exception as e:
-            self.log(f"Error saving progress: {str(e)}")
+    def offer_source_remap(self, success, failed):
+        """Re-read a source file that changed since the progress was saved"""
+        record = self.campaign
+        if not messagebox.askyesno(
+            "Source File Changed",
+            f"The source file changed since this progress was saved:\n{record.get('source')}\n\n"
+            "Re-read it and match already processed contacts by phone number?\n\n"
+            "(No = continue with the saved contact list)"):
+            return
+        
+        old_signatures = campaign_identity.record_signatures(record, self.contacts)
+        old_index = self.current_index
+        
+        def _on_reloaded(result):
+            self.end_load()
+            new_contacts, digest = result
+            new_signatures = campaign_identity.contact_signatures(new_contacts)
+            contacts, index, diff = campaign_identity.remap_progress(
+                old_signatures, old_index, new_contacts, new_signatures)
+            summary = campaign_identity.describe_diff(diff)
+            self.log(f"Source changed: {summary} (rows listed in the bot log)")
+            campaign_identity.log_diff_rows(diff, old_signatures, new_signatures)
+            rows = "\n".join(campaign_identity.diff_rows(
+                diff, old_signatures, new_signatures, config.DIFF_PREVIEW_ROWS))
+            if not messagebox.askyesno("Remap Progress", f"Changes: {summary}\n\n{rows}\n\n"
+                                       f"Resume with {index} contacts already processed and "
+                                       f"{len(contacts) - index} remaining?\n\n"
+                                       "(No = continue with the saved contact list)"):
+                self.log("Remap declined: keeping the saved contact list")
+                return
+            self.contacts = contacts
+            self.current_index = index
+            self.source_path, self.source_digest = record.get('source'), digest
+            self.campaign = campaign_identity.campaign_record(
+                record.get('source'), digest, record.get('mapping'),
+                record.get('default_message'), contacts)
+            self.progress_bar['maximum'] = len(contacts)
+            self.progress_bar['value'] = index
+            self.update_progress(index, success, failed)
+            self.log(f"Source remapped by phone: {index} processed, {len(contacts) - index} remaining")
+        
+        self.begin_load("Re-reading source...")
+        self._load_task = BackgroundTask(
+            self.root,
+            lambda report, cancel: campaign_identity.reload_contacts(
+                record, progress=report, cancel_event=cancel),
+            on_done=_on_reloaded,
+            on_error=self.on_load_error,
+            on_progress=self.on_load_progress,
+            on_cancel=self.on_load_cancelled,
+        ).start()
     
+    def progress_store(self):
+        """Progress file of this window; the runner adds its own state"""
+        return campaign_runner.JsonProgressStore(self.progress_file, extra=lambda: {
+            'file_name': Path(self.file_path.get()).name if self.file_path.get() else 'Unknown',
+            'campaign': self.campaign,
+            'contacts': self.contacts,
+            'templates': templates.export_templates(self.contacts),
+        })
+
     def start_bot(self):
         """Start the bot in a separate thread"""
         if self.df is None and not self.contacts:
@@ -688,24 +839,76 @@ Lower delays = higher risk of account suspension. Use with caution!"""
             # Get default message
             default_msg = self.default_message.get("1.0", tk.END).strip()
             
-            # Prepare contacts
-            self.contacts = data_processor.prepare_contacts(self.df, self.column_mapping, default_msg)
-            
-            if not self.contacts:
-                messagebox.showerror("Error", "No valid contacts found!")
+            # Prepare contacts in the background; start continues in on_contacts_prepared
+            if self._load_task is not None:
+                messagebox.showinfo("Loading", "Please wait for the current load to finish.")
                 return
-            
-            self.current_index = 0
-            self.failed_contacts = []
+            df, mapping, source_digest = self.df, dict(self.column_mapping), self.source_digest
+            self.start_button.config(state=tk.DISABLED)
+            self.begin_load("Preparing contacts...")
+            self._load_task = BackgroundTask(
+                self.root,
+                lambda report, cancel: contact_cache.prepare_contacts(
+                    df, mapping, default_msg, source_digest,
+                    progress=report, cancel_event=cancel),
+                on_done=lambda contacts: self.on_contacts_prepared(contacts, mapping, default_msg),
+                on_error=self.on_load_error,
+                on_progress=self.on_load_progress,
+                on_cancel=self.on_load_cancelled,
+            ).start()
+            return
+        
+        self.confirm_and_start()
+    
+    def on_contacts_prepared(self, contacts, mapping, default_msg):
+        """Adopt the prepared contacts (Tk thread) and continue starting"""
+        self.end_load()
+        event_log.emit(event_log.PREPARED, contacts=len(contacts),
+                       skipped=len(self.df) - len(contacts) if self.df is not None else None)
+        self.start_button.config(state=tk.NORMAL)
+        self.update_status("Ready")
+        if not contacts:
+            messagebox.showerror("Error", "No valid contacts found!")
+            return
         
+        self.contacts = contacts
+        self.current_index = 0
+        self.failed_contacts = []
+        self.retry_queue = retry_queue.RetryQueue()
+        self.confirmations = None
+        self.results_file = None
+        self.campaign = campaign_identity.campaign_record(
+            self.source_path, self.source_digest, mapping, default_msg, contacts)
+        self.confirm_and_start()
+    
+    def confirm_and_start(self):
+        """Confirm and launch the sending thread"""
         # Confirm
         if not messagebox.askyesno("Confirm", 
-                                   f"Ready to send {len(self.contacts) - self.current_index} messages?\n\n"
+                                   f"Ready to send {len(self.contacts) - self.current_index + len(self.retry_queue)} messages?\n\n"
                                    f"Base delay: {self.base_delay.get()}s\n"
                                    f"Mode: {'FIXED' if self.use_fixed_delay.get() else 'VARIABLE'}\n\n"
                                    "Continue?"):
             return
         
+        success_count = sum(1 for c in self.contacts[:self.current_index] if not c.get('failed', False))
+        transport = SeleniumTransport(
+            log=self.log,
+            on_recovering=lambda: self.log("⚠ Chrome session lost - paused, restarting browser..."),
+            on_recovered=lambda seconds: self.log(
+                f"Chrome session recovered in {seconds:.0f}s - resuming from the failed contact"),
+            on_sample=lambda s: self.root.after(
+                0, self.resources_label.config, {"text": resource_monitor.describe(s)}))
+        self.runner = campaign_runner.CampaignRunner(
+            self.contacts, transport, self.schedule_settings(), self.progress_store(),
+            index=self.current_index, success=success_count, failed=len(self.failed_contacts),
+            failed_contacts=self.failed_contacts, retries=self.retry_queue,
+            results_file=self.results_file, source=self.source_path,
+            confirmations=self.confirmations)
+        self.runner.subscribe(self.on_campaign_event)
+        event_log.events().attach(self.runner)
+        self.results_file = str(self.runner.results.path)
+
         # Update UI
         self.is_running = True
         self.is_paused = False
@@ -713,276 +916,167 @@ Lower delays = higher risk of account suspension. Use with caution!"""
         self.pause_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.NORMAL)
         self.progress_bar['maximum'] = len(self.contacts)
-        
+
         # Start in thread
         thread = threading.Thread(target=self.run_bot, daemon=True)
         thread.start()
-    
+
     def run_bot(self):
         """Run the bot (in separate thread)"""
+        runner = self.runner
         try:
             self.log("="*60)
             self.log("Starting Velo Bot...")
             self.log("="*60)
-            
-            # Setup driver if not exists
-            if not self.driver:
-                self.log("Initializing Chrome WebDriver...")
-                self.driver = setup_driver()
-                
-                # Load WhatsApp
-                self.log("Loading WhatsApp Web...")
-                wait_for_whatsapp_load(self.driver)
-                self.log("WhatsApp Web loaded successfully!")
-            
-            # Send messages
-            success_count = sum(1 for c in self.contacts[:self.current_index] if not c.get('failed', False))
-            failed_count = len(self.failed_contacts)
-            self._session_success_count = 0  # reset per-run success counter
-            
-            for idx in range(self.current_index, len(self.contacts)):
-                if not self.is_running:
-                    self.log("Stopped by user")
-                    break
-                
-                # Check if paused (manual or auto)
-                while self.is_paused and self.is_running:
-                    time_module.sleep(0.5)
-                
-                if not self.is_running:
-                    break
-                
-                contact = self.contacts[idx]
-                message_num = idx + 1
-                self.current_index = idx
-                
-                self.log(f"\n[{message_num}/{len(self.contacts)}] Processing {contact['name']}...")
-                
-                # Update next message label
-                self.root.after(0, self.next_message_label.config, 
-                              {"text": f"Sending to: {contact['name']} ({contact['phone']})"})
-                
-                # Send message
-                success = send_message(
-                    self.driver,
-                    contact['phone'],
-                    contact['message'],
-                    contact['name']
-                )
-                
-                if success:
-                    success_count += 1
-                    self._session_success_count += 1
-                    self.log(f"✓ Message sent to {contact['name']} ({contact['phone']})")
-                else:
-                    failed_count += 1
-                    # Add to failed list
-                    self.failed_contacts.append({
-                        'phone': contact['phone'],
-                        'name': contact['name'],
-                        'reason': 'Send failed',
-                        'timestamp': datetime.now().isoformat()
-                    })
-                    self.log(f"✗ Failed to send to {contact['name']} ({contact['phone']})")
-                
-                # Update UI
-                self.root.after(0, self.update_progress, message_num, success_count, failed_count)
-                
-                # ── AUTO-PAUSE CHECK ──────────────────────────────────────
-                limit = self.pause_limit.get()
-                if (limit > 0 and
-                        self._session_success_count > 0 and
-                        self._session_success_count % limit == 0 and
-                        idx < len(self.contacts) - 1):   # don't pause on last
-                    
-                    # 1. Save progress BEFORE pausing
-                    self.save_progress_state(success_count, failed_count)
-                    
-                    # 2. Pause the bot
-                    self.is_paused = True
-                    self.log(f"")
-                    self.log("=" * 60)
-                    self.log(f"⛔ AUTO-PAUSE: {limit} pesan sukses tercapai!")
-                    self.log("Progress sudah disimpan. Bot akan lanjut otomatis atau klik Resume.")
-                    self.log("=" * 60)
-                    
-                    # 3. Update UI
-                    self.root.after(0, self.countdown_label.config, {"text": "AUTO-PAUSE"})
-                    self.root.after(0, self.pause_button.config,
-                                   {"text": "▶️ Resume", "bg": "#4CAF50"})
-                    self.root.after(0, self.antiban_status_label.config,
-                                   {"text": f"⛔  AUTO-PAUSED setelah {limit} sukses",
-                                    "fg": "#D32F2F"})
-                    self.root.after(0, self.manual_resume_btn.config, {"state": tk.NORMAL})
-                    self.root.after(0, self.antiban_info_label.config,
-                                   {"text": "Progress tersimpan. Resume manual atau tunggu auto-resume."})
-                    
-                    # 4. Start auto-resume countdown (if enabled)
-                    if self.auto_resume_enabled.get():
-                        hours = self.auto_resume_hours.get()
-                        self._auto_resume_cancel.clear()
-                        self._auto_resume_thread = threading.Thread(
-                            target=self._auto_resume_timer,
-                            args=(hours,),
-                            daemon=True
-                        )
-                        self._auto_resume_thread.start()
-                    
-                    # 5. Wait while paused
-                    while self.is_paused and self.is_running:
-                        time_module.sleep(0.5)
-                    
-                    # 6. Clear auto-pause UI on resume
-                    self.root.after(0, self.antiban_countdown_label.config, {"text": ""})
-                    self.root.after(0, self.antiban_status_label.config,
-                                   {"text": "⬤  Berjalan", "fg": "#388E3C"})
-                    self.root.after(0, self.manual_resume_btn.config, {"state": tk.DISABLED})
-                    if self.is_running:
-                        self.log("▶️ RESUMED — melanjutkan pengiriman...")
-                # ─────────────────────────────────────────────────────────
-                
-                # Save progress after each message
-                self.save_progress_state(success_count, failed_count)
-                
-                # Delay with countdown
-                if message_num < len(self.contacts):
-                    delay = self.calculate_custom_delay(message_num)
-                    self.log(f"Waiting {delay:.0f}s before next message...")
-                    
-                    # Show next contact info
-                    if message_num < len(self.contacts):
-                        next_contact = self.contacts[message_num]
-                        self.root.after(0, self.next_message_label.config,
-                                      {"text": f"Next: {next_contact['name']} ({next_contact['phone']})"})
-                    
-                    # Countdown timer
-                    for remaining in range(int(delay), 0, -1):
-                        if not self.is_running:
-                            break
-                        
-                        # Check if paused
-                        while self.is_paused and self.is_running:
-                            time_module.sleep(0.5)
-                        
-                        if not self.is_running:
-                            break
-                        
-                        # Update countdown display
-                        minutes = remaining // 60
-                        seconds = remaining % 60
-                        self.root.after(0, self.countdown_label.config, 
-                                      {"text": f"{minutes:02d}:{seconds:02d}"})
-                        
-                        time_module.sleep(1)
-            
+
+            finished = runner.run()
+            if not finished.completed:
+                self.log(f"Stopped at {runner.index}/{len(self.contacts)}"
+                         + (f" with {len(self.retry_queue)} retries pending" if self.retry_queue else "")
+                         + " (saved)")
+                return
+
+            self.results_file = None
             self.log("\n" + "="*60)
             self.log("COMPLETED!")
-            self.log(f"Success: {success_count}, Failed: {failed_count}")
+            self.log(f"Success: {finished.success}, Failed: {finished.failed}")
+            self.log(f"Confirmation: {send_confirmation.summarize(finished.confirmations)}")
+            self.log(f"Results: {finished.results_path}")
+            if finished.annotated_path:
+                self.log(f"Annotated spreadsheet: {finished.annotated_path}")
             self.log("="*60)
-            
+
             # Clear countdown
             self.root.after(0, self.countdown_label.config, {"text": "DONE!"})
             self.root.after(0, self.next_message_label.config, {"text": "All messages sent"})
-            
-            messagebox.showinfo("Complete", 
-                              f"Finished sending messages!\n\n"
-                              f"Success: {success_count}\n"
-                              f"Failed: {failed_count}")
-            
-            # Clear progress file
-            if self.progress_file.exists():
-                self.progress_file.unlink()
-            
+            self.root.after(0, self.eta_label.config, {"text": "ETA --"})
+
+            self.root.after(0, lambda: messagebox.showinfo(
+                "Complete",
+                f"Finished sending messages!\n\n"
+                f"Success: {finished.success}\n"
+                f"Failed: {finished.failed}"))
+
         except Exception as e:
             self.log(f"ERROR: {str(e)}")
-            messagebox.showerror("Error", f"An error occurred:\n{str(e)}")
-        
+            _msg = f"An error occurred:\n{str(e)}"
+            self.root.after(0, lambda: messagebox.showerror("Error", _msg))
+
         finally:
-            if self.driver and not self.is_paused:
-                self.driver.quit()
-                self.driver = None
+            self.current_index = runner.index
+            self.confirmations = runner.confirmations
             self.is_running = False
+            self.is_paused = False
             self.root.after(0, self.reset_ui)
-    
-    def calculate_custom_delay(self, message_count):
-        """Calculate delay with custom settings"""
-        import random
-        
-        delay = self.base_delay.get()
-        
-        # Check if fixed delay mode
-        if self.use_fixed_delay.get():
-            # Fixed delay - no jitter, no warmup
-            return float(delay)
-        
-        # Variable delay mode
-        if message_count < self.warmup_count.get():
-            delay += self.warmup_delay.get()
-        
-        jitter = random.uniform(self.jitter_min.get(), self.jitter_max.get())
-        delay += jitter
-        
-        return delay
-    
+
+    def on_campaign_event(self, event):
+        """CampaignRunner observer (bot thread): log and update the UI"""
+        if isinstance(event, campaign_runner.Sending):
+            contact = event.contact
+            if not event.retry:
+                self.current_index = event.number
+                self.log(f"\n[{event.number}/{event.total}] Processing {contact['name']}...")
+            self.root.after(0, self.next_message_label.config,
+                          {"text": f"Sending to: {contact['name']} ({contact['phone']})"})
+
+        elif isinstance(event, campaign_runner.Sent):
+            contact = event.contact
+            prefix = "✓ Retry sent" if event.retry else "✓ Message sent"
+            if event.confirmation == send_confirmation.CONFIRMED:
+                note = f" - confirmed in {event.confirm_seconds:.1f}s"
+            else:
+                note = f" - {send_confirmation.describe(event.confirmation).lower()}"
+            self.log(f"{prefix} to {contact['name']} ({contact['phone']}){note}")
+            self.root.after(0, self.update_progress, event.number, event.success, event.failed)
+
+        elif isinstance(event, campaign_runner.Failed):
+            contact, reason = event.contact, retry_queue.describe(event.outcome)
+            if event.queued:
+                # Transient failure: retried after the main pass
+                self.log(f"↻ {reason} for {contact['name']} - queued for retry")
+            elif event.retry:
+                self.log(f"✗ Giving up on {contact['name']}: {reason}")
+            else:
+                self.log(f"✗ Failed to send to {contact['name']} ({contact['phone']}): {reason}")
+            self.root.after(0, self.update_progress, event.number, event.success, event.failed)
+
+        elif isinstance(event, campaign_runner.Countdown):
+            remaining = event.seconds
+            if event.phase == 'auto_resume':
+                h, m, s = remaining // 3600, (remaining % 3600) // 60, remaining % 60
+                self.root.after(0, self.antiban_countdown_label.config,
+                                {"text": f"{h:02d}:{m:02d}:{s:02d}"})
+            else:
+                if event.next_contact and remaining == math.ceil(event.duration):
+                    self.log(f"Waiting {event.duration:.0f}s before next message...")
+                    self.root.after(0, self.next_message_label.config,
+                                  {"text": f"Next: {event.next_contact['name']} "
+                                           f"({event.next_contact['phone']})"})
+                self.root.after(0, self.countdown_label.config,
+                              {"text": f"{remaining // 60:02d}:{remaining % 60:02d}"})
+            self.root.after(0, self.eta_label.config, {"text": eta.describe(event.eta)})
+
+        elif isinstance(event, campaign_runner.Paused):
+            self.is_paused = True
+            if event.reason == 'auto':
+                limit = self.runner.settings.pause_limit
+                self.log(f"")
+                self.log("=" * 60)
+                self.log(f"⛔ AUTO-PAUSE: {limit} pesan sukses tercapai!")
+                self.log("Progress sudah disimpan. Bot akan lanjut otomatis atau klik Resume.")
+                self.log("=" * 60)
+                if event.resume_in:
+                    self.log(f"⏳ Auto-resume dalam {event.resume_in / 3600:.0f} jam "
+                             f"({int(event.resume_in) // 60} menit)...")
+                self.root.after(0, self.countdown_label.config, {"text": "AUTO-PAUSE"})
+                self.root.after(0, self.pause_button.config,
+                               {"text": "▶️ Resume", "bg": "#4CAF50"})
+                self.root.after(0, self.antiban_status_label.config,
+                               {"text": f"⛔  AUTO-PAUSED setelah {limit} sukses",
+                                "fg": "#D32F2F"})
+                self.root.after(0, self.manual_resume_btn.config, {"state": tk.NORMAL})
+                self.root.after(0, self.antiban_info_label.config,
+                               {"text": "Progress tersimpan. Resume manual atau tunggu auto-resume."})
+
+        elif isinstance(event, campaign_runner.Resumed):
+            self.is_paused = False
+            self.log("🔔 Auto-resume dipicu!" if event.reason == 'auto'
+                     else "▶️ RESUMED — melanjutkan pengiriman...")
+            self.root.after(0, self.pause_button.config, {"text": "⏸️ Pause", "bg": "#FF9800"})
+            self.root.after(0, self.antiban_countdown_label.config, {"text": ""})
+            self.root.after(0, self.antiban_status_label.config,
+                           {"text": "⬤  Berjalan", "fg": "#388E3C"})
+            self.root.after(0, self.manual_resume_btn.config, {"state": tk.DISABLED})
+
+        elif isinstance(event, campaign_runner.RetryPass):
+            self.log(f"\nRetrying {event.pending} contacts that failed transiently...")
+
     def pause_bot(self):
         """Pause / Resume the bot (manual)"""
-        if self.is_running and not self.is_paused:
-            self.is_paused = True
+        if self.runner is None or not self.is_running:
+            return
+        if not self.runner.is_paused:
+            self.runner.pause()
             self.pause_button.config(text="▶️ Resume", bg="#4CAF50")
             self.log("⏸️ PAUSED - Click Resume to continue")
             self.countdown_label.config(text="PAUSED")
-            messagebox.showinfo("Paused", "Bot paused. Progress saved.\nClick Resume to continue.")
-        elif self.is_paused:
-            # Cancel any running auto-resume countdown
-            self._auto_resume_cancel.set()
-            self.is_paused = False
-            self.pause_button.config(text="⏸️ Pause", bg="#FF9800")
-            self.antiban_status_label.config(text="⬤  Berjalan", fg="#388E3C")
-            self.antiban_countdown_label.config(text="")
-            self.manual_resume_btn.config(state=tk.DISABLED)
-            self.log("▶️ RESUMED")
-    
+            messagebox.showinfo("Paused", "Bot paused. Progress is saved once the current message finishes.\nClick Resume to continue.")
+        else:
+            # Also cancels a running auto-resume countdown
+            self.runner.resume()
+
     def _manual_resume(self):
         """Resume button on the Anti-Ban tab"""
-        if self.is_paused:
-            self._auto_resume_cancel.set()
-            self.is_paused = False
-            self.pause_button.config(text="⏸️ Pause", bg="#FF9800")
-            self.antiban_status_label.config(text="⬤  Berjalan", fg="#388E3C")
-            self.antiban_countdown_label.config(text="")
-            self.manual_resume_btn.config(state=tk.DISABLED)
-            self.log("▶️ RESUMED (manual dari tab Anti-Ban)")
-    
-    def _auto_resume_timer(self, hours: float):
-        """Countdown timer for auto-resume (runs in background thread)"""
-        total_seconds = int(hours * 3600)
-        self.log(f"⏳ Auto-resume dalam {hours:.0f} jam ({total_seconds // 60} menit)...")
-        
-        for remaining in range(total_seconds, 0, -1):
-            if self._auto_resume_cancel.is_set():
-                return  # cancelled by manual resume or stop
-            if not self.is_running:
-                return
-            
-            h = remaining // 3600
-            m = (remaining % 3600) // 60
-            s = remaining % 60
-            countdown_text = f"{h:02d}:{m:02d}:{s:02d}"
-            self.root.after(0, self.antiban_countdown_label.config, {"text": countdown_text})
-            time_module.sleep(1)
-        
-        # Time's up — resume if still paused
-        if not self._auto_resume_cancel.is_set() and self.is_paused and self.is_running:
-            self.log(f"🔔 Auto-resume dipicu setelah {hours:.0f} jam!")
-            self.root.after(0, self._manual_resume)
-    
+        if self.runner is not None and self.runner.is_paused:
+            self.runner.resume()
+
     def stop_bot(self):
         """Stop the bot"""
         if messagebox.askyesno("Confirm", "Are you sure you want to stop?\n\nProgress will be saved."):
-            self.is_running = False
-            self.is_paused = False
+            if self.runner is not None:
+                self.runner.stop()
             self.log("Stopping...")
-    
+
     def update_progress(self, current, success, failed):
         """Update progress UI"""
         self.progress_bar['value'] = current
@@ -999,7 +1093,6 @@ Lower delays = higher risk of account suspension. Use with caution!"""
         self.antiban_status_label.config(text="⬤  Idle", fg="#757575")
         self.antiban_countdown_label.config(text="")
         self.manual_resume_btn.config(state=tk.DISABLED)
-        self._session_success_count = 0
         self.update_status("Ready")
     
     def export_failed_numbers(self):
@@ -1017,20 +1110,7 @@ Lower delays = higher risk of account suspension. Use with caution!"""
             )
             
             if filename:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write("Failed WhatsApp Numbers\n")
-                    f.write("="*60 + "\n")
-                    f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write(f"Total Failed: {len(self.failed_contacts)}\n")
-                    f.write("="*60 + "\n\n")
-                    
-                    for idx, contact in enumerate(self.failed_contacts, 1):
-                        f.write(f"{idx}. {contact['name']}\n")
-                        f.write(f"   Phone: {contact['phone']}\n")
-                        f.write(f"   Reason: {contact.get('reason', 'Unknown')}\n")
-                        f.write(f"   Time: {contact.get('timestamp', 'Unknown')}\n")
-                        f.write("\n")
-                
+                results_report.export_failed(self.failed_contacts, filename)
                 messagebox.showinfo("Export Successful", 
                                   f"Failed numbers exported to:\n{filename}")
                 self.log(f"Exported {len(self.failed_contacts)} failed numbers to {filename}")
@@ -0,0 +1,63 @@
+"""
+Benchmark: Chrome cold start and memory, default vs. lean launch, before and
+after pruning the session profile's caches
+
+Needs Chrome and a logged-in (or QR) session; run directly (not collected
+by pytest):
+    python tests/bench_chrome_startup.py [runs]
+"""
+
+from pathlib import Path
+import statistics
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, profile_maintenance, resource_monitor, selector_registry
+from src.whatsapp_bot import setup_driver
+
+SETTLE_SECONDS = 10
+
+def _launch(lean: bool):
+    """(seconds until WhatsApp Web shows the chat list or QR, RSS bytes after settling)"""
+    started = time.perf_counter()
+    driver = setup_driver(lean)
+    try:
+        driver.get("https://web.whatsapp.com")
+        selectors = selector_registry.registry()
+        while not (selectors.find_all(driver, 'chat_loaded') or selectors.find_all(driver, 'qr_code')):
+            if time.perf_counter() - started > config.PAGE_LOAD_TIMEOUT:
+                break
+            time.sleep(0.2)
+        ready = time.perf_counter() - started
+        time.sleep(SETTLE_SECONDS)
+        sample = resource_monitor.ResourceMonitor(lambda: driver).sample()
+        return ready, sample.rss_bytes if sample else 0
+    finally:
+        driver.quit()
+
+def _report(label: str, runs: int, lean: bool):
+    results = [_launch(lean) for _ in range(runs)]
+    ready = statistics.median(r[0] for r in results)
+    rss = statistics.median(r[1] for r in results) / 1048576
+    print(f"{label:<28} cold start {ready:6.1f}s   RSS {rss:8,.0f} MB")
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(profile_maintenance.describe())
+    _report("default, caches kept", runs, lean=False)
+    _report("lean, caches kept", runs, lean=True)
+    time.sleep(2)  # let the last Chrome release the profile
+    result = profile_maintenance.prune()
+    print(f"Pruned {result.freed_bytes / 1048576:,.0f} MB"
+          + (f" (skipped: {result.skipped_reason})" if result.skipped_reason else ""))
+    # The first run after pruning rebuilds the caches: that is the cold start
+    _report("default, after prune", 1, lean=False)
+    profile_maintenance.prune()
+    _report("lean, after prune", 1, lean=True)
+    print(profile_maintenance.describe())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Shared test fixtures
+"""
+
+from pathlib import Path
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config
+
+@pytest.fixture(autouse=True)
+def _isolated_log(tmp_path, monkeypatch):
+    """Every test logs to its own tmp_path, never to src/bot_log.txt"""
+    monkeypatch.setattr(config, "LOG_FILE", tmp_path / "bot_log.txt")
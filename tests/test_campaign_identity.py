@@ -0,0 +1,79 @@
+"""
+Tests for campaign fingerprints, source diffs and phone-based resume remapping
+"""
+
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import campaign_identity
+
+def _contact(phone, row, name="A", template="t1"):
+    return {"phone": phone, "name": name, "original_row": row, "from_url": False, "template": template}
+
+def test_diff_and_remap_match_by_phone():
+    """Inserted and re-sorted rows neither resend nor skip contacts"""
+    old = [_contact("6281", 1), _contact("6282", 2), _contact("6283", 3), _contact("6284", 4)]
+    # Two contacts processed before the sheet was edited
+    saved = campaign_identity.contact_signatures(old)
+
+    new = [
+        _contact("6289", 1),                # inserted at the top
+        _contact("6283", 2),                # moved up
+        _contact("6281", 3),                # moved down (already sent)
+        _contact("6282", 4, name="B"),      # edited (already sent)
+    ]
+    contacts, index, diff = campaign_identity.remap_progress(saved, 2, new)
+
+    assert [c["phone"] for c in contacts[:index]] == ["6281", "6282"]
+    assert [c["phone"] for c in contacts[index:]] == ["6289", "6283"]
+    assert diff.added == ["6289#0"]
+    assert diff.removed == ["6284#0"]
+    assert diff.changed == ["6282#0"]
+    assert diff.moved == ["6283#0", "6281#0"]
+
+    new_signatures = campaign_identity.contact_signatures(new)
+    assert campaign_identity.diff_rows(diff, saved, new_signatures) == [
+        "added    row 1      6289", "removed  row 4      6284", "changed  row 4      6282"]
+    # The list handed to remap_progress keeps its order
+    assert [c["phone"] for c in new] == ["6289", "6283", "6281", "6282"]
+
+def test_diff_rows_are_truncated_per_kind():
+    old = campaign_identity.contact_signatures([_contact("6281", 1)])
+    new = campaign_identity.contact_signatures([_contact(f"629{i}", i) for i in range(5)])
+    diff = campaign_identity.diff_contacts(old, new)
+    assert campaign_identity.diff_rows(diff, old, new, limit=2) == [
+        "added    row 0      6290", "added    row 1      6291", "added    ... and 3 more",
+        "removed  row 1      6281"]
+
+def test_fingerprints_detect_edits(tmp_path):
+    source = tmp_path / "list.csv"
+    source.write_text("Phone\n0812\n")
+    contacts = [_contact("6281", 1), _contact("6281", 2)]
+    record = campaign_identity.campaign_record(source, campaign_identity.source_fingerprint(source),
+                                               {"phone": "Phone"}, "Hi", contacts)
+    assert campaign_identity.check_source(record) == "unchanged"
+    # Duplicate phones get distinct keys
+    assert [s.key for s in campaign_identity.record_signatures(record, contacts)] == ["6281#0", "6281#1"]
+
+    source.write_text("Phone\n0813\n0812\n")
+    assert campaign_identity.check_source(record) == "changed"
+    assert campaign_identity.check_source(dict(record, source="https://docs.google.com/x")) == "unknown"
+
+    reordered = campaign_identity.campaign_record(source, None, None, None, contacts[::-1])
+    assert reordered["contacts_fingerprint"] != record["contacts_fingerprint"]
+
+def test_signatures_side_file_is_keyed_by_fingerprint(tmp_path):
+    contacts = [_contact("6281", 1), _contact("6282", 2)]
+    signatures = campaign_identity.contact_signatures(contacts)
+    record = campaign_identity.campaign_record(None, None, None, "Hi", contacts, signatures)
+    assert "signatures" not in record
+    path = campaign_identity.signatures_file(tmp_path / "progress.json")
+    campaign_identity.save_signatures(path, record, signatures)
+
+    assert campaign_identity.record_signatures(record, path=path) == signatures
+    other = campaign_identity.campaign_record(None, None, None, "Hi", contacts[::-1])
+    assert campaign_identity.load_signatures(path, other) is None
+    assert campaign_identity.record_signatures(other, path=tmp_path / "missing.json") == []
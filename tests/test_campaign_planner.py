@@ -0,0 +1,43 @@
+"""
+Tests for dry-run campaign planning
+"""
+
+from datetime import datetime
+from pathlib import Path
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import campaign_planner
+
+SETTINGS = campaign_planner.ScheduleSettings(
+    base_delay=60, jitter_min=5, jitter_max=15, warmup_count=3, warmup_delay=90,
+    fixed_delay=False, pause_limit=4, auto_resume=True, resume_hours=3, send_seconds=10)
+
+def test_schedule_includes_warmup_jitter_and_pauses():
+    offsets = campaign_planner.simulate_offsets(10, SETTINGS, seed=1)
+    gaps = offsets[1:] - offsets[:-1] - SETTINGS.send_seconds
+    # Messages 1-2 are warm-up, pauses after the 4th and 8th message
+    assert all(60 + 90 + 5 <= g <= 60 + 90 + 15 for g in gaps[:2])
+    assert all(60 + 5 <= g <= 60 + 15 for g in gaps[[2, 4, 5, 6, 8]])
+    assert all(3 * 3600 + 65 <= g <= 3 * 3600 + 75 for g in gaps[[3, 7]])
+
+    fixed = campaign_planner.simulate_offsets(3, SETTINGS._replace(fixed_delay=True, pause_limit=0))
+    assert list(fixed) == [0, 70, 140]
+
+def test_plan_counts_and_speed():
+    contacts = [{"phone": f"62812{i % 90_000:07d}", "name": "A", "original_row": i + 1,
+                 "from_url": i % 10 == 0} for i in range(100_000)]
+    began = time.perf_counter()
+    plan = campaign_planner.plan_campaign(contacts, 100_500, SETTINGS._replace(pause_limit=45),
+                                          start=datetime(2026, 1, 1, 8, 0))
+    assert time.perf_counter() - began < 5
+
+    s = plan.summary
+    assert (s["valid"], s["invalid"], s["duplicates"], s["from_url"]) == (100_000, 500, 10_000, 10_000)
+    assert s["pauses"] == 99_999 // 45
+    assert plan.schedule["planned_at"].is_monotonic_increasing
+    assert s["finish"] > plan.schedule["planned_at"].iloc[-1]
+    assert "Duplicate phones : 10000" in campaign_planner.format_summary(plan)
@@ -0,0 +1,69 @@
+"""
+Tests for incremental source refresh of a running campaign
+"""
+
+from pathlib import Path
+import sys
+
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, campaign_identity, campaign_refresh, contact_cache, data_processor
+
+MAPPING = {"phone": "Phone", "name": "Name", "message": None}
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CONTACT_CACHE_DIR", tmp_path / "cache")
+
+def _write(path, rows):
+    pd.DataFrame(rows, columns=["Phone", "Name"]).to_csv(path, index=False)
+
+def test_refresh_prepares_only_changed_rows(tmp_path, monkeypatch):
+    source = tmp_path / "list.csv"
+    _write(source, [["08123456781", "Budi"], ["08123456782", "Sari"], ["08123456783", "Andi"]])
+    df, digest = contact_cache.load_spreadsheet(source)
+    contacts = data_processor.prepare_contacts(df, MAPPING, "Hi {name}")
+    refresher = campaign_refresh.SourceRefresher(str(source), MAPPING, "Hi {name}", df=df, digest=digest)
+
+    # Nothing changed: no parsing, no preparation
+    assert refresher.refresh().contacts == []
+
+    # One row inserted at the top, one pending row edited, one sent row edited
+    _write(source, [["08123456789", "Dewi"], ["08123456781", "Budi K"],
+                    ["08123456782", "Sari"], ["08123456783", "Andy"]])
+    prepared = []
+    real_prepare = data_processor.prepare_contacts
+    monkeypatch.setattr(data_processor, "prepare_contacts",
+                        lambda sub, *a, **k: prepared.append(len(sub)) or real_prepare(sub, *a, **k))
+    result = refresher.refresh()
+    assert prepared == [3] and result.rows_changed == 3 and result.rows_total == 4
+
+    merged = campaign_refresh.merge_contacts(contacts, 1, result.contacts)
+    assert merged == campaign_refresh.MergeResult(appended=1, updated=1, skipped=1, unchanged=0)
+    assert [c["name"] for c in contacts] == ["Budi", "Sari", "Andy", "Dewi"]
+    assert contacts[-1]["original_row"] == 1
+
+def test_new_row_repeating_a_phone_is_appended(tmp_path):
+    source = tmp_path / "list.csv"
+    _write(source, [["08123456781", "Budi"], ["08123456782", "Sari"]])
+    df, digest = contact_cache.load_spreadsheet(source)
+    contacts = data_processor.prepare_contacts(df, MAPPING, "Hi {name}")
+    refresher = campaign_refresh.SourceRefresher(str(source), MAPPING, "Hi {name}", df=df, digest=digest)
+
+    # Budi was sent; a second order from the same number is added at the bottom
+    _write(source, [["08123456781", "Budi"], ["08123456782", "Sari"], ["08123456781", "Budi (2)"]])
+    result = refresher.refresh()
+    assert result.keys == ["628123456781#1"]
+
+    merged = campaign_refresh.merge_contacts(contacts, 1, result.contacts, result.keys)
+    assert merged == campaign_refresh.MergeResult(appended=1, updated=0, skipped=0, unchanged=0)
+    assert [c["name"] for c in contacts] == ["Budi", "Sari", "Budi (2)"]
+    # The merged list lines up with the identity keys of a fresh preparation
+    df2, _ = contact_cache.load_spreadsheet(source)
+    full = data_processor.prepare_contacts(df2, MAPPING, "Hi {name}")
+    assert ([s.key for s in campaign_identity.contact_signatures(contacts)]
+            == [s.key for s in campaign_identity.contact_signatures(full)])
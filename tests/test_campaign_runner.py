@@ -0,0 +1,162 @@
+"""
+Tests for the shared campaign runner, driven by the local stand-in transport
+"""
+
+from pathlib import Path
+import csv
+import json
+import sys
+import threading
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, campaign_runner, retry_queue
+from src.campaign_planner import ScheduleSettings
+
+def _settings(**overrides):
+    values = dict(base_delay=0, jitter_min=0, jitter_max=0, warmup_count=0, warmup_delay=0,
+                  fixed_delay=True, pause_limit=0, auto_resume=False, resume_hours=0,
+                  send_seconds=0)
+    values.update(overrides)
+    return ScheduleSettings(**values)
+
+def _contacts(count):
+    return [{"phone": f"62812000{i:04d}", "name": f"User {i}", "original_row": i,
+             "message": f"Hi {i}"} for i in range(1, count + 1)]
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RESULTS_DIR", tmp_path / "results")
+
+def _runner(tmp_path, contacts, transport, settings=None, **kwargs):
+    store = campaign_runner.JsonProgressStore(tmp_path / "progress.json",
+                                              extra=lambda: {"contacts": contacts})
+    runner = campaign_runner.CampaignRunner(
+        contacts, transport, settings or _settings(), store,
+        retries=retry_queue.RetryQueue(retry_delay=0), **kwargs)
+    events = []
+    runner.subscribe(events.append)
+    return runner, store, events
+
+def test_sends_in_order_retries_transient_and_clears_progress(tmp_path):
+    contacts = _contacts(4)
+    calls = {}
+
+    def outcome(contact):
+        row = contact["original_row"]
+        calls[row] = calls.get(row, 0) + 1
+        if row == 2 and calls[row] == 1:
+            return retry_queue.TIMEOUT
+        return retry_queue.INVALID_NUMBER if row == 3 else retry_queue.SENT
+
+    transport = campaign_runner.LocalTransport(outcome)
+    runner, store, events = _runner(tmp_path, contacts, transport)
+    finished = runner.run()
+
+    assert finished.completed and (finished.success, finished.failed) == (3, 1)
+    assert [m["message"] for m in transport.sent] == ["Hi 1", "Hi 4", "Hi 2"]
+    assert [f["reason"] for f in runner.failed_contacts] == ["Invalid number"]
+    assert not store.path.exists()
+
+    kinds = [type(e).__name__ for e in events]
+    assert kinds[0] == "Started" and kinds[-1] == "Finished"
+    assert "RetryPass" in kinds
+    queued = [e for e in events if isinstance(e, campaign_runner.Failed)]
+    assert [(e.contact["original_row"], e.queued) for e in queued] == [(2, True), (3, False)]
+
+    rows = list(csv.DictReader(open(finished.results_path, newline="", encoding="utf-8")))
+    assert [(r["original_row"], r["attempt"], r["status"], r["confirmation"]) for r in rows] == [
+        ("1", "1", "sent", "confirmed"), ("2", "1", "timeout", ""),
+        ("3", "1", "invalid_number", ""), ("4", "1", "sent", "confirmed"),
+        ("2", "2", "sent", "confirmed")]
+    assert finished.confirmations == {"confirmed": 3, "pending": 0, "unconfirmed": 0}
+
+def test_auto_pause_then_auto_resume(tmp_path):
+    contacts = _contacts(3)
+    settings = _settings(pause_limit=2, auto_resume=True, resume_hours=0.5 / 3600)
+    runner, _, events = _runner(tmp_path, contacts, campaign_runner.LocalTransport(), settings)
+    assert runner.run().completed
+
+    paused = [e for e in events if isinstance(e, campaign_runner.Paused)]
+    assert [(e.reason, e.resume_in) for e in paused] == [("auto", 0.5)]
+    assert [e.reason for e in events if isinstance(e, campaign_runner.Resumed)] == ["auto"]
+    assert any(isinstance(e, campaign_runner.Countdown) and e.phase == "auto_resume" for e in events)
+
+def test_retry_pass_honours_the_pause_limit(tmp_path):
+    contacts = _contacts(3)
+    tried = set()
+
+    def outcome(contact):
+        row = contact["original_row"]
+        first = row not in tried
+        tried.add(row)
+        return retry_queue.TIMEOUT if first else retry_queue.SENT
+
+    settings = _settings(pause_limit=2, auto_resume=True, resume_hours=0.2 / 3600)
+    runner, _, events = _runner(tmp_path, contacts, campaign_runner.LocalTransport(outcome), settings)
+    assert runner.run().success == 3
+
+    # Every send was a retry: the third one waits for the auto-pause
+    order = [type(e).__name__ for e in events if isinstance(e, (campaign_runner.Sent,
+                                                                 campaign_runner.Paused))]
+    assert order == ["Sent", "Sent", "Paused", "Sent"]
+    assert runner.batch_sent == 1
+
+def test_retry_that_raises_stays_in_the_saved_queue(tmp_path):
+    contacts = _contacts(2)
+    tried = set()
+
+    def outcome(contact):
+        row = contact["original_row"]
+        if row in tried:
+            raise RuntimeError("session lost")
+        tried.add(row)
+        return retry_queue.TIMEOUT if row == 2 else retry_queue.SENT
+
+    runner, store, _ = _runner(tmp_path, contacts, campaign_runner.LocalTransport(outcome))
+    with pytest.raises(RuntimeError):
+        runner.run()
+    saved = json.loads(store.path.read_text(encoding="utf-8"))
+    assert [e["contact"]["original_row"] for e in saved["retry_queue"]] == [2]
+    assert saved["failed_contacts"] == []
+
+def test_stop_while_paused_keeps_progress(tmp_path):
+    contacts = _contacts(5)
+    settings = _settings(pause_limit=2)
+    runner, store, events = _runner(tmp_path, contacts, campaign_runner.LocalTransport(), settings)
+
+    def stop_when_paused(event):
+        if isinstance(event, campaign_runner.Paused):
+            threading.Timer(0.1, runner.stop).start()
+    runner.subscribe(stop_when_paused)
+    finished = runner.run()
+
+    assert not finished.completed and finished.success == 2
+    saved = json.loads(store.path.read_text(encoding="utf-8"))
+    assert saved["current_index"] == 2 and saved["success_count"] == 2
+    assert saved["results_file"] == str(finished.results_path)
+    assert len(saved["contacts"]) == 5
+
+def test_pause_from_another_thread_is_handled_on_the_runner_thread(tmp_path):
+    contacts = _contacts(3)
+    runner, store, events = _runner(tmp_path, contacts, campaign_runner.LocalTransport())
+    threads = set()
+    runner.subscribe(lambda event: threads.add(threading.get_ident()))
+
+    def pause_and_resume(event):
+        # Paused and resumed (e.g. from the Tk thread) before the runner's next check
+        if isinstance(event, campaign_runner.Sent) and event.number == 1:
+            other = threading.Thread(target=lambda: (runner.pause(), runner.resume()))
+            other.start()
+            other.join()
+    runner.subscribe(pause_and_resume)
+    assert runner.run().completed
+
+    assert threads == {threading.get_ident()}
+    kinds = [type(e).__name__ for e in events]
+    assert kinds.count("Paused") == kinds.count("Resumed") == 1
+    assert kinds.index("Paused") == kinds.index("Sent") + 1
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,45 @@
+"""
+Tests for header + content-sampling column detection
+"""
+
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import column_detector, data_processor
+
+def test_short_patterns_need_whole_words():
+    """'hp' matches "No. HP" but not "Shipping"; long patterns may sit inside a word"""
+    patterns = ['phone', 'hp', 'wa']
+    assert column_detector.header_score("No. HP", patterns) == 1.0
+    assert column_detector.header_score("nomor_wa", patterns) == 1.0
+    assert column_detector.header_score("Shipping", patterns) == 0.0
+    assert column_detector.header_score("Software", patterns) == 0.0
+    assert column_detector.header_score("PhoneNumber", patterns) == 1.0
+    assert column_detector.header_score("customerphone", patterns) == 0.6
+
+def test_content_decides_between_columns():
+    """Values outrank misleading headers and unnamed columns are still found"""
+    df = pd.DataFrame({
+        "Shipping": ["JNE", "J&T", "SiCepat"] * 4,
+        "Kolom A": ["https://wa.me/628123456789?text=Halo", "0812-3456-7890", "+62 813 1111 2222"] * 4,
+        "Customer": ["Budi Santoso", "Sari", "Andi Wijaya"] * 4,
+        "Catatan": ["Halo kak, promo minggu ini diskon besar", "Terima kasih sudah order ya",
+                    "Pesanan kakak sedang dikirim hari ini"] * 4,
+        "Order ID": [1001, 1002, 1003] * 4,
+    })
+    ranked = column_detector.rank_columns(df)
+    assert ranked["phone"][0].column == "Kolom A"
+    assert all(c.column != "Shipping" for c in ranked["phone"])
+
+    assert data_processor.detect_columns(df) == {
+        "phone": "Kolom A", "name": "Customer", "message": "Catatan"}
+
+def test_sample_is_bounded():
+    df = pd.DataFrame({"Phone": ["08123456789"] * 20000})
+    assert len(column_detector.sample_values(df, sample_size=300)) == 300
+    assert column_detector.rank_columns(df, sample_size=300)["phone"][0].confidence == 1.0
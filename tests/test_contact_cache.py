@@ -0,0 +1,93 @@
+"""
+Tests for the parsed-file / prepared-contact cache
+"""
+
+from pathlib import Path
+import sys
+
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, contact_cache, data_processor, templates
+
+MAPPING = {"phone": "Phone", "name": "Name", "message": None}
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CONTACT_CACHE_DIR", tmp_path / "cache")
+    path = tmp_path / "contacts.csv"
+    pd.DataFrame({
+        "Phone": ["08123456789", "https://wa.me/628111222333?text=Halo%20kak", "bad"],
+        "Name": ["Budi", "Sari", "Andi"],
+        "Kota": ["Bandung", "Medan", "Solo"],
+    }).to_csv(path, index=False)
+    return path
+
+def test_unchanged_file_is_served_from_cache(source, monkeypatch):
+    """Second open skips parsing and preparation and returns identical contacts"""
+    df, digest = contact_cache.load_spreadsheet(source)
+    fresh = contact_cache.prepare_contacts(df, MAPPING, "Hi {name} dari {kota}", digest)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("cache miss")
+    monkeypatch.setattr(data_processor, "process_spreadsheet", _fail)
+    monkeypatch.setattr(data_processor, "prepare_contacts", _fail)
+    templates._REGISTRY.clear()
+
+    df2, digest2 = contact_cache.load_spreadsheet(source)
+    cached = contact_cache.prepare_contacts(df2, MAPPING, "Hi {name} dari {kota}", digest2)
+    assert df2.equals(df)
+    assert cached == fresh
+    assert templates.render_message(cached[0]) == "Hi Budi dari Bandung"
+
+def test_key_changes_with_inputs_and_clear_empties_cache(source):
+    df, digest = contact_cache.load_spreadsheet(source)
+    key = contact_cache.contacts_key(digest, MAPPING, "Hi")
+    assert key != contact_cache.contacts_key(digest, MAPPING, "Halo")
+    assert key != contact_cache.contacts_key(digest, dict(MAPPING, name=None), "Hi")
+
+    source.write_text(source.read_text() + "08129999888,Dewi,Bogor\n")
+    df2, digest2 = contact_cache.load_spreadsheet(source)
+    assert digest2 != digest and len(df2) == len(df) + 1
+
+    assert contact_cache.cache_size() > 0
+    contact_cache.clear()
+    assert contact_cache.cache_size() == 0
+
+def test_eviction_drops_least_recently_used(source):
+    df, digest = contact_cache.load_spreadsheet(source)
+    contact_cache.prepare_contacts(df, MAPPING, "Hi", digest)
+    frame_entry = contact_cache.frame_key(digest)
+
+    contact_cache.evict(max_bytes=contact_cache.cache_size() - 1)
+    remaining = {p.stem for p in config.CONTACT_CACHE_DIR.iterdir()}
+    assert frame_entry not in remaining
+    assert len(remaining) == 1
+
+def test_feather_round_trip(source):
+    pytest.importorskip("pyarrow")
+    df, digest = contact_cache.load_spreadsheet(source)
+    contacts = contact_cache.prepare_contacts(df, MAPPING, "Hi {name}", digest)
+    names = {p.name for p in config.CONTACT_CACHE_DIR.iterdir()}
+    assert f"{contact_cache.frame_key(digest)}.feather" in names
+    assert not any(name.endswith(".pkl") for name in names)
+
+    cached_df, _ = contact_cache._read_frame(contact_cache.frame_key(digest))
+    assert cached_df.equals(df) and cached_df.loc[0, "Phone"] == "08123456789"
+    key = contact_cache.contacts_key(digest, MAPPING, "Hi {name}")
+    frame, _ = contact_cache._read_frame(key)
+    assert contact_cache.frame_to_contacts(frame) == contacts
+
+def test_entry_over_the_limit_does_not_evict_itself(source, monkeypatch):
+    monkeypatch.setattr(config, "CONTACT_CACHE_MAX_MB", 0)
+    df, digest = contact_cache.load_spreadsheet(source)
+    frame_entry = contact_cache.frame_key(digest)
+    assert contact_cache._read_frame(frame_entry) is not None
+
+    # The next write keeps only itself
+    contact_cache.prepare_contacts(df, MAPPING, "Hi", digest)
+    remaining = {p.stem for p in config.CONTACT_CACHE_DIR.iterdir()}
+    assert remaining == {contact_cache.contacts_key(digest, MAPPING, "Hi")}
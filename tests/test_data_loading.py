@@ -0,0 +1,97 @@
+"""
+Tests for background-friendly spreadsheet loading and contact preparation
+"""
+
+import threading
+from pathlib import Path
+import sys
+
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, data_processor
+from src.background import TaskCancelled
+
+@pytest.fixture
+def contacts_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "LOAD_CHUNK_ROWS", 100)
+    monkeypatch.setattr(config, "PROGRESS_REPORT_ROWS", 50)
+    path = tmp_path / "contacts.csv"
+    pd.DataFrame({
+        "Phone": [f"0812{i:07d}" for i in range(250)],
+        "Name": [f"User {i}" for i in range(250)],
+    }).to_csv(path, index=False)
+    return path
+
+def test_chunked_load_reports_rows(contacts_csv, monkeypatch):
+    """Chunked reading gives the same frame as a plain read and reports rows"""
+    monkeypatch.setattr(data_processor, "_has_pyarrow", lambda: False)
+    seen = []
+    df = data_processor.process_spreadsheet(
+        contacts_csv, progress=lambda done, total: seen.append((done, total)))
+
+    assert df.equals(data_processor.process_spreadsheet(contacts_csv))
+    assert seen == [(100, None), (200, None), (250, None), (250, 250)]
+
+    prepared = []
+    contacts = data_processor.prepare_contacts(
+        df, {"phone": "Phone", "name": "Name"}, "Hi {name}",
+        progress=lambda done, total: prepared.append((done, total)))
+    assert len(contacts) == 250
+    assert prepared == [(0, 250), (50, 250), (100, 250), (150, 250), (200, 250), (250, 250)]
+
+def test_pyarrow_load_reports_blocks_and_can_be_cancelled(contacts_csv, monkeypatch):
+    """The pyarrow reader streams blocks too and keeps phones as text"""
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(config, "LOAD_BLOCK_BYTES", 1024)
+    seen = []
+    df = data_processor.process_spreadsheet(
+        contacts_csv, progress=lambda done, total: seen.append((done, total)))
+
+    assert df.equals(pd.read_csv(contacts_csv, dtype=str))
+    assert df.loc[0, "Phone"] == "08120000000"
+    assert len(seen) > 3 and seen[-2:] == [(250, None), (250, 250)]
+    assert [done for done, _ in seen] == sorted(done for done, _ in seen)
+
+    cancel = threading.Event()
+
+    def cancel_midway(done, total):
+        if done >= 100:
+            cancel.set()
+    with pytest.raises(TaskCancelled):
+        data_processor.read_csv_file(contacts_csv, progress=cancel_midway, cancel_event=cancel)
+
+def test_cancel_stops_load_and_preparation(contacts_csv):
+    """A set cancel event aborts both stages with TaskCancelled"""
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(TaskCancelled):
+        data_processor.process_spreadsheet(contacts_csv, cancel_event=cancel)
+
+    df = data_processor.process_spreadsheet(contacts_csv)
+    with pytest.raises(TaskCancelled):
+        data_processor.prepare_contacts(
+            df, {"phone": "Phone"}, "Hi", cancel_event=cancel)
+
+def test_semicolon_cp1252_csv_keeps_phones_as_text(tmp_path):
+    """Indonesian-locale Excel exports: ';' delimiter, cp1252, numeric-looking phones"""
+    path = tmp_path / "excel_id.csv"
+    path.write_bytes("Nama;Telepon;Saldo\nJosé;081234567890;1.500,50\nAni;628123456789;\n".encode("cp1252"))
+
+    assert data_processor.sniff_csv(path) == ("cp1252", ";")
+    df = data_processor.process_spreadsheet(path)
+    assert list(df["Telepon"]) == ["081234567890", "628123456789"]
+    assert df.loc[0, "Nama"] == "José" and df.loc[0, "Saldo"] == "1.500,50"
+    assert pd.isna(df.loc[1, "Saldo"])
+
+    chunked = data_processor.process_spreadsheet(path, progress=lambda done, total: None)
+    assert chunked.equals(df)
+
+def test_sniff_handles_bom_and_tabs(tmp_path):
+    path = tmp_path / "tabs.csv"
+    path.write_bytes(b"\xef\xbb\xbfPhone\tName\n0812345678\tBudi\n")
+    assert data_processor.sniff_csv(path) == ("utf-8-sig", "\t")
+    assert list(data_processor.read_csv_file(path).columns) == ["Phone", "Name"]
@@ -0,0 +1,70 @@
+"""
+Tests for the driver watchdog (fake drivers, no Chrome)
+"""
+
+from pathlib import Path
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, driver_watchdog, retry_queue
+
+class FakeDriver:
+    def __init__(self, alive=True):
+        self.alive = alive
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("invalid session id")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+@pytest.fixture(autouse=True)
+def _fast(monkeypatch):
+    monkeypatch.setattr(config, "RETRY_DELAY", 0)
+    monkeypatch.setattr(config, "WATCHDOG_PROBE_TIMEOUT", 1)
+
+def _send(driver, contact):
+    return retry_queue.SENT if driver.alive else retry_queue.DRIVER_ERROR
+
+def test_dead_session_is_relaunched_and_contact_resent():
+    old = FakeDriver(alive=False)
+    launched, loaded, recovered = [], [], []
+    watchdog = driver_watchdog.DriverWatchdog(
+        old, lambda: launched.append(FakeDriver()) or launched[-1], loaded.append,
+        on_recovered=recovered.append)
+
+    assert watchdog.send(_send, {"phone": "1"}) == retry_queue.SENT
+    assert old.quit_called
+    assert watchdog.driver is launched[0] and loaded == [launched[0]]
+    assert watchdog.recoveries == 1 and len(recovered) == 1
+
+def test_errors_on_live_session_recover_after_threshold(monkeypatch):
+    monkeypatch.setattr(config, "WATCHDOG_MAX_DRIVER_ERRORS", 2)
+    watchdog = driver_watchdog.DriverWatchdog(FakeDriver(), FakeDriver, lambda d: None)
+    outcomes = [retry_queue.DRIVER_ERROR, retry_queue.DRIVER_ERROR, retry_queue.SENT]
+    send = lambda driver, contact: outcomes.pop(0)
+
+    assert watchdog.send(send, {}) == retry_queue.DRIVER_ERROR
+    assert watchdog.recoveries == 0
+    assert watchdog.send(send, {}) == retry_queue.SENT
+    assert watchdog.recoveries == 1
+
+def test_failed_relaunch_raises_after_attempts(monkeypatch):
+    monkeypatch.setattr(config, "WATCHDOG_MAX_RELAUNCHES", 2)
+    attempts = []
+
+    def launch():
+        attempts.append(1)
+        raise RuntimeError("profile in use")
+
+    watchdog = driver_watchdog.DriverWatchdog(FakeDriver(alive=False), launch, lambda d: None)
+    with pytest.raises(RuntimeError):
+        watchdog.send(_send, {})
+    assert len(attempts) == 2
@@ -0,0 +1,44 @@
+"""
+Tests for the live ETA estimator
+"""
+
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import campaign_planner, eta
+
+SETTINGS = campaign_planner.ScheduleSettings(
+    base_delay=60, jitter_min=5, jitter_max=15, warmup_count=3, warmup_delay=90,
+    fixed_delay=False, pause_limit=4, auto_resume=True, resume_hours=3, send_seconds=10)
+
+def test_estimate_matches_simulated_schedule():
+    """Before any measurement the ETA equals the dry-run plan's expected duration"""
+    estimator = eta.EtaEstimator(SETTINGS)
+    offsets = campaign_planner.simulate_offsets(
+        10, SETTINGS._replace(jitter_min=10, jitter_max=10))
+    estimate = estimator.estimate(10, 1)
+    assert estimate.seconds == offsets[-1] + SETTINGS.send_seconds
+    assert estimate.low < estimate.seconds < estimate.high
+
+    # Mid-batch: one pause left within the next 5 sends, and the current wait counts
+    assert estimator.pause_windows(5, batch_sent=2) == 1
+    assert estimator.pause_windows(5, batch_sent=4) == 1
+    assert estimator.pause_windows(1, batch_sent=3) == 0
+    assert estimator.estimate(2, 9, wait_left=30).seconds == 30 + 2 * 10 + 70
+
+def test_moving_average_follows_measured_send_time():
+    estimator = eta.EtaEstimator(SETTINGS._replace(pause_limit=0), smoothing=0.5)
+    for _ in range(20):
+        estimator.observe(30.0)
+    assert abs(estimator.send_mean - 30.0) < 1e-9
+    steady = estimator.estimate(100, 50)
+    assert abs(steady.seconds - (100 * 30 + 99 * 70)) < 1e-6
+    # Constant measurements leave only the jitter in the range
+    assert steady.high - steady.seconds < 100
+
+    estimator.observe(60.0)
+    assert estimator.send_mean == 45.0
+    assert "left" in eta.describe(estimator.estimate(100, 50))
@@ -0,0 +1,54 @@
+"""
+Tests for the structured event log (rotation, subscribers) and its analysis
+"""
+
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, campaign_runner, event_analysis, event_log, retry_queue
+from src.campaign_planner import ScheduleSettings
+
+def test_campaign_records_rotate_and_summarize(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RESULTS_DIR", tmp_path / "results")
+    path = tmp_path / "events" / "campaign_events.jsonl"
+    log = event_log.EventLog(path, max_bytes=2048, backups=10, enabled=True)
+    seen = []
+    log.subscribe(lambda record: seen.append(record["kind"]))
+
+    contacts = [{"phone": f"628120000{i:02d}", "name": f"User {i}", "original_row": i,
+                 "message": f"Hi {i}"} for i in range(1, 11)]
+    transport = campaign_runner.LocalTransport(
+        lambda c: retry_queue.INVALID_NUMBER if c["original_row"] % 5 == 0 else retry_queue.SENT)
+    settings = ScheduleSettings(base_delay=0, jitter_min=0, jitter_max=0, warmup_count=0,
+                                warmup_delay=0, fixed_delay=True, pause_limit=0,
+                                auto_resume=False, resume_hours=0, send_seconds=0)
+    runner = campaign_runner.CampaignRunner(contacts, transport, settings,
+                                            retries=retry_queue.RetryQueue(retry_delay=0))
+    log.emit(event_log.LOAD, source="list.csv", rows=10, columns=3)
+    log.attach(runner)
+    runner.run()
+    log.emit(event_log.DRIVER_RESTART, reason="test", seconds=1.0, restarts=1)
+    log.close()
+
+    files = event_log.rotated_files(path)
+    assert len(files) > 1 and files[-1] == path
+    assert all(f.stat().st_size <= 2048 for f in files)
+    records = list(event_analysis.read_records(files))
+    assert [r["kind"] for r in records] == seen
+    assert seen[0] == event_log.LOAD and seen[-2:] == [event_log.CAMPAIGN_END,
+                                                        event_log.DRIVER_RESTART]
+
+    summary = event_analysis.summarize(records)
+    assert (summary["runs"], summary["attempts"], summary["sent"], summary["failed"]) == (1, 10, 8, 2)
+    assert summary["failure_classes"] == {"invalid_number": 2} == summary["final_failures"]
+    assert summary["restarts"] == 1
+    assert summary["latency"]["send"]["count"] == 10
+    assert "Invalid number" in event_analysis.format_summary(summary)
+
+def test_percentile_interpolates():
+    assert event_analysis.percentile([4, 1, 3, 2], 50) == 2.5
+    assert event_analysis.percentile([1, 2, 3, 4, 5], 90) == 4.6
+    assert event_analysis.percentile([], 99) == 0.0
@@ -0,0 +1,56 @@
+"""
+Tests for the Prometheus metrics endpoint, fed by a local campaign
+"""
+
+from pathlib import Path
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, campaign_runner, metrics_server, retry_queue
+from src.campaign_planner import ScheduleSettings
+
+def _run_campaign(metrics):
+    contacts = [{"phone": f"6281200000{i}", "name": f"User {i}", "original_row": i,
+                 "message": f"Hi {i}"} for i in range(1, 4)]
+    transport = campaign_runner.LocalTransport(
+        lambda c: retry_queue.INVALID_NUMBER if c["original_row"] == 2 else retry_queue.SENT,
+        send_seconds=0.05)
+    settings = ScheduleSettings(base_delay=0, jitter_min=0, jitter_max=0, warmup_count=0,
+                                warmup_delay=0, fixed_delay=True, pause_limit=0,
+                                auto_resume=False, resume_hours=0, send_seconds=0)
+    runner = campaign_runner.CampaignRunner(contacts, transport, settings,
+                                            retries=retry_queue.RetryQueue(retry_delay=0))
+    metrics.attach(runner)
+    runner.run()
+
+def test_campaign_is_exposed_in_prometheus_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RESULTS_DIR", tmp_path / "results")
+    metrics = metrics_server.CampaignMetrics(buckets=(0.01, 0.1))
+    server = metrics_server.MetricsServer(metrics, port=0).start()
+    try:
+        _run_campaign(metrics)
+        with urllib.request.urlopen(server.url, timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            text = response.read().decode("utf-8")
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(server.url.replace("/metrics", "/other"), timeout=5)
+    finally:
+        server.stop()
+
+    lines = set(text.splitlines())
+    assert "velo_messages_sent_total 2" in lines
+    assert "velo_messages_failed_total 1" in lines
+    assert 'velo_send_attempts_total{outcome="invalid_number"} 1' in lines
+    assert 'velo_send_confirmations_total{state="confirmed"} 2' in lines
+    assert 'velo_send_stage_seconds_bucket{stage="send",le="0.01"} 0' in lines
+    assert 'velo_send_stage_seconds_bucket{stage="send",le="0.1"} 3' in lines
+    assert 'velo_send_stage_seconds_bucket{stage="send",le="+Inf"} 3' in lines
+    assert 'velo_send_stage_seconds_count{stage="confirm"} 2' in lines
+    assert {"velo_queue_remaining 0", "velo_campaign_running 0", "velo_campaign_paused 0"} <= lines
+    assert "# TYPE velo_send_stage_seconds histogram" in lines
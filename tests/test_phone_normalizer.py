@@ -0,0 +1,39 @@
+"""
+Tests for the table-driven multi-country phone normalizer
+"""
+
+import pandas as pd
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import data_processor, phone_normalizer
+
+def test_home_country_formats():
+    """Indonesian local, international and link formats normalize alike"""
+    for raw in ['08123456789', '8123456789', '628123456789', '+62 812-3456-789',
+                '+62 0812 3456 789', 'https://wa.me/628123456789']:
+        assert data_processor.clean_number(raw) == '628123456789', raw
+
+def test_foreign_numbers_are_not_corrupted():
+    """Numbers with another calling code keep it instead of gaining a 62 prefix"""
+    assert phone_normalizer.normalize('+60 12-345 6789') == ('60123456789', 'MY:international')
+    assert phone_normalizer.normalize('+1 415 555 2671') == ('14155552671', 'US:international')
+    assert phone_normalizer.normalize('60123456789') == ('60123456789', 'MY:international')
+
+def test_local_number_starting_with_62():
+    """A local number that happens to start with 62 is not mistaken for +62"""
+    assert phone_normalizer.normalize('6212345678') == ('626212345678', 'ID:national')
+
+def test_normalize_series_and_report():
+    """Batch API matches the scalar API and reports which rule each number hit"""
+    raw = pd.Series(['08123456789', None, '+44 7911 123456', '08123456789', '123'])
+    result = phone_normalizer.normalize_series(raw)
+
+    assert result['phone'].tolist() == ['628123456789', None, '447911123456', '628123456789', None]
+    for idx, value in raw.dropna().items():
+        assert phone_normalizer.normalize(value) == tuple(result.loc[idx, ['phone', 'rule']])
+    assert phone_normalizer.rule_report(result) == {
+        'ID:trunk': 2, 'invalid:empty': 1, 'GB:international': 1, 'invalid:length': 1}
@@ -0,0 +1,69 @@
+"""
+Tests for the preview grid's scroll math, page cache and cell formatting
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from types import SimpleNamespace
+import sys
+
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("tkinter")
+
+from src import config
+from src.preview_grid import PreviewGrid
+
+def _grid(df=None, page_rows=2, max_chars=6):
+    """Just the state _page/_format use, without creating a Tk window"""
+    grid = SimpleNamespace(_df=df, page_rows=page_rows, _pages=OrderedDict(),
+                           _max_chars=max_chars)
+    grid._format = lambda value: PreviewGrid._format(grid, value)
+    return grid
+
+def test_apply_view_clamps_to_the_scrollable_range():
+    view = PreviewGrid._apply_view
+    assert view((), 40, 1000, 200, 24) == 40
+    assert view(("moveto", "0.5"), 0, 1000, 200, 24) == 500
+    assert view(("moveto", "1.0"), 0, 1000, 200, 24) == 800
+    assert view(("moveto", "-0.2"), 300, 1000, 200, 24) == 0
+    assert view(("scroll", "2", "units"), 100, 1000, 200, 24) == 148
+    assert view(("scroll", "1", "pages"), 100, 1000, 200, 24) == 276
+    assert view(("scroll", "-5", "units"), 24, 1000, 200, 24) == 0
+    assert view(("scroll", "3", "pages"), 700, 1000, 200, 24) == 800
+    assert view(("moveto", "0.7"), 0, 100, 200, 24) == 0       # content smaller than the view
+
+def test_fractions_describe_the_visible_slice():
+    assert PreviewGrid._fractions(0, 200, 0) == (0.0, 1.0)
+    assert PreviewGrid._fractions(0, 200, 800) == (0.0, 0.25)
+    assert PreviewGrid._fractions(600, 200, 800) == (0.75, 1.0)
+    assert PreviewGrid._fractions(0, 200, 100) == (0.0, 1.0)
+
+def test_page_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(config, "PREVIEW_CACHED_PAGES", 3)
+    grid = _grid(pd.DataFrame({"Phone": [f"0812{i}" for i in range(10)], "Row": range(10)}))
+    assert PreviewGrid._page(grid, 1) == [["08122", "2"], ["08123", "3"]]
+    PreviewGrid._page(grid, 0)
+    PreviewGrid._page(grid, 2)
+    page = PreviewGrid._page(grid, 1)                 # hit: moves page 1 to the end
+    assert PreviewGrid._page(grid, 1) is page
+    PreviewGrid._page(grid, 3)
+    assert list(grid._pages) == [2, 1, 3]
+    assert PreviewGrid._page(grid, 4) == [["08128", "8"], ["08129", "9"]]
+    assert list(grid._pages) == [1, 3, 4]
+
+def test_format_blanks_missing_values_and_truncates():
+    grid = _grid(max_chars=6)
+    assert PreviewGrid._format(grid, None) == ""
+    assert PreviewGrid._format(grid, float("nan")) == ""
+    assert PreviewGrid._format(grid, pd.NaT) == ""
+    assert PreviewGrid._format(grid, "nan") == "nan"
+    assert PreviewGrid._format(grid, "a\nb") == "a b"
+    assert PreviewGrid._format(grid, "abcdef") == "abcdef"
+    assert PreviewGrid._format(grid, "abcdefg") == "abcde…"
+    assert PreviewGrid._format(grid, 1234567) == "12345…"
+    assert PreviewGrid._format(_grid(max_chars=1), "Budi") == "B…"   # keeps one character
@@ -0,0 +1,62 @@
+"""
+Tests for browser profile measuring and cache pruning
+"""
+
+from pathlib import Path
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import profile_maintenance
+
+def _write(path: Path, size: int):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+
+def _profile(tmp_path) -> Path:
+    profile = tmp_path / "whatsapp_session"
+    _write(profile / "Default" / "Cache" / "Cache_Data" / "f_000001", 4000)
+    _write(profile / "Default" / "Code Cache" / "js" / "index", 3000)
+    _write(profile / "Default" / "Service Worker" / "ScriptCache" / "0001", 2000)
+    _write(profile / "GrShaderCache" / "data_0", 1000)
+    # Login state
+    _write(profile / "Default" / "IndexedDB" / "https_web.whatsapp.com_0.indexeddb.leveldb" / "000003.log", 500)
+    _write(profile / "Default" / "Local Storage" / "leveldb" / "CURRENT", 16)
+    _write(profile / "Default" / "Service Worker" / "Database" / "CURRENT", 16)
+    return profile
+
+def test_prune_frees_caches_and_keeps_login_state(tmp_path):
+    profile = _profile(tmp_path)
+    assert profile_maintenance.cache_size(profile) == 10000
+    assert profile_maintenance.profile_size(profile) == 10532
+    assert "cache 0 MB" in profile_maintenance.describe(profile)
+
+    assert profile_maintenance.maybe_prune(profile, min_bytes=20000) is None
+    result = profile_maintenance.prune(profile)
+    assert result.freed_bytes == 10000 and len(result.removed) == 4
+    assert result.skipped_reason is None
+    assert profile_maintenance.profile_size(profile) == 532
+    assert (profile / "Default" / "IndexedDB").is_dir()
+    assert (profile / "Default" / "Service Worker" / "Database" / "CURRENT").exists()
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt", reason="POSIX lock symlink")
+def test_prune_refused_while_chrome_holds_the_profile(tmp_path):
+    profile = _profile(tmp_path)
+    lock = profile / "SingletonLock"
+    os.symlink(f"{socket.gethostname()}-{os.getpid()}", lock)
+    result = profile_maintenance.prune(profile)
+    assert result.freed_bytes == 0 and result.skipped_reason
+    assert profile_maintenance.cache_size(profile) == 10000
+
+    # Stale lock left by a crashed Chrome
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    lock.unlink()
+    os.symlink(f"{socket.gethostname()}-{exited.pid}", lock)
+    assert profile_maintenance.maybe_prune(profile, min_bytes=1).freed_bytes == 10000
@@ -0,0 +1,54 @@
+"""
+Tests for opt-in profiling (cProfile + tracemalloc sections)
+"""
+
+from pathlib import Path
+import sys
+import threading
+import tracemalloc
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import profiling
+
+def test_disabled_profiler_is_a_no_op(tmp_path):
+    profiler = profiling.Profiler(root=tmp_path / "diag")
+    with profiler.section("load"):
+        pass
+    assert profiler.section("load") is profiler.section("campaign")
+    assert profiler.directory is None and not (tmp_path / "diag").exists()
+
+def test_enabled_profiler_writes_stats_and_allocations(tmp_path):
+    profiler = profiling.Profiler(enabled=True, root=tmp_path / "diag")
+    for _ in range(2):
+        with profiler.section("load"):
+            rows = [str(i) * 10 for i in range(5000)]
+    assert rows
+    names = sorted(p.name for p in profiler.directory.iterdir())
+    assert names == ["load.prof", "load_2.prof", "load_2_alloc.txt", "load_alloc.txt"]
+    report = (profiler.directory / "load_alloc.txt").read_text(encoding="utf-8")
+    assert report.startswith("load: traced memory") and "allocation growth" in report
+
+def test_overlapping_sections_on_two_threads_share_tracing(tmp_path):
+    profiler = profiling.Profiler(enabled=True, root=tmp_path / "diag")
+    entered, first_done, errors = threading.Event(), threading.Event(), []
+
+    def campaign():
+        try:
+            with profiler.section("campaign"):
+                entered.set()
+                first_done.wait(5)
+        except Exception as e:
+            errors.append(e)
+
+    worker = threading.Thread(target=campaign)
+    with profiler.section("load"):
+        worker.start()
+        assert entered.wait(5)
+    # "load" started tracing and ended first; "campaign" is still open
+    assert tracemalloc.is_tracing()
+    first_done.set()
+    worker.join(5)
+    assert not errors and not tracemalloc.is_tracing()
+    assert (profiler.directory / "campaign_alloc.txt").exists()
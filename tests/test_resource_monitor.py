@@ -0,0 +1,52 @@
+"""
+Tests for the browser resource monitor (samples this test process's tree)
+"""
+
+from pathlib import Path
+from types import SimpleNamespace
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, resource_monitor
+
+pytestmark = pytest.mark.skipif(not resource_monitor.PROC.is_dir(), reason="needs /proc")
+
+def _fake_driver(pid):
+    return SimpleNamespace(service=SimpleNamespace(process=SimpleNamespace(pid=pid)))
+
+def test_samples_process_tree_and_flags_recycle(monkeypatch):
+    child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    try:
+        assert child.pid in resource_monitor.process_tree(os.getpid())
+
+        monitor = resource_monitor.ResourceMonitor(lambda: _fake_driver(os.getpid()), history=2)
+        first = monitor.sample()
+        sum(range(2_000_000))  # burn a little CPU between samples
+        second = monitor.sample()
+        assert second.processes >= 2
+        assert second.rss_bytes > first.rss_bytes * 0.5 > 0
+        assert second.handles > 0 and second.cpu_percent >= 0
+        assert "MB" in resource_monitor.describe(second)
+
+        monkeypatch.setattr(config, "RECYCLE_RSS_MB", 1_000_000)
+        monkeypatch.setattr(config, "RECYCLE_HANDLES", 0)
+        assert monitor.recycle_reason() is None
+        monkeypatch.setattr(config, "RECYCLE_RSS_MB", 1)
+        assert "memory" in monitor.recycle_reason()
+
+        monitor.sample()
+        assert len(monitor.samples) == 2
+    finally:
+        child.kill()
+        child.wait()
+
+def test_unreadable_driver_gives_no_sample():
+    monitor = resource_monitor.ResourceMonitor(lambda: None)
+    assert monitor.sample() is None
+    assert monitor.recycle_reason() is None
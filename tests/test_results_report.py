@@ -0,0 +1,98 @@
+"""
+Tests for the streaming results CSV and the annotated spreadsheet write-back
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+import csv
+import sys
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import data_processor, results_report, retry_queue
+
+START = datetime(2026, 1, 5, 9, 0, 0)
+
+def _contact(row, phone):
+    return {"phone": phone, "name": f"User {row}", "original_row": row}
+
+def _record(writer, contact, outcome, seconds=4):
+    writer.record(contact, outcome, START, START + timedelta(seconds=seconds),
+                  {"open": 1.5, "compose": 1.25, "send": 1.0})
+
+def test_attempts_stream_and_resume_appends(tmp_path):
+    path = tmp_path / "contacts_results.csv"
+    with results_report.ResultsWriter(path) as writer:
+        _record(writer, _contact(1, "6281234567890"), retry_queue.SENT)
+        _record(writer, _contact(2, "6281234567891"), retry_queue.TIMEOUT)
+    # Resumed run: same file, attempt numbers continue
+    with results_report.ResultsWriter(path) as writer:
+        _record(writer, _contact(2, "6281234567891"), retry_queue.SENT)
+        _record(writer, _contact(4, "6281234567893"), retry_queue.INVALID_NUMBER)
+
+    rows = list(csv.DictReader(open(path, newline="", encoding="utf-8")))
+    assert list(rows[0]) == results_report.RESULT_COLUMNS
+    assert [(r["original_row"], r["attempt"], r["status"], r["failure_class"]) for r in rows] == [
+        ("1", "1", "sent", ""), ("2", "1", "timeout", "transient"),
+        ("2", "2", "sent", ""), ("4", "1", "invalid_number", "permanent")]
+    assert rows[0]["open_seconds"] == "1.500" and rows[0]["total_seconds"] == "4.000"
+
+    statuses = results_report.final_statuses(path)
+    assert statuses[2] == {"status": "Sent", "reason": "", "attempts": 2,
+                           "last_attempt": "2026-01-05T09:00:04",
+                           "confirmation": "", "confirm_seconds": ""}
+    assert statuses[4]["reason"] == "Invalid number"
+
+def test_annotated_copy_of_csv_and_xlsx(tmp_path):
+    results = tmp_path / "contacts_results.csv"
+    with results_report.ResultsWriter(results) as writer:
+        _record(writer, _contact(1, "6281234567890"), retry_queue.SENT)
+        _record(writer, _contact(3, "6281234567892"), retry_queue.DRIVER_ERROR)
+
+    frame = pd.DataFrame({"Phone": ["081234567890", "bad", "081234567892"],
+                          "Name": ["A", "B", "C"]})
+    source_csv = tmp_path / "contacts.csv"
+    frame.to_csv(source_csv, index=False, sep=";")
+    source_xlsx = tmp_path / "contacts.xlsx"
+    frame.to_excel(source_xlsx, index=False)
+
+    for source in (source_csv, source_xlsx):
+        out = results_report.write_annotated(source, results, tmp_path / f"{source.suffix[1:]}.xlsx")
+        rows = list(load_workbook(out).active.iter_rows(values_only=True))
+        assert rows[0] == ("Phone", "Name") + tuple(results_report.STATUS_HEADERS)
+        assert rows[1][:4] == ("081234567890", "A", "Sent", None)
+        assert rows[2][:4] == ("bad", "B", "Not sent", None)
+        assert rows[3][2:4] == ("Failed", "Driver error")
+
+def test_annotated_rows_line_up_after_blank_rows(tmp_path):
+    source_csv = tmp_path / "blank.csv"
+    # Empty lines are skipped by pandas, a delimiter-only line is a (blank) row
+    source_csv.write_text("Phone,Name\n\n081234567890,A\n,\n   \n081234567892,B\n",
+                          encoding="utf-8")
+    source_xlsx = tmp_path / "blank.xlsx"
+    pd.DataFrame({"Phone": ["081234567890", None, "081234567892"],
+                  "Name": ["A", None, "B"]}).to_excel(source_xlsx, index=False)
+
+    for source in (source_csv, source_xlsx):
+        df = data_processor.process_spreadsheet(str(source))
+        contacts = data_processor.prepare_contacts(df, {"phone": "Phone", "name": "Name"}, "Hi")
+        rows = {c["name"]: c["original_row"] for c in contacts}
+        assert rows == {"A": 1, "B": 3}
+        results = tmp_path / f"{source.stem}_{source.suffix[1:]}_results.csv"
+        with results_report.ResultsWriter(results) as writer:
+            _record(writer, _contact(rows["A"], contacts[0]["phone"]), retry_queue.INVALID_NUMBER)
+            _record(writer, _contact(rows["B"], contacts[1]["phone"]), retry_queue.SENT)
+        out = results_report.write_annotated(source, results, tmp_path / f"{source.suffix[1:]}.xlsx")
+        annotated = list(load_workbook(out).active.iter_rows(values_only=True))
+        assert [r[1:3] for r in annotated[1:]] == [("A", "Failed"), (None, None), ("B", "Sent")]
+
+def test_failed_export_writes_real_csv(tmp_path):
+    failed = [{"name": "A, Jr.", "phone": "6281", "reason": "Timeout", "timestamp": "t"}]
+    path = results_report.export_failed(failed, tmp_path / "failed.csv")
+    assert list(csv.DictReader(open(path, newline="", encoding="utf-8"))) == [
+        {"name": "A, Jr.", "phone": "6281", "reason": "Timeout", "timestamp": "t"}]
+    assert "Phone: 6281" in results_report.export_failed(failed, tmp_path / "f.txt").read_text("utf-8")
@@ -0,0 +1,78 @@
+"""
+Tests for failure classification and the deferred retry queue
+"""
+
+from pathlib import Path
+import json
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import retry_queue
+
+def _contact(phone):
+    return {"phone": phone, "name": f"C{phone}", "original_row": 1, "from_url": False}
+
+def test_only_transient_failures_are_queued():
+    queue = retry_queue.RetryQueue(max_retries=2, retry_delay=5)
+    assert not queue.record_failure(_contact("1"), retry_queue.INVALID_NUMBER)
+    assert queue.record_failure(_contact("2"), retry_queue.TIMEOUT)
+    assert queue.record_failure(_contact("3"), retry_queue.DRIVER_ERROR)
+    assert not queue.record_failure(_contact("4"), retry_queue.TIMEOUT, attempts=3)
+    assert len(queue) == 2
+
+    # Survives a JSON round trip with the progress file
+    restored = retry_queue.RetryQueue(json.loads(json.dumps(queue.to_list())), max_retries=2, retry_delay=5)
+    assert [e["contact"]["phone"] for e in restored.entries] == ["2", "3"]
+
+def test_drain_backs_off_and_gives_up(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(retry_queue.time, "time", lambda: clock[0])
+    waits = []
+
+    def wait(seconds):
+        waits.append(seconds)
+        clock[0] += seconds
+        return True
+
+    queue = retry_queue.RetryQueue(max_retries=2, retry_delay=5)
+    queue.record_failure(_contact("2"), retry_queue.TIMEOUT)
+    queue.record_failure(_contact("3"), retry_queue.DRIVER_ERROR)
+
+    outcomes = {"2": [retry_queue.SENT], "3": [retry_queue.TIMEOUT, retry_queue.TIMEOUT]}
+    results = []
+    queue.drain(lambda c: outcomes[c["phone"]].pop(0), wait,
+                lambda c, outcome: results.append((c["phone"], outcome)))
+
+    assert results == [("2", retry_queue.SENT), ("3", retry_queue.TIMEOUT)]
+    assert len(queue) == 0
+    # First retries are due after 5s ("3" right after "2"), the second retry of "3" after 10s more
+    assert waits == [5, 0, 10]
+
+def test_stopped_drain_keeps_entries():
+    queue = retry_queue.RetryQueue(retry_delay=60)
+    queue.record_failure(_contact("2"), retry_queue.TIMEOUT)
+    queue.drain(lambda c: retry_queue.SENT, lambda s: False, lambda c, o: None)
+    assert len(queue) == 1
+
+def test_entry_leaves_the_queue_only_after_send_returns():
+    queue = retry_queue.RetryQueue(max_retries=3, retry_delay=0)
+    queue.record_failure(_contact("2"), retry_queue.TIMEOUT)
+
+    def crash(contact):
+        raise RuntimeError("chrome died")
+    with pytest.raises(RuntimeError):
+        queue.drain(crash, lambda s: True, lambda c, o: None)
+    assert [e["contact"]["phone"] for e in queue.to_list()] == ["2"]
+
+    requeued, seen = [], []
+    outcomes = [retry_queue.TIMEOUT, retry_queue.SENT]
+    queue.drain(lambda c: outcomes.pop(0), lambda s: True,
+                lambda c, o: seen.append(o),
+                on_requeue=lambda c, o: requeued.append((o, len(queue))))
+    # The re-queued entry is in the queue when on_requeue runs (so a save keeps it)
+    assert requeued == [(retry_queue.TIMEOUT, 1)] and seen == [retry_queue.SENT]
+    assert len(queue) == 0
@@ -0,0 +1,64 @@
+"""
+Tests for the selector registry: fallback order, self-healing and packs
+"""
+
+from pathlib import Path
+import json
+import sys
+
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, selector_registry
+
+class _Page:
+    """Driver stub: returns elements only for the selector values in `present`"""
+
+    def __init__(self, present):
+        self.present = set(present)
+        self.calls = []
+
+    def find_elements(self, by, value):
+        self.calls.append(value)
+        return ["element"] if value in self.present else []
+
+SELECTORS = {"box": [("css", "div.new"), ("css", "div.old"), ("xpath", "//div[@id='box']")]}
+
+def test_falls_back_and_remembers_the_winning_locator():
+    registry = selector_registry.SelectorRegistry(SELECTORS)
+    page = _Page(["//div[@id='box']"])
+
+    assert registry.find_all(page, "box") == ["element"]
+    assert page.calls == ["div.new", "div.old", "//div[@id='box']"]
+
+    # Healed: the XPath that matched is tried first from now on
+    page.calls.clear()
+    assert registry.find_all(page, "box") == ["element"]
+    assert page.calls == ["//div[@id='box']"]
+
+    stats = {s.value: s for s in registry.stats()}
+    assert (stats["div.new"].lookups, stats["div.new"].hits) == (1, 0)
+    assert (stats["//div[@id='box']"].lookups, stats["//div[@id='box']"].hits) == (2, 2)
+    assert "2/2 hits" in registry.describe_stats()
+
+    with pytest.raises(TimeoutException):
+        registry.wait(_Page([]), "box", timeout=0.1)
+
+def test_pack_overrides_builtin_elements(tmp_path):
+    pack = tmp_path / "selectors.json"
+    pack.write_text(json.dumps({"version": "2026.10", "selectors": {
+        "message_box": [["css", "div[role='textbox']"]]}}), encoding="utf-8")
+
+    registry = selector_registry.SelectorRegistry.from_config(pack)
+    assert registry.version == "2026.10"
+    assert registry.selectors["message_box"] == [("css", "div[role='textbox']")]
+    assert registry.selectors["chat_loaded"] == config.SELECTORS["chat_loaded"]
+
+    # A malformed pack is ignored, the built-in selectors stay in use
+    pack.write_text(json.dumps({"selectors": {"message_box": [["id", "x"]]}}), encoding="utf-8")
+    registry = selector_registry.SelectorRegistry.from_config(pack)
+    assert registry.version == "builtin"
+    assert registry.selectors["message_box"] == config.SELECTORS["message_box"]
@@ -0,0 +1,63 @@
+"""
+Tests for send confirmation (outgoing bubble + sent tick) with a fake chat
+"""
+
+from pathlib import Path
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, send_confirmation
+
+# Any candidate locator of the element (CSS fast path or XPath fallback)
+_TICK = {value for _, value in config.SELECTORS["message_tick"]}
+_OUTGOING = {value for _, value in config.SELECTORS["outgoing_message"]}
+
+class _Bubble:
+    def __init__(self, id, ticked_at=None):
+        self.id = id
+        self.ticked_at = ticked_at
+
+    def find_elements(self, by, value):
+        if value in _TICK and self.ticked_at is not None:
+            return ["tick"] if time.monotonic() >= self.ticked_at else []
+        return []
+
+class _Chat:
+    """Driver whose chat shows `bubbles`, plus a new one after `appear_after` seconds"""
+
+    def __init__(self, bubbles, new=None, appear_after=0.0):
+        self.bubbles = bubbles
+        self.new = new
+        self.appear_at = time.monotonic() + appear_after
+
+    def find_elements(self, by, value):
+        assert value in _OUTGOING
+        if self.new is not None and time.monotonic() >= self.appear_at:
+            return self.bubbles + [self.new]
+        return list(self.bubbles)
+
+def test_new_bubble_with_tick_is_confirmed():
+    old = _Bubble("old", ticked_at=0)
+    chat = _Chat([old], _Bubble("new", ticked_at=time.monotonic() + 0.05), appear_after=0.02)
+    previous = send_confirmation.last_outgoing(chat)
+    result = send_confirmation.wait_for_confirmation(chat, previous, timeout=2, poll=0.01)
+    assert result.status == send_confirmation.CONFIRMED
+    assert 0.04 <= result.seconds < 1
+
+def test_clock_or_missing_bubble_times_out():
+    old = _Bubble("old", ticked_at=0)
+    # Old ticked bubble must not count as confirmation of the new message
+    pending = send_confirmation.wait_for_confirmation(
+        _Chat([old], _Bubble("new")), old, timeout=0.1, poll=0.01)
+    missing = send_confirmation.wait_for_confirmation(_Chat([old]), old, timeout=0.1, poll=0.01)
+    assert pending.status == send_confirmation.PENDING
+    assert missing.status == send_confirmation.UNCONFIRMED and missing.seconds >= 0.1
+    # First message of a chat: nothing to compare against
+    first = send_confirmation.wait_for_confirmation(
+        _Chat([], _Bubble("new", ticked_at=0)), None, timeout=1, poll=0.01)
+    assert first.status == send_confirmation.CONFIRMED
+    assert send_confirmation.summarize({"confirmed": 2, "pending": 1}) == \
+        "2 confirmed · 1 pending · 0 unconfirmed"
@@ -0,0 +1,88 @@
+"""
+Tests for the Google Sheets fetcher against a local HTTP stand-in
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import config, sheets_fetcher
+from src.background import TaskCancelled
+
+CSV_BODY = b"Phone,Name\n08123456789,Budi\n08234567890,Sari\n"
+ETAG = '"v1"'
+
+class _SheetHandler(BaseHTTPRequestHandler):
+    """Serves /export as CSV with an ETag and /gviz only when export is HTML"""
+
+    requests_seen = []
+    export_html = False
+
+    def do_GET(self):
+        _SheetHandler.requests_seen.append((self.path, self.headers.get("If-None-Match")))
+        if "/export" in self.path and _SheetHandler.export_html:
+            self._reply(200, b"<html>login</html>", "text/html")
+        elif self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+        else:
+            self._reply(200, CSV_BODY, "text/csv")
+
+    def _reply(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def sheet_server(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "SHEETS_CACHE_DIR", tmp_path / "sheets_cache")
+    _SheetHandler.requests_seen = []
+    _SheetHandler.export_html = False
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SheetHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/spreadsheets/d/SHEET123"
+    server.shutdown()
+
+def test_revalidates_with_etag(sheet_server):
+    """Second load of an unchanged sheet is answered from the local cache"""
+    url = f"{sheet_server}/export?format=csv&gid=7"
+    progress = []
+
+    df = sheets_fetcher.fetch_sheet(url, progress=lambda done, total: progress.append((done, total)))
+    assert df["Name"].tolist() == ["Budi", "Sari"]
+    assert progress[-1] == (len(CSV_BODY), len(CSV_BODY))
+
+    again = sheets_fetcher.fetch_sheet(url)
+    assert again.equals(df)
+    assert _SheetHandler.requests_seen[-1][1] == ETAG
+    assert sheets_fetcher.cache_paths(url)[0].name == "SHEET123_7_export.csv"
+
+def test_falls_back_to_gviz(sheet_server):
+    """An HTML answer from /export falls back to the gviz endpoint"""
+    _SheetHandler.export_html = True
+    df = sheets_fetcher.fetch_sheet(f"{sheet_server}/export?format=csv")
+    assert len(df) == 2
+    assert "/gviz/tq?tqx=out:csv" in _SheetHandler.requests_seen[-1][0]
+
+def test_cancel_discards_partial_download(sheet_server):
+    """A cancelled download leaves no cache entry behind"""
+    url = f"{sheet_server}/export?format=csv"
+    cancel = threading.Event()
+    cancel.set()
+    with pytest.raises(TaskCancelled):
+        sheets_fetcher.fetch_sheet(url, cancel_event=cancel)
+    csv_path, _ = sheets_fetcher.cache_paths(url)
+    assert not csv_path.exists()
+    assert not csv_path.with_suffix(".part").exists()
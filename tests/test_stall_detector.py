@@ -0,0 +1,53 @@
+"""
+Tests for the event-loop stall detector with a minimal after()-style loop
+"""
+
+from pathlib import Path
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import stall_detector
+
+class _Loop:
+    """Single-threaded loop with Tk's after(ms, callback) signature"""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append((time.monotonic() + ms / 1000, callback))
+
+    def run(self, seconds):
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            self.pending.sort(key=lambda item: item[0])
+            due, callback = self.pending[0]
+            if time.monotonic() >= due:
+                self.pending.pop(0)
+                callback()
+            else:
+                time.sleep(0.001)
+
+def _blocking_call():
+    time.sleep(0.4)
+
+def test_stall_is_counted_with_the_blocking_stack():
+    loop = _Loop()
+    changes = []
+    detector = stall_detector.StallDetector(loop.after, interval_ms=20, threshold=0.2,
+                                            on_change=lambda d: changes.append(d.stalls))
+    detector.start()
+    try:
+        loop.run(0.1)
+        assert detector.stalls == 0 and detector.worst_lag < 0.2
+        loop.after(0, _blocking_call)
+        loop.run(0.6)
+    finally:
+        detector.stop()
+    assert detector.stalls == 1 and changes[-1] == 1
+    assert 0.3 <= detector.last.seconds == detector.worst_lag < 1
+    assert "_blocking_call" in detector.last.stack
+    assert detector.describe().startswith("UI stalls: 1 · worst lag 0.")
@@ -0,0 +1,45 @@
+"""
+Tests for precompiled message templates and lazy per-contact rendering
+"""
+
+import pandas as pd
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import data_processor, templates
+
+def test_compile_and_render():
+    """Placeholders are case-insensitive; unknown ones stay verbatim"""
+    tpl = templates.compile_template("Hello {Name}, your order {Order ID} ships {eta}!")
+    assert tpl.fields == ('name', 'order id', 'eta')
+    assert tpl.render({'name': 'Budi', 'order id': 'A-1'}) == "Hello Budi, your order A-1 ships {eta}!"
+    assert templates.compile_template(tpl.text) is tpl
+
+def test_prepare_contacts_stores_template_and_fields():
+    """Contacts keep a template id plus only the referenced row fields"""
+    df = pd.DataFrame({
+        'Phone': ['08123456789', '628234567890', 'https://wa.me/628345678901?text=Hi%20there'],
+        'Nama': ['Budi', 'Sari', 'Andi'],
+        'City': ['Jakarta', None, 'Bandung'],
+        'Notes': ['x' * 500, 'y' * 500, 'z' * 500],
+    })
+    contacts = data_processor.prepare_contacts(
+        df, {'phone': 'Phone', 'name': 'Nama', 'message': None}, "Hi {name} from {city}")
+
+    assert len(contacts) == 3
+    first = contacts[0]
+    assert 'message' not in first
+    assert first['fields'] == {'city': 'Jakarta'}
+    assert templates.render_message(first) == "Hi Budi from Jakarta"
+    assert templates.render_message(contacts[1]) == "Hi Sari from "
+
+    # URL text is a literal message, not a template
+    assert contacts[2]['message'] == "Hi there"
+    assert templates.render_message(contacts[2]) == "Hi there"
+
+    # Saved progress carries each template text once
+    saved = templates.export_templates(contacts)
+    assert list(saved.values()) == ["Hi {name} from {city}"]
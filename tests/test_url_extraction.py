@@ -54,6 +54,22 @@ def test_url_extraction():
     
     print("\n" + "="*80)
 
+def test_parse_cache_reuses_repeated_urls():
+    """Repeated URLs are parsed once per campaign and callers get their own copy"""
+    url = 'https://api.whatsapp.com/send?phone=628123456789&text=Hello%20there'
+    data_processor.clear_parse_caches()
+
+    first = data_processor.parse_whatsapp_url(url)
+    first['message'] = 'mutated'
+    for _ in range(9):
+        assert data_processor.parse_whatsapp_url(url) == {'phone': '628123456789', 'message': 'Hello there'}
+
+    stats = data_processor.parse_cache_stats()['parse_whatsapp_url']
+    assert (stats['hits'], stats['misses']) == (9, 1)
+
+    data_processor.clear_parse_caches()
+    assert data_processor.parse_cache_stats()['parse_whatsapp_url']['size'] == 0
+
 def create_sample_with_urls():
     """Create sample Excel file with WhatsApp URLs"""
     